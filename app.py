@@ -1,8 +1,51 @@
+"""
+Streamlit UI for the currency converter
+
+A thin shell over currency_core, which holds all fetching, caching and
+conversion logic. The core's names are re-exported here so existing
+`from app import ...` callers keep working, but scripts and batch jobs
+should import currency_core directly to skip Streamlit's startup cost.
+"""
+
 import streamlit as st
-import requests
-import json
 from datetime import datetime
 
+import config
+import metrics
+from money import convert_exact
+from rate_limiter import TokenBucket
+from currency_core import (  # noqa: F401 - re-exported for `from app import ...` callers
+    SUPPORTED_CURRENCIES,
+    aget_exchange_rates,
+    aget_exchange_rates_many,
+    check_rate_consistency,
+    convert_currency,
+    convert_currency_as_of_batch,
+    convert_currency_batch,
+    convert_currency_multi,
+    fetch_exchange_rates,
+    get_api_url,
+    get_currency_index,
+    get_currency_name,
+    get_currency_symbol,
+    get_current_rates,
+    get_current_snapshot,
+    get_exchange_rate,
+    get_exchange_rates,
+    get_provider_stats,
+    get_rate_cache_stats,
+    get_rate_consistency,
+    get_rate_history,
+    get_rate_board,
+    get_rate_matrix,
+    get_rate_snapshot,
+    get_refresher_health,
+    get_snapshot_id,
+    get_upstream_stats,
+    parse_rates,
+    start_rate_refresher,
+)
+
 # Page configuration
 st.set_page_config(
     page_title="Currency Converter - Multi Currency",
@@ -10,141 +53,23 @@ st.set_page_config(
     layout="wide"
 )
 
-# Define supported currencies with symbols
-SUPPORTED_CURRENCIES = {
-    "USD": {"name": "US Dollar", "symbol": "$"},
-    "INR": {"name": "Indian Rupee", "symbol": "₹"},
-    "EUR": {"name": "Euro", "symbol": "€"},
-    "GBP": {"name": "British Pound", "symbol": "£"},
-    "JPY": {"name": "Japanese Yen", "symbol": "¥"},
-    "AUD": {"name": "Australian Dollar", "symbol": "A$"},
-    "CAD": {"name": "Canadian Dollar", "symbol": "C$"},
-    "CHF": {"name": "Swiss Franc", "symbol": "CHF"},
-    "CNY": {"name": "Chinese Yuan", "symbol": "¥"},
-    "SGD": {"name": "Singapore Dollar", "symbol": "S$"}
-}
-
-def get_exchange_rates():
-    """
-    Fetch live exchange rates from the API for all supported currencies
-    Returns: tuple (success: bool, rates: dict, error_message: str)
-    """
-    try:
-        # API endpoint for USD to all currencies conversion
-        api_url = "https://open.er-api.com/v6/latest/USD"
-        
-        # Make API request with timeout
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Parse JSON response
-        data = response.json()
-        
-        # Extract rates for supported currencies
-        rates = {}
-        for currency in SUPPORTED_CURRENCIES.keys():
-            if currency in data['rates']:
-                rates[currency] = data['rates'][currency]
-            else:
-                # If currency not found, skip it
-                continue
-        
-        if not rates:
-            return False, {}, "No supported currencies found in API response"
-        
-        return True, rates, ""
-        
-    except requests.exceptions.RequestException as e:
-        return False, {}, f"Network error: {str(e)}"
-    except json.JSONDecodeError as e:
-        return False, {}, f"Invalid response from API: {str(e)}"
-    except KeyError as e:
-        return False, {}, f"Unexpected API response format: {str(e)}"
-    except Exception as e:
-        return False, {}, f"Unexpected error: {str(e)}"
-
-def get_exchange_rate():
-    """
-    Fetch live exchange rate from the API (kept for backward compatibility)
-    Returns: tuple (success: bool, rate: float, error_message: str)
-    """
-    try:
-        # API endpoint for USD to INR conversion
-        api_url = "https://open.er-api.com/v6/latest/USD"
-        
-        # Make API request with timeout
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Parse JSON response
-        data = response.json()
-        
-        # Extract INR rate (USD to INR)
-        inr_rate = data['rates']['INR']
-        
-        return True, inr_rate, ""
-        
-    except requests.exceptions.RequestException as e:
-        return False, 0, f"Network error: {str(e)}"
-    except json.JSONDecodeError as e:
-        return False, 0, f"Invalid response from API: {str(e)}"
-    except KeyError as e:
-        return False, 0, f"Unexpected API response format: {str(e)}"
-    except Exception as e:
-        return False, 0, f"Unexpected error: {str(e)}"
-
-def convert_currency_multi(amount, from_currency, to_currency, rates):
-    """
-    Convert currency between any two supported currencies
-    Args:
-        amount: float - amount to convert
-        from_currency: str - source currency code
-        to_currency: str - target currency code
-        rates: dict - exchange rates from USD
-    Returns: float - converted amount
-    """
-    if from_currency == to_currency:
-        return amount
-    
-    if from_currency == "USD":
-        # Converting from USD to another currency
-        return amount * rates[to_currency]
-    elif to_currency == "USD":
-        # Converting from another currency to USD
-        return amount / rates[from_currency]
-    else:
-        # Converting between two non-USD currencies
-        # First convert to USD, then to target currency
-        usd_amount = amount / rates[from_currency]
-        return usd_amount * rates[to_currency]
-
-def convert_currency(amount, conversion_type, exchange_rate):
-    """
-    Convert currency based on type and exchange rate (kept for backward compatibility)
-    Args:
-        amount: float - amount to convert
-        conversion_type: str - "INR_to_USD" or "USD_to_INR"
-        exchange_rate: float - USD to INR rate
-    Returns: float - converted amount
-    """
-    if conversion_type == "INR_to_USD":
-        # Convert INR to USD (divide by rate)
-        return amount / exchange_rate
-    else:
-        # Convert USD to INR (multiply by rate)
-        return amount * exchange_rate
-
-def get_currency_symbol(currency_code):
-    """Get currency symbol for display"""
-    return SUPPORTED_CURRENCIES.get(currency_code, {}).get("symbol", currency_code)
-
-def get_currency_name(currency_code):
-    """Get full currency name for display"""
-    return SUPPORTED_CURRENCIES.get(currency_code, {}).get("name", currency_code)
-
 def main():
     """Main application function"""
     
+    # Expose /metrics for scraping (once per process)
+    if config.METRICS_ENABLED:
+        metrics.start_server()
+    
+    # Keep rates fresh in the background so conversions never wait on the API
+    if config.REFRESHER_ENABLED:
+        start_rate_refresher()
+    
+    # Currency lookups for the current snapshot (built once per currency set, not per rerun);
+    # only the very first render of a cold process waits on the API
+    with st.spinner("Fetching live exchange rates..."):
+        success, rates, _ = get_current_rates()
+    currency_index = get_currency_index(rates if success else None)
+    
     # Header section
     st.title("💱 Multi-Currency Converter")
     st.markdown("**Convert between multiple currencies using live exchange rates**")
@@ -164,123 +89,40 @@ def main():
         5. Get live rates!
         
         **Data Source:** Open Exchange Rates API
-        **Supported Currencies:** USD, INR, EUR, GBP, JPY, AUD, CAD, CHF, CNY, SGD
         """)
+        st.markdown(f"**Supported Currencies:** {len(currency_index)} currencies")
+        
+        # Show when the rates of the last conversion were fetched (the session keeps only the snapshot id)
+        if 'snapshot_id' in st.session_state:
+            snapshot = get_rate_snapshot(st.session_state.snapshot_id) or get_rate_snapshot()
+            if snapshot is not None:
+                st.info(f"Last updated: {datetime.fromtimestamp(snapshot.fetched_at).strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # Show last update time
-        if 'last_update' in st.session_state:
-            st.info(f"Last updated: {st.session_state.last_update}")
+        # Show background refresher health
+        if config.REFRESHER_ENABLED:
+            health = get_refresher_health()
+            if health["consecutive_failures"]:
+                st.warning(f"Rate refresh failing ({health['consecutive_failures']}x): {health['last_error']}")
+            elif health["last_success"]:
+                refreshed = datetime.fromtimestamp(health["last_success"]).strftime("%H:%M:%S")
+                st.caption(f"🟢 Rates refreshed at {refreshed}")
+        
+        # Flag snapshots that failed the consistency check (checked once per refresh)
+        consistency = get_rate_consistency()
+        if consistency and not consistency["ok"]:
+            outliers = ", ".join((consistency["reference"] or {}).get("outliers", {})) or "none"
+            st.warning(f"⚠️ Rate data looks inconsistent (max cross-rate error {consistency['max_error']:.2%}, "
+                       f"disagreeing with reference: {outliers})")
     
     # Main conversion area
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
-        # Currency selection
-        st.subheader("🔄 Currency Selection")
-        
-        # Create two columns for currency dropdowns
-        col_from, col_to = st.columns(2)
+        render_converter(currency_index)
         
-        with col_from:
-            from_currency = st.selectbox(
-                "From Currency:",
-                options=list(SUPPORTED_CURRENCIES.keys()),
-                index=list(SUPPORTED_CURRENCIES.keys()).index("INR"),  # Default to INR
-                format_func=lambda x: f"{get_currency_symbol(x)} {x} - {get_currency_name(x)}"
-            )
-        
-        with col_to:
-            to_currency = st.selectbox(
-                "To Currency:",
-                options=list(SUPPORTED_CURRENCIES.keys()),
-                index=list(SUPPORTED_CURRENCIES.keys()).index("USD"),  # Default to USD
-                format_func=lambda x: f"{get_currency_symbol(x)} {x} - {get_currency_name(x)}"
-            )
-        
-        # Amount input
-        st.subheader("💰 Amount")
-        amount = st.number_input(
-            f"Enter amount in {get_currency_symbol(from_currency)} {from_currency}:",
-            min_value=0.01,
-            value=100.0,
-            step=0.01,
-            format="%.2f"
-        )
-        
-        # Convert button
-        if st.button("🚀 Convert", type="primary", use_container_width=True):
-            # Show loading spinner
-            with st.spinner("Fetching live exchange rates..."):
-                # Get exchange rates
-                success, rates, error = get_exchange_rates()
-                
-                if success:
-                    # Check if both currencies are supported
-                    if from_currency not in rates:
-                        st.error(f"❌ Exchange rate not available for {from_currency}")
-                        st.warning(f"The API doesn't provide rates for {from_currency}. Please try another currency.")
-                        return
-                    
-                    if to_currency not in rates:
-                        st.error(f"❌ Exchange rate not available for {to_currency}")
-                        st.warning(f"The API doesn't provide rates for {to_currency}. Please try another currency.")
-                        return
-                    
-                    # Store last update time
-                    st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    # Convert currency
-                    converted_amount = convert_currency_multi(amount, from_currency, to_currency, rates)
-                    
-                    # Display results
-                    st.success("✅ Conversion successful!")
-                    
-                    # Create result display
-                    col_result1, col_result2 = st.columns(2)
-                    
-                    with col_result1:
-                        st.metric(
-                            label=f"Original Amount",
-                            value=f"{get_currency_symbol(from_currency)} {amount:,.2f} {from_currency}"
-                        )
-                    
-                    with col_result2:
-                        st.metric(
-                            label=f"Converted Amount",
-                            value=f"{get_currency_symbol(to_currency)} {converted_amount:,.2f} {to_currency}"
-                        )
-                    
-                    # Show exchange rate info
-                    if from_currency == "USD":
-                        rate_info = f"1 USD = {rates[to_currency]:.4f} {to_currency}"
-                    elif to_currency == "USD":
-                        rate_info = f"1 {from_currency} = {1/rates[from_currency]:.4f} USD"
-                    else:
-                        # Cross rate
-                        usd_to_from = 1 / rates[from_currency]
-                        usd_to_to = rates[to_currency]
-                        cross_rate = usd_to_to / usd_to_from
-                        rate_info = f"1 {from_currency} = {cross_rate:.4f} {to_currency}"
-                    
-                    st.info(f"💡 Current Exchange Rate: {rate_info}")
-                    
-                    # Add some visual separation
-                    st.markdown("---")
-                    
-                    # Show conversion formula
-                    if from_currency == "USD":
-                        st.markdown(f"**Formula:** {amount:.2f} USD × {rates[to_currency]:.4f} = {converted_amount:.2f} {to_currency}")
-                    elif to_currency == "USD":
-                        st.markdown(f"**Formula:** {amount:.2f} {from_currency} ÷ {rates[from_currency]:.4f} = {converted_amount:.2f} USD")
-                    else:
-                        # Cross conversion
-                        usd_amount = amount / rates[from_currency]
-                        st.markdown(f"**Formula:** {amount:.2f} {from_currency} ÷ {rates[from_currency]:.4f} = {usd_amount:.4f} USD × {rates[to_currency]:.4f} = {converted_amount:.2f} {to_currency}")
-                        
-                else:
-                    # Show error message
-                    st.error(f"❌ Failed to get exchange rates: {error}")
-                    st.warning("Please check your internet connection and try again later.")
+        # Rate board for the whole snapshot
+        st.markdown("---")
+        render_rate_board(currency_index)
         
         # Add some spacing at the bottom
         st.markdown("")
@@ -290,5 +132,179 @@ def main():
         st.markdown("---")
         st.markdown("*Built with ❤️ using Streamlit and Python*")
 
+def _session_bucket():
+    """Per-session Convert limiter, so one user cannot hog the shared upstream budget"""
+    if "convert_bucket" not in st.session_state:
+        st.session_state.convert_bucket = TokenBucket(config.SESSION_CONVERT_RATE, config.SESSION_CONVERT_BURST)
+    return st.session_state.convert_bucket
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _conversion_view(snapshot_id, amount, from_currency, to_currency, _rates):
+    """
+    Format one conversion result, once per snapshot, amount and currency pair
+    (_rates is not hashed - snapshot_id identifies it)
+    Returns: dict - display strings for the result metrics, rate info and formula
+    """
+    rates = _rates
+    currency_index = get_currency_index(rates)
+    
+    # Convert currency exactly, rounded to the target currency's minor unit
+    converted_amount = convert_exact(amount, from_currency, to_currency, rates)
+    
+    # Cross rate from the precomputed matrix
+    cross_rate = get_rate_matrix(rates).rate(from_currency, to_currency)
+    
+    if from_currency == "USD":
+        formula = f"{amount:.2f} USD × {rates[to_currency]:.4f} = {converted_amount} {to_currency}"
+    elif to_currency == "USD":
+        formula = f"{amount:.2f} {from_currency} ÷ {rates[from_currency]:.4f} = {converted_amount} USD"
+    else:
+        # Cross conversion
+        usd_amount = amount / rates[from_currency]
+        formula = f"{amount:.2f} {from_currency} ÷ {rates[from_currency]:.4f} = {usd_amount:.4f} USD × {rates[to_currency]:.4f} = {converted_amount} {to_currency}"
+    
+    return {
+        "original": f"{currency_index.symbols[from_currency]} {amount:,.2f} {from_currency}",
+        "converted": f"{currency_index.symbols[to_currency]} {converted_amount:,} {to_currency}",
+        "rate_info": f"1 {from_currency} = {cross_rate:.4f} {to_currency}",
+        "formula": formula,
+    }
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _rate_board_frame(snapshot_id, amount, codes, _rates):
+    """
+    Build the rate board table, once per snapshot, amount and currency selection
+    (_rates is not hashed - snapshot_id identifies it)
+    Returns: pandas DataFrame - rows convert `amount` of their currency into each column's
+    """
+    import pandas as pd
+    
+    board_codes, table = get_rate_board(_rates, amount, codes)
+    return pd.DataFrame(table.round(4), index=list(board_codes), columns=list(board_codes))
+
+@st.fragment
+def render_converter(currency_index):
+    """Currency selection, amount and result - widget changes rerun only this fragment"""
+    # Currency selection
+    st.subheader("🔄 Currency Selection")
+    
+    # Create two columns for currency dropdowns
+    col_from, col_to = st.columns(2)
+    
+    with col_from:
+        from_currency = st.selectbox(
+            "From Currency:",
+            options=currency_index.codes,
+            index=currency_index.position.get("INR", 0),  # Default to INR
+            format_func=currency_index.label
+        )
+    
+    with col_to:
+        to_currency = st.selectbox(
+            "To Currency:",
+            options=currency_index.codes,
+            index=currency_index.position.get("USD", 0),  # Default to USD
+            format_func=currency_index.label
+        )
+    
+    # Amount input
+    st.subheader("💰 Amount")
+    amount = st.number_input(
+        f"Enter amount in {currency_index.symbols[from_currency]} {from_currency}:",
+        min_value=0.01,
+        value=100.0,
+        step=0.01,
+        format="%.2f"
+    )
+    
+    # Convert button
+    if st.button("🚀 Convert", type="primary", use_container_width=True):
+        bucket = _session_bucket()
+        if not bucket.try_acquire():
+            st.warning(f"⏳ Too many conversions - please wait {bucket.retry_after():.1f}s and try again.")
+            return
+        
+        # Show loading spinner (only waits on the API before the first snapshot)
+        with st.spinner("Fetching live exchange rates..."):
+            # Get the shared in-memory snapshot
+            success, snapshot, error = get_current_snapshot()
+            
+            if success:
+                rates = snapshot.rates
+                
+                # Check if both currencies are supported
+                if from_currency not in rates:
+                    st.error(f"❌ Exchange rate not available for {from_currency}")
+                    st.warning(f"The API doesn't provide rates for {from_currency}. Please try another currency.")
+                    return
+                
+                if to_currency not in rates:
+                    st.error(f"❌ Exchange rate not available for {to_currency}")
+                    st.warning(f"The API doesn't provide rates for {to_currency}. Please try another currency.")
+                    return
+                
+                # Remember which snapshot was used - just its id, never a copy of the rates
+                st.session_state.snapshot_id = snapshot.id
+                
+                # Formatted once per snapshot/amount/pair, then served from the cache
+                view = _conversion_view(f"v{snapshot.id}", amount, from_currency, to_currency, rates)
+                
+                # Display results
+                st.success("✅ Conversion successful!")
+                
+                # Create result display
+                col_result1, col_result2 = st.columns(2)
+                
+                with col_result1:
+                    st.metric(label="Original Amount", value=view["original"])
+                
+                with col_result2:
+                    st.metric(label="Converted Amount", value=view["converted"])
+                
+                st.info(f"💡 Current Exchange Rate: {view['rate_info']}")
+                
+                # Add some visual separation
+                st.markdown("---")
+                
+                # Show conversion formula
+                st.markdown(f"**Formula:** {view['formula']}")
+                    
+            else:
+                # Show error message
+                st.error(f"❌ Failed to get exchange rates: {error}")
+                st.warning("Please check your internet connection and try again later.")
+
+@st.fragment
+def render_rate_board(currency_index):
+    """All pairwise conversions for the current snapshot - reruns only this fragment"""
+    st.subheader("📋 Rate Board")
+    
+    col_amount, col_codes = st.columns([1, 3])
+    with col_amount:
+        amount = st.number_input("Amount:", min_value=0.01, value=1.0, step=0.01, format="%.2f", key="board_amount")
+    with col_codes:
+        default_codes = [code for code in SUPPORTED_CURRENCIES if code in currency_index]
+        codes = st.multiselect(
+            "Currencies:",
+            options=currency_index.codes,
+            default=default_codes,
+            format_func=currency_index.label,
+            key="board_codes"
+        )
+    
+    success, rates, error = get_current_rates()
+    if not success:
+        st.error(f"❌ Failed to get exchange rates: {error}")
+        return
+    
+    codes = tuple(code for code in codes if code in rates)
+    if not codes:
+        st.caption("Select currencies to compare.")
+        return
+    
+    board = _rate_board_frame(get_snapshot_id(rates), amount, codes, rates)
+    st.caption(f"{amount:,.2f} of each row currency in each column currency")
+    st.dataframe(board)
+
 if __name__ == "__main__":
     main()
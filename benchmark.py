@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Currency Converter conversion and fetch paths
+
+Runs fully offline: fetch benchmarks talk to a local stub of the rates API
+with configurable injected latency. Results are written as JSON and can be
+compared against a stored baseline, failing when a case's best run gets
+slower than the allowed tolerance plus the baseline's run-to-run noise.
+
+Usage:
+    python benchmark.py                                   # run and print
+    python benchmark.py --json results.json               # also save results
+    python benchmark.py --check benchmark_baseline.json   # fail on regressions
+    python benchmark.py --save-baseline benchmark_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import config
+import http_client
+from currency_core import (SUPPORTED_CURRENCIES, convert_currency_batch, convert_currency_multi,
+                           fetch_exchange_rates, parse_rates)
+from binary_snapshot import compare_with_json
+from money import convert_minor_batch
+from rate_consistency import timing_benchmark as consistency_benchmark
+from rate_changes import fanout_benchmark
+from stub_rates_server import DEFAULT_RATES, StubRatesServer
+
+# Timing jitter allowed on top of --tolerance, however steady the baseline was
+NOISE_FLOOR_S = 0.002
+
+# Registered benchmark cases: name -> function(options) returning (seconds, operations)
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark case"""
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+
+def _workload(rows, seed=42):
+    """Deterministic random conversions over the supported currencies"""
+    rng = np.random.default_rng(seed)
+    codes = np.array(list(SUPPORTED_CURRENCIES.keys()))
+    amounts_minor = rng.integers(1, 10 ** 9, rows)
+    return (
+        amounts_minor / 100.0,
+        amounts_minor,
+        codes[rng.integers(0, len(codes), rows)],
+        codes[rng.integers(0, len(codes), rows)],
+    )
+
+
+def _api_document(extra_currencies=150):
+    """An API-sized response body (~160 currencies like the real API)"""
+    rates = dict(DEFAULT_RATES)
+    for i in range(extra_currencies):
+        rates[f"{chr(65 + i // 26)}{chr(65 + i % 26)}X"] = 1.0 + i / 7.0
+    return json.dumps({
+        "result": "success",
+        "base_code": "USD",
+        "time_last_update_unix": 1700000000,
+        "time_next_update_unix": 1700086400,
+        "rates": rates,
+    })
+
+
+@case("convert_currency_multi")
+def bench_convert_single(options):
+    amounts, _, from_codes, to_codes = _workload(options.rows // 10)
+    rows = list(zip(amounts.tolist(), from_codes.tolist(), to_codes.tolist()))
+    rates = dict(DEFAULT_RATES)
+    start = time.perf_counter()
+    for amount, from_currency, to_currency in rows:
+        convert_currency_multi(amount, from_currency, to_currency, rates)
+    return time.perf_counter() - start, len(rows)
+
+
+@case("convert_currency_batch")
+def bench_convert_batch(options):
+    amounts, _, from_codes, to_codes = _workload(options.rows)
+    rates = dict(DEFAULT_RATES)
+    start = time.perf_counter()
+    convert_currency_batch(amounts, from_codes, to_codes, rates)
+    return time.perf_counter() - start, len(amounts)
+
+
+@case("convert_minor_batch")
+def bench_convert_exact(options):
+    _, amounts_minor, from_codes, to_codes = _workload(options.rows)
+    rates = dict(DEFAULT_RATES)
+    start = time.perf_counter()
+    convert_minor_batch(amounts_minor, from_codes, to_codes, rates)
+    return time.perf_counter() - start, len(amounts_minor)
+
+
+@case("parse_rates_json")
+def bench_parse(options):
+    body = _api_document()
+    iterations = 2000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse_rates(json.loads(body))
+    return time.perf_counter() - start, iterations
+
+
+@case("fetch_exchange_rates")
+def bench_fetch(options):
+    iterations = options.fetches
+    with StubRatesServer(latency=options.latency / 1000.0) as stub:
+        original_url = config.API_BASE_URL
+        config.API_BASE_URL = stub.base_url
+        url = f"{stub.base_url}/{config.BASE_CURRENCY}"
+        try:
+            http_client.forget(url)
+            fetch_exchange_rates()  # warm the connection pool
+            start = time.perf_counter()
+            for _ in range(iterations):
+                http_client.forget(url)  # a full fetch every time, not a 304 revalidation
+                success, _, error = fetch_exchange_rates()
+                if not success:
+                    raise RuntimeError(error)
+            elapsed = time.perf_counter() - start
+        finally:
+            http_client.forget(url)
+            config.API_BASE_URL = original_url
+    return elapsed, iterations
+
+
+def _bench_snapshot_load(fmt, loads=1000):
+    result = compare_with_json(currencies=160, loads=loads)[fmt]
+    return result["seconds_per_load"] * loads, loads
+
+
+@case("snapshot_load_json")
+def bench_snapshot_json(options):
+    return _bench_snapshot_load("json")
+
+
+@case("snapshot_load_binary")
+def bench_snapshot_binary(options):
+    return _bench_snapshot_load("binary")
+
+
+@case("broadcast_fanout")
+def bench_broadcast(options):
+    result = fanout_benchmark(options.subscribers, events=50)
+    return result["seconds"], result["deliveries"]
+
+
+@case("consistency_check_500")
+def bench_consistency(options):
+    result = consistency_benchmark(500, repeat=5)
+    return result["seconds"], 1
+
+
+def _bench_import(module):
+    """Time importing a module in a fresh interpreter (excluding interpreter startup)"""
+    script = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.split()[-1]), 1
+
+
+@case("import_currency_core")
+def bench_import_core(options):
+    return _bench_import("currency_core")
+
+
+@case("import_app")
+def bench_import_app(options):
+    return _bench_import("app")
+
+
+def run(options):
+    """
+    Run the selected cases
+    Returns: dict - machine-readable results
+    """
+    results = {}
+    for name, func in CASES.items():
+        if options.only and name not in options.only:
+            continue
+        runs = [func(options) for _ in range(options.repeat)]
+        seconds = [elapsed for elapsed, _ in runs]
+        operations = runs[0][1]
+        median = statistics.median(seconds)
+        results[name] = {
+            "median_s": median,
+            "min_s": min(seconds),
+            "operations": operations,
+            "ops_per_sec": operations / median if median else None,
+        }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "options": {"rows": options.rows, "fetches": options.fetches, "latency_ms": options.latency,
+                    "subscribers": options.subscribers},
+        "results": results,
+    }
+
+
+def check_regressions(report, baseline, tolerance):
+    """
+    Compare best-of-repeat times to a baseline
+    A case regresses when its fastest run is slower than the baseline's fastest
+    run by more than tolerance plus the baseline's own run-to-run spread
+    (median - min, at least NOISE_FLOOR_S), so scheduler noise on cases of a
+    few milliseconds does not read as a regression.
+    Returns: dict - case name -> message, for each case over its limit
+    """
+    failures = {}
+    for name, result in report["results"].items():
+        expected = baseline.get("results", {}).get(name)
+        if expected is None:
+            continue
+        noise = max(expected["median_s"] - expected["min_s"], NOISE_FLOOR_S)
+        limit = expected["min_s"] * (1 + tolerance) + noise
+        if result["min_s"] > limit:
+            failures[name] = (
+                f"{name}: {result['min_s'] * 1000:.1f}ms > {limit * 1000:.1f}ms "
+                f"(baseline best {expected['min_s'] * 1000:.1f}ms)"
+            )
+    return failures
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Currency Converter benchmarks")
+    parser.add_argument("--rows", type=int, default=1000000, help="rows for batch conversion cases")
+    parser.add_argument("--fetches", type=int, default=50, help="requests per fetch case")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected stub API latency (ms)")
+    parser.add_argument("--subscribers", type=int, default=500, help="concurrent subscribers for the fan-out case")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (median is reported, best is checked)")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--check", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs baseline (0.5 = 50%%)")
+    parser.add_argument("--save-baseline", help="write results as the new baseline")
+    options = parser.parse_args(argv)
+
+    report = run(options)
+
+    print(f"⏱️  Benchmarks (Python {report['python']}, median of {options.repeat})")
+    for name, result in report["results"].items():
+        print(f"{name:<28} {result['median_s'] * 1000:>10.2f}ms  {result['ops_per_sec']:>14,.0f} ops/sec")
+    if "import_currency_core" in report["results"] and "import_app" in report["results"]:
+        share = report["results"]["import_currency_core"]["median_s"] / report["results"]["import_app"]["median_s"]
+        print(f"📦 currency_core imports in {share:.0%} of the time app (Streamlit) takes")
+
+    for path in (options.json, options.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if options.check:
+        with open(options.check, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("options") != report["options"]:
+            print(f"⚠️  Baseline was recorded with different options: {baseline.get('options')}")
+        failures = check_regressions(report, baseline, options.tolerance)
+        if failures:
+            # Re-measure the suspects with twice the runs before failing on them
+            recheck = argparse.Namespace(**vars(options))
+            recheck.only, recheck.repeat = sorted(failures), options.repeat * 2
+            for name, result in run(recheck)["results"].items():
+                report["results"][name]["min_s"] = min(report["results"][name]["min_s"], result["min_s"])
+            failures = check_regressions(report, baseline, options.tolerance)
+        if failures:
+            print("❌ Performance regressions:")
+            for failure in failures.values():
+                print(f"   {failure}")
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Compact binary rate snapshot format with zero-copy loading
+
+Layout (little-endian, 8-byte aligned):
+
+    header    32 bytes  magic b"FXSN", format version (u16), reserved (u16),
+                        currency count (u32), fetched_at (f64), base code (8s),
+                        padding
+    codes     8 bytes per currency, ASCII, NUL-padded
+    rates     float64 per currency, in the same order as the codes
+
+A snapshot is written once (to a temporary file, then renamed into place,
+so readers never see a partial file) and loaded with mmap: the rates are a
+memoryview straight onto the page cache, so any number of processes can
+load the same file without parsing or copying it.
+
+Run this file to compare load time and memory against JSON parsing:
+    python binary_snapshot.py --currencies 160 --loads 2000
+"""
+
+import mmap
+import os
+import struct
+
+MAGIC = b"FXSN"
+FORMAT_VERSION = 1
+CODE_WIDTH = 8
+
+_HEADER = struct.Struct("<4sHHId8s4x")
+
+
+def write_snapshot(path, rates, fetched_at, base="USD"):
+    """
+    Write a snapshot file atomically
+    Args:
+        path: str - destination file
+        rates: dict - exchange rates from base
+        fetched_at: float - unix timestamp of the fetch
+        base: str - currency the rates are quoted from
+    Returns: int - bytes written
+    Raises: ValueError for a currency code longer than 8 bytes
+    """
+    codes = list(rates)
+    table = bytearray()
+    for code in codes:
+        encoded = code.encode("ascii")
+        if len(encoded) > CODE_WIDTH:
+            raise ValueError(f"Currency code too long for snapshot format: {code!r}")
+        table += encoded.ljust(CODE_WIDTH, b"\0")
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(codes), fetched_at, base.encode("ascii"))
+    values = struct.pack(f"<{len(codes)}d", *(rates[code] for code in codes))
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(table)
+        f.write(values)
+    os.replace(temp_path, path)
+    return len(header) + len(table) + len(values)
+
+
+class BinarySnapshot:
+    """A memory-mapped snapshot file (read-only)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: str - snapshot file written by write_snapshot()
+        Raises: OSError if the file cannot be opened, ValueError if it is not a valid snapshot
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._buffer = memoryview(self._mmap)
+            if len(self._buffer) < _HEADER.size:
+                raise ValueError("Snapshot file is truncated")
+            magic, version, _, count, fetched_at, base = _HEADER.unpack_from(self._buffer)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("Not a rate snapshot file (or an unsupported format version)")
+            rates_offset = _HEADER.size + count * CODE_WIDTH
+            if len(self._buffer) != rates_offset + count * 8:
+                raise ValueError("Snapshot file size does not match its header")
+        except ValueError:
+            self.close()
+            raise
+
+        self.fetched_at = fetched_at
+        self.base = base.rstrip(b"\0").decode("ascii")
+        self._rates_offset = rates_offset
+        self._codes = None
+        self._index = None
+        # Zero-copy view of the float64 array (little-endian, as on every supported platform)
+        self.rates = self._buffer[rates_offset:].cast("d")
+
+    @property
+    def codes(self):
+        """Currency codes in file order (decoded on first use)"""
+        if self._codes is None:
+            table = self._buffer[_HEADER.size:self._rates_offset].tobytes().decode("ascii")
+            self._codes = tuple(
+                table[i:i + CODE_WIDTH].rstrip("\0") for i in range(0, len(table), CODE_WIDTH)
+            )
+        return self._codes
+
+    @property
+    def index(self):
+        """Currency code -> position"""
+        if self._index is None:
+            self._index = {code: i for i, code in enumerate(self.codes)}
+        return self._index
+
+    def __len__(self):
+        return len(self.rates)
+
+    def position(self, currency_code):
+        """
+        Find a currency's position by searching the mapped code table in place
+        Raises: KeyError if the currency is not in the snapshot
+        """
+        if self._index is not None:
+            return self._index[currency_code]
+        key = currency_code.encode("ascii").ljust(CODE_WIDTH, b"\0")
+        start = _HEADER.size
+        while True:
+            found = self._mmap.find(key, start, self._rates_offset)
+            if found < 0:
+                raise KeyError(currency_code)
+            if (found - _HEADER.size) % CODE_WIDTH == 0:
+                return (found - _HEADER.size) // CODE_WIDTH
+            start = found + 1
+
+    def rate(self, currency_code):
+        """Get one rate from the base currency without decoding the rest of the file"""
+        return self.rates[self.position(currency_code)]
+
+    def as_dict(self):
+        """Copy into a plain dict, as returned by get_exchange_rates()"""
+        return dict(zip(self.codes, self.rates))
+
+    def to_numpy(self):
+        """Rates as a read-only numpy array sharing the mapped memory"""
+        import numpy as np
+
+        return np.frombuffer(self.rates, dtype="<f8")
+
+    def close(self):
+        """Unmap the file (fails if numpy arrays made by to_numpy() are still alive)"""
+        for view in ("rates", "_buffer"):
+            buffer = getattr(self, view, None)
+            if buffer is not None:
+                buffer.release()
+                setattr(self, view, None)
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_snapshot(path):
+    """
+    Load a snapshot file as plain data, or None if it is missing or invalid
+    Returns: tuple (rates: dict, fetched_at: float) or None
+    """
+    try:
+        with BinarySnapshot(path) as snapshot:
+            return snapshot.as_dict(), snapshot.fetched_at
+    except (OSError, ValueError):
+        return None
+
+
+def compare_with_json(currencies=160, loads=2000):
+    """
+    Compare loading a snapshot from the binary format and from API-style JSON
+    Returns: dict - per format: bytes on disk, seconds per load, bytes allocated per load
+    """
+    import json
+    import tempfile
+    import time
+    import tracemalloc
+
+    rates = {f"C{i:03d}": 1.0 + i / 7.0 for i in range(currencies)}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "rates.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"result": "success", "base_code": "USD", "rates": rates}, f)
+        binary_path = os.path.join(tmp, "rates.fxsn")
+        write_snapshot(binary_path, rates, time.time())
+
+        # Each loader opens the snapshot and looks one rate up, leaving it loaded
+        def load_json():
+            with open(json_path, "rb") as f:
+                loaded = json.loads(f.read())["rates"]
+            loaded["C042"]
+            return loaded
+
+        def load_binary():
+            loaded = BinarySnapshot(binary_path)
+            loaded.rate("C042")
+            return loaded
+
+        formats = (
+            ("json", json_path, load_json, lambda loaded: None),
+            ("binary", binary_path, load_binary, lambda loaded: loaded.close()),
+        )
+        for name, path, load, release in formats:
+            release(load())
+            start = time.perf_counter()
+            for _ in range(loads):
+                release(load())
+            elapsed = time.perf_counter() - start
+
+            # Python heap held by one loaded snapshot (mapped pages are shared page cache)
+            tracemalloc.start()
+            loaded = load()
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            release(loaded)
+
+            results[name] = {
+                "file_bytes": os.path.getsize(path),
+                "seconds_per_load": elapsed / loads,
+                "bytes_allocated": allocated,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binary snapshot vs JSON load benchmark")
+    parser.add_argument("--currencies", type=int, default=160)
+    parser.add_argument("--loads", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = compare_with_json(args.currencies, args.loads)
+    for name, result in results.items():
+        print(f"{name:<7} {result['file_bytes']:>8,} bytes on disk  "
+              f"{result['seconds_per_load'] * 1e6:>8.1f}µs per load  "
+              f"{result['bytes_allocated']:>8,} bytes of Python heap")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Bulk converter for large CSV/JSONL ledgers
+
+Streams rows with amount, from and to columns through the batch converter in
+fixed-size chunks, so memory use stays constant no matter how big the file is.
+
+Usage:
+    python -m bulk_convert ledger.csv -o converted.csv
+    python -m bulk_convert ledger.jsonl -o converted.jsonl --chunk-size 100000
+    cat ledger.csv | python -m bulk_convert - --format csv > converted.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from rate_matrix import RateMatrix
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def detect_format(path):
+    """Guess the ledger format from a file name (csv or jsonl)"""
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def read_rows(stream, fmt):
+    """
+    Lazily read ledger rows as dicts
+    Args:
+        stream: text file object
+        fmt: str - "csv" or "jsonl"
+    Returns: iterator of dict
+    """
+    if fmt == "csv":
+        return csv.DictReader(stream)
+    return (_parse_json_row(line) for line in stream if line.strip())
+
+
+def _parse_json_row(line):
+    """
+    Parse one JSONL line; a malformed or non-object line becomes a row that
+    fails to convert (kept as {"_raw": line}), like a bad CSV row
+    """
+    try:
+        row = json.loads(line)
+    except ValueError:
+        row = None
+    if not isinstance(row, dict):
+        return {"_raw": line.rstrip("\r\n")}
+    return row
+
+
+class RowWriter:
+    """Incremental CSV/JSONL writer that adds a converted column"""
+
+    def __init__(self, stream, fmt, result_column):
+        self._stream = stream
+        self._fmt = fmt
+        self._result_column = result_column
+        self._csv = None
+
+    def write(self, row, converted):
+        row[self._result_column] = converted
+        if self._fmt == "jsonl":
+            self._stream.write(json.dumps(row) + "\n")
+            return
+        # Extra CSV fields (DictReader's None key) are dropped; their row already failed
+        row.pop(None, None)
+        if self._csv is None:
+            self._csv = csv.DictWriter(self._stream, fieldnames=list(row.keys()), extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow(row)
+
+
+def _well_formed(row, columns):
+    """
+    Whether a row can be converted at all: no extra CSV fields (DictReader's
+    None key), no missing fields, and string currency codes (an integer code
+    is not a matrix position)
+    """
+    _, from_col, to_col = columns
+    return (
+        None not in row
+        and all(row.get(column) is not None for column in columns)
+        and isinstance(row[from_col], str)
+        and isinstance(row[to_col], str)
+    )
+
+
+def convert_chunk(rows, matrix, columns):
+    """
+    Convert one chunk of rows, vectorized when every row is valid
+    Currency codes are upper-cased like the service's batch endpoint.
+    Args:
+        rows: list of dict
+        matrix: RateMatrix
+        columns: tuple (amount, from, to) column names
+    Returns: list - converted float per row, or None for rows that failed
+    """
+    amount_col, from_col, to_col = columns
+    try:
+        if all(_well_formed(row, columns) for row in rows):
+            amounts = [float(row[amount_col]) for row in rows]
+            from_codes = [row[from_col].upper() for row in rows]
+            to_codes = [row[to_col].upper() for row in rows]
+            return matrix.convert_batch(amounts, from_codes, to_codes).tolist()
+    except (KeyError, ValueError, TypeError, IndexError):
+        pass
+
+    # Bad data somewhere in this chunk - fall back to row by row
+    results = []
+    for row in rows:
+        if not _well_formed(row, columns):
+            results.append(None)
+            continue
+        try:
+            results.append(matrix.convert(float(row[amount_col]), row[from_col].upper(), row[to_col].upper()))
+        except (KeyError, ValueError, TypeError, IndexError):
+            results.append(None)
+    return results
+
+
+def convert_stream(rows, writer, matrix, columns=("amount", "from", "to"), chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Convert a stream of rows chunk by chunk, writing results as they are ready
+    Args:
+        rows: iterator of dict - input rows
+        writer: RowWriter - receives every row with its converted value
+        matrix: RateMatrix - cross rates to use
+        columns: tuple (amount, from, to) column names
+        chunk_size: int - rows held in memory at a time
+    Returns: tuple (rows_processed: int, rows_failed: int)
+    """
+    processed = 0
+    failed = 0
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        for row, converted in zip(chunk, convert_chunk(chunk, matrix, columns)):
+            if converted is None:
+                failed += 1
+                writer.write(row, "")
+            else:
+                writer.write(row, converted)
+        processed += len(chunk)
+
+    return processed, failed
+
+
+def load_rates(rates_file=None):
+    """
+    Get rates once for the whole run
+    Args:
+        rates_file: str - optional JSON file with API-style {"rates": {...}} or a flat dict
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    if rates_file:
+        try:
+            with open(rates_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            return False, {}, f"Cannot read rates file: {str(e)}"
+        rates = data.get("rates", data) if isinstance(data, dict) else None
+        if not isinstance(rates, dict) or not rates:
+            return False, {}, "Rates file must hold a {\"rates\": {...}} object or a flat code -> rate object"
+        bad = [
+            code for code, rate in rates.items()
+            if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 < rate < float("inf")
+        ]
+        if bad:
+            return False, {}, f"Rates file has non-positive or non-numeric rates for: {', '.join(bad)}"
+        return True, rates, ""
+
+    from currency_core import get_exchange_rates
+    return get_exchange_rates()
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Convert currency amounts in large CSV/JSONL ledgers")
+    parser.add_argument("input", help="input ledger path, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output path (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="ledger format (default: from file name)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows converted per batch")
+    parser.add_argument("--amount-column", default="amount")
+    parser.add_argument("--from-column", default="from")
+    parser.add_argument("--to-column", default="to")
+    parser.add_argument("--result-column", default="converted")
+    parser.add_argument("--rates-file", help="use rates from a JSON file instead of the live API")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.input if args.input != "-" else args.output)
+
+    success, rates, error = load_rates(args.rates_file)
+    if not success:
+        print(f"❌ Failed to get exchange rates: {error}", file=sys.stderr)
+        return 1
+    matrix = RateMatrix.from_rates(rates)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+
+    start = time.perf_counter()
+    try:
+        processed, failed = convert_stream(
+            read_rows(source, fmt),
+            RowWriter(target, fmt, args.result_column),
+            matrix,
+            columns=(args.amount_column, args.from_column, args.to_column),
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    elapsed = time.perf_counter() - start
+
+    rate = processed / elapsed if elapsed > 0 else float("inf")
+    print(f"✅ Converted {processed:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)", file=sys.stderr)
+    if failed:
+        print(f"⚠️  {failed:,} rows could not be converted (left blank)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 # Configuration file for Currency Converter
 # Easy to modify for different currencies or API endpoints
 
+import os
+
 # API Configuration
-API_BASE_URL = "https://open.er-api.com/v6/latest"
+API_BASE_URL = os.environ.get("FX_API_BASE_URL", "https://open.er-api.com/v6/latest")
 BASE_CURRENCY = "USD"
 TARGET_CURRENCY = "INR"
 
@@ -18,8 +20,81 @@ AMOUNT_STEP = 0.01
 DECIMAL_PLACES = 2
 RATE_DECIMAL_PLACES = 4
 
+# Money Configuration
+ROUNDING_MODE = "ROUND_HALF_EVEN"  # any decimal module rounding mode except ROUND_05UP
+
 # Timeout Configuration
-API_TIMEOUT = 10  # seconds
+API_TIMEOUT = 10  # seconds, per attempt
+API_TOTAL_TIMEOUT = 20  # seconds, across all retries
+
+# HTTP Client Configuration
+API_MAX_RETRIES = 3  # retries after the first attempt
+API_RETRY_BACKOFF = 0.5  # seconds, base of the jittered exponential backoff
+API_POOL_SIZE = 10  # keep-alive connections kept per host
+
+# Rate Provider Configuration
+BACKUP_API_URL = os.environ.get("FX_BACKUP_API_URL") or None  # any JSON API with {"rates": {...}} from BASE_CURRENCY
+RATES_FILE = os.environ.get("FX_RATES_FILE") or None  # local JSON rates file used as a last-resort provider
+HEDGE_DELAY = 1.0  # seconds to wait on a provider before also asking the next one
+
+# Rate Cache Configuration
+RATE_CACHE_TTL = 300  # seconds a fetched snapshot is considered fresh
+RATE_CACHE_MAX_STALE = 3600  # seconds a stale snapshot may still be served while refreshing
+
+# Upstream Rate Limiting Configuration (protects the free API's quota)
+UPSTREAM_RATE = 0.2  # upstream fetches per second on average (one per 5 seconds)
+UPSTREAM_BURST = 5  # fetches allowed back to back before UPSTREAM_RATE applies
+COALESCE_WINDOW = 2.0  # seconds a finished fetch's result is shared with new callers
+SESSION_CONVERT_RATE = 1.0  # Convert clicks per second allowed per browser session
+SESSION_CONVERT_BURST = 10  # Convert clicks a session may make back to back
+
+# Background Refresher Configuration
+REFRESHER_ENABLED = True  # keep rates fresh from a background thread
+REFRESH_MIN_INTERVAL = 5  # seconds, shortest gap between polls
+REFRESH_MAX_INTERVAL = 240  # seconds, longest gap between polls (keep below RATE_CACHE_TTL)
+REFRESH_RETRY_INTERVAL = 5  # seconds, first retry delay after a failure (doubles per failure)
+
+# Rate History Configuration
+RATE_HISTORY_DIR = os.environ.get(
+    "FX_RATE_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rate_history"),
+) or None  # empty/None disables
+
+# Metrics Configuration
+METRICS_ENABLED = False  # instrument hot paths and serve Prometheus metrics
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108  # http://127.0.0.1:9108/metrics
+
+# Service Configuration (python service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_WORKERS = 1  # pre-forked worker processes
+SERVICE_MAX_BATCH = 100000  # conversions per /convert/batch request
+SERVICE_MAX_BODY = 16 * 1024 * 1024  # bytes
+
+# Rate Change Streaming Configuration (GET /rates/stream)
+CHANGE_THRESHOLD = 0.0001  # minimum relative move pushed to subscribers (0.0001 = 0.01%)
+CHANGE_THRESHOLDS = {}  # per-currency overrides, e.g. {"JPY": 0.001}
+STREAM_QUEUE_SIZE = 100  # events a subscriber may fall behind before it is disconnected
+STREAM_HEARTBEAT = 15  # seconds between keep-alive comments on idle streams
+
+# Rate Consistency Check Configuration (runs on every new snapshot)
+CONSISTENCY_CHECK_ENABLED = True
+CONSISTENCY_TOLERANCE = 0.0001  # relative cross-rate error reported as inconsistent (0.0001 = 1bp)
+CONSISTENCY_OUTLIER_Z = 5.0  # robust z-score at which a currency disagrees with the reference provider
+CONSISTENCY_REFERENCE = os.environ.get("FX_CONSISTENCY_REFERENCE") or None  # provider to compare with, e.g. "backup-api" or "rates-file"
+
+# Snapshot Store Configuration
+SNAPSHOT_DB_PATH = os.environ.get(
+    "FX_SNAPSHOT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rate_snapshots.sqlite3"),
+) or None  # empty/None disables
+BINARY_SNAPSHOT_PATH = os.environ.get(
+    "FX_BINARY_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rate_snapshot.fxsn"),
+) or None  # latest snapshot in the mmap-able binary format; empty/None disables
+SNAPSHOT_KEEP = 100  # most recent snapshots kept on disk
+SNAPSHOT_MAX_STALENESS = 7 * 24 * 3600  # seconds a saved snapshot may be used when the API is down
 
 # Error Messages
 ERROR_MESSAGES = {
@@ -0,0 +1,668 @@
+"""
+Currency conversion core: rate fetching, caching and conversion
+
+Everything the converter does apart from rendering lives here, free of
+Streamlit, so scripts, batch jobs and the service can import it directly;
+app.py is a thin UI on top. Heavy dependencies (requests, numpy) are
+imported on first use, so importing this module just to call
+convert_currency_multi() costs milliseconds rather than the UI's startup.
+"""
+
+import json
+import threading
+import time
+
+import config
+import http_client
+import metrics
+from binary_snapshot import load_snapshot, write_snapshot
+from providers import CallableProvider, FileProvider, HTTPProvider, HedgedFetcher, shared_fetcher
+from rate_cache import shared_cache
+from rate_changes import ChangeBroadcaster
+from rate_limiter import RateLimited, TokenBucket, UpstreamGate, shared_gate
+from rate_refresher import shared_refresher
+from snapshot_store import SnapshotStore
+
+# Display metadata for well-known currencies (every currency the API quotes is
+# supported; these are listed first and shown with a symbol and name)
+SUPPORTED_CURRENCIES = {
+    "USD": {"name": "US Dollar", "symbol": "$"},
+    "INR": {"name": "Indian Rupee", "symbol": "₹"},
+    "EUR": {"name": "Euro", "symbol": "€"},
+    "GBP": {"name": "British Pound", "symbol": "£"},
+    "JPY": {"name": "Japanese Yen", "symbol": "¥"},
+    "AUD": {"name": "Australian Dollar", "symbol": "A$"},
+    "CAD": {"name": "Canadian Dollar", "symbol": "C$"},
+    "CHF": {"name": "Swiss Franc", "symbol": "CHF"},
+    "CNY": {"name": "Chinese Yuan", "symbol": "¥"},
+    "SGD": {"name": "Singapore Dollar", "symbol": "S$"}
+}
+
+
+# Hot-path instrumentation (no-ops unless config.METRICS_ENABLED)
+FETCH_SECONDS = metrics.histogram("fx_upstream_fetch_seconds", "Time spent fetching rates from the API")
+FETCH_ERRORS = metrics.counter("fx_upstream_errors_total", "Failed rate fetches by error type", ["type"])
+LOOKUP_SECONDS = metrics.histogram("fx_rate_lookup_seconds", "Time to get rates through the shared cache")
+CONVERT_SECONDS = metrics.histogram("fx_convert_seconds", "Time per convert_currency_multi call")
+CONVERT_BATCH_SECONDS = metrics.histogram("fx_convert_batch_seconds", "Time per convert_currency_batch call")
+UPSTREAM_REQUESTS = metrics.counter(
+    "fx_upstream_requests_total", "Upstream fetch requests by outcome (issued, coalesced, limited)", ["outcome"]
+)
+
+
+def get_api_url(base_currency=None):
+    """Build the latest-rates URL for a base currency (default config.BASE_CURRENCY)"""
+    return f"{config.API_BASE_URL}/{base_currency or config.BASE_CURRENCY}"
+
+
+def parse_rates(data):
+    """
+    Extract every quoted rate from an API response document
+    Args:
+        data: dict - parsed JSON from the API
+    Returns: dict - currency code -> rate (non-numeric or non-positive rates are skipped)
+    Raises: KeyError if the document has no 'rates'
+    """
+    # Exact type check: cheaper than isinstance and rejects JSON true/false
+    return {
+        currency: rate
+        for currency, rate in data['rates'].items()
+        if type(rate) in (float, int) and rate > 0
+    }
+
+
+@metrics.timed(FETCH_SECONDS)
+def fetch_exchange_rates(base_currency=None):
+    """
+    Fetch live exchange rates from the API for every currency it quotes
+    (always goes to the network - use get_exchange_rates() instead)
+    Args:
+        base_currency: str - currency the rates are quoted from (default config.BASE_CURRENCY)
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    import requests  # deferred: only callers that hit the network pay for it
+    
+    try:
+        # Fetch base to all currencies through the pooled, retrying client
+        # (unchanged responses come back without being downloaded or parsed again)
+        data = http_client.fetch_json(get_api_url(base_currency))
+        
+        # Extract every quoted rate
+        rates = parse_rates(data)
+        
+        if not rates:
+            return False, {}, "No exchange rates found in API response"
+        
+        return True, rates, ""
+        
+    except (json.JSONDecodeError, requests.exceptions.JSONDecodeError) as e:
+        # Before RequestException: requests' JSONDecodeError subclasses it too
+        FETCH_ERRORS.inc(type="json")
+        return False, {}, f"Invalid response from API: {str(e)}"
+    except requests.exceptions.RequestException as e:
+        FETCH_ERRORS.inc(type="network")
+        return False, {}, f"Network error: {str(e)}"
+    except KeyError as e:
+        FETCH_ERRORS.inc(type="format")
+        return False, {}, f"Unexpected API response format: {str(e)}"
+    except Exception as e:
+        FETCH_ERRORS.inc(type="other")
+        return False, {}, f"Unexpected error: {str(e)}"
+
+
+def _snapshot_store():
+    """On-disk snapshot store, or None when disabled in config"""
+    if not config.SNAPSHOT_DB_PATH:
+        return None
+    return SnapshotStore(config.SNAPSHOT_DB_PATH, keep=config.SNAPSHOT_KEEP)
+
+
+# One RateHistory per directory, so its mapped columns are reused across calls
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_rate_history():
+    """Historical rate store, or None when disabled in config"""
+    if not config.RATE_HISTORY_DIR:
+        return None
+    from rate_history import RateHistory  # numpy is loaded on first use
+    with _histories_lock:
+        history = _histories.get(config.RATE_HISTORY_DIR)
+        if history is None:
+            history = RateHistory(config.RATE_HISTORY_DIR)
+            _histories[config.RATE_HISTORY_DIR] = history
+        return history
+
+
+def _rate_fetcher():
+    """
+    Process-wide hedged fetcher over the configured rate providers
+    (the main API first, then config.BACKUP_API_URL; config.RATES_FILE is
+    only read once both have failed)
+    """
+    def build():
+        providers = [CallableProvider("open.er-api.com", fetch_exchange_rates)]
+        if config.BACKUP_API_URL:
+            providers.append(HTTPProvider("backup-api", config.BACKUP_API_URL, config.BASE_CURRENCY))
+        if config.RATES_FILE:
+            providers.append(FileProvider("rates-file", config.RATES_FILE))
+        return HedgedFetcher(
+            providers,
+            hedge_delay=config.HEDGE_DELAY,
+            timeout=config.API_TOTAL_TIMEOUT + config.API_TIMEOUT,
+        )
+    return shared_fetcher("latest", build)
+
+
+def get_provider_stats():
+    """
+    Get per-provider latency and error statistics
+    Returns: dict - provider name -> latency_seconds, error_rate, requests, errors, wins, last_error
+    """
+    return _rate_fetcher().stats()
+
+
+def _upstream_gate(base_currency=None):
+    """
+    Process-wide coalescing gate and token bucket in front of the rate providers,
+    one per base currency (see config.UPSTREAM_RATE, UPSTREAM_BURST and COALESCE_WINDOW)
+    """
+    base_currency = base_currency or config.BASE_CURRENCY
+    return shared_gate(
+        "latest" if base_currency == config.BASE_CURRENCY else f"latest-{base_currency}",
+        lambda: UpstreamGate(
+            TokenBucket(config.UPSTREAM_RATE, config.UPSTREAM_BURST),
+            window=config.COALESCE_WINDOW,
+            on_outcome=lambda outcome: UPSTREAM_REQUESTS.inc(outcome=outcome),
+        ),
+    )
+
+
+def get_upstream_stats():
+    """
+    Get upstream request counters
+    Returns: dict - issued (went upstream), coalesced (shared another fetch's result),
+             limited (refused by the token bucket), tokens (fetches available now)
+    """
+    return _upstream_gate().stats()
+
+
+def _fetch_upstream(base_currency=None):
+    """
+    Fetch rates through the upstream gate: concurrent and back-to-back fetches
+    share one provider request, and the rest are paced by the token bucket
+    Args:
+        base_currency: str - currency the rates are quoted from (default config.BASE_CURRENCY);
+                       other bases go straight to the main API, with a gate of their own
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    if base_currency and base_currency != config.BASE_CURRENCY:
+        def fetch():
+            return fetch_exchange_rates(base_currency)
+    else:
+        fetch = _rate_fetcher().fetch
+    try:
+        return _upstream_gate(base_currency).call(fetch)
+    except RateLimited as e:
+        return False, {}, str(e)
+
+
+def _load_exchange_rates():
+    """
+    Cache loader: fetch from the fastest healthy provider (through the upstream
+    gate) and persist every good snapshot to disk
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    success, rates, error = _fetch_upstream()
+    if success:
+        # Backup providers and rate files are validated like the main API
+        rates = parse_rates({'rates': rates})
+        if not rates:
+            return False, {}, "No exchange rates found in provider response"
+        if rates == _rate_cache().peek():
+            # Unchanged (e.g. revalidated with a 304): the cache keeps its snapshot, nothing to persist
+            return success, rates, error
+        fetched_at = time.time()
+        store = _snapshot_store()
+        if store is not None:
+            store.save(rates, fetched_at)
+        if config.BINARY_SNAPSHOT_PATH:
+            try:
+                write_snapshot(config.BINARY_SNAPSHOT_PATH, rates, fetched_at, config.BASE_CURRENCY)
+            except (OSError, ValueError):
+                pass  # like the SQLite store, disk problems never fail a fetch
+        try:
+            history = get_rate_history()
+            if history is not None:
+                history.append(rates, fetched_at)
+        except (OSError, ValueError):
+            pass  # nor does an unwritable history directory
+    return success, rates, error
+
+
+def _prime_from_disk(cache):
+    """Load the newest saved snapshot so startup does not wait for the API"""
+    # The binary snapshot loads without parsing; SQLite keeps older ones as a fallback
+    snapshot = load_snapshot(config.BINARY_SNAPSHOT_PATH) if config.BINARY_SNAPSHOT_PATH else None
+    if snapshot is None:
+        store = _snapshot_store()
+        snapshot = store.latest() if store is not None else None
+    if snapshot is not None:
+        rates, fetched_at = snapshot
+        if time.time() - fetched_at < config.SNAPSHOT_MAX_STALENESS:
+            cache.prime(rates, fetched_at)
+
+
+def _setup_rate_cache(cache):
+    """One-time cache setup: check every new snapshot, then load the newest one from disk"""
+    if config.CONSISTENCY_CHECK_ENABLED:
+        cache.add_listener(_check_new_snapshot)
+    _prime_from_disk(cache)
+
+
+def _rate_cache():
+    """Process-wide rate cache shared by all Streamlit sessions"""
+    return shared_cache(
+        "latest",
+        _load_exchange_rates,
+        ttl=config.RATE_CACHE_TTL,
+        max_stale=config.RATE_CACHE_MAX_STALE,
+        fallback_max_age=config.SNAPSHOT_MAX_STALENESS,
+        on_create=_setup_rate_cache,
+    )
+
+
+@metrics.timed(LOOKUP_SECONDS)
+def get_exchange_rates():
+    """
+    Get exchange rates for every quoted currency through the shared cache
+    Fresh rates are served from memory, stale rates are served while a single
+    background refresh runs, and concurrent misses share one upstream fetch.
+    When the API is down, the last saved snapshot is used up to
+    config.SNAPSHOT_MAX_STALENESS seconds old.
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    return _rate_cache().get()
+
+
+async def aget_exchange_rates(base_currency=None):
+    """
+    Async counterpart of get_exchange_rates() for asyncio services
+    Default-base rates come from the same shared cache as sync callers (served
+    without leaving the event loop when possible); fetches run on the shared
+    HTTP pool so the event loop is never blocked.
+    Args:
+        base_currency: str - currency the rates are quoted from (default config.BASE_CURRENCY)
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    if base_currency and base_currency != config.BASE_CURRENCY:
+        return await http_client.run_blocking(_fetch_upstream, base_currency)
+
+    cache = _rate_cache()
+    result = cache.get_nowait()
+    if result is not None:
+        return result
+    return await http_client.run_blocking(cache.refresh)
+
+
+async def aget_exchange_rates_many(base_currencies):
+    """
+    Fetch rates for several base currencies concurrently
+    Args:
+        base_currencies: iterable of str - base currency codes
+    Returns: dict - base currency -> (success: bool, rates: dict, error_message: str)
+    """
+    import asyncio
+    
+    base_currencies = list(base_currencies)
+    results = await asyncio.gather(*(aget_exchange_rates(base) for base in base_currencies))
+    return dict(zip(base_currencies, results))
+
+
+def start_rate_refresher():
+    """
+    Start the background refresher once per process (safe to call on every rerun)
+    Returns: RateRefresher
+    """
+    return shared_refresher(
+        "latest",
+        _rate_cache(),
+        next_update=lambda: http_client.next_update(get_api_url()),
+        min_interval=config.REFRESH_MIN_INTERVAL,
+        max_interval=config.REFRESH_MAX_INTERVAL,
+        retry_interval=config.REFRESH_RETRY_INTERVAL,
+    )
+
+
+@metrics.timed(LOOKUP_SECONDS)
+def get_current_rates():
+    """
+    Get rates for the convert path without network I/O when the refresher has
+    already loaded a snapshot; waits for the upstream only when cold
+    Returns: tuple (success: bool, rates: dict, error_message: str)
+    """
+    cache = _rate_cache()
+    result = cache.get_nowait()
+    if result is not None:
+        return result
+    return cache.refresh()
+
+
+def get_current_snapshot():
+    """
+    Like get_current_rates(), but return the shared immutable RateSnapshot
+    Returns: tuple (success: bool, snapshot: RateSnapshot or None, error_message: str)
+    """
+    success, _, error = get_current_rates()
+    snapshot = _rate_cache().current() if success else None
+    if snapshot is None:
+        return False, None, error or "No rates snapshot available"
+    return True, snapshot, ""
+
+
+def get_rate_snapshot(snapshot_id=None):
+    """
+    Look up a shared RateSnapshot without network I/O
+    Sessions store only a snapshot's id and resolve it here on each rerun.
+    Args:
+        snapshot_id: int - RateSnapshot.id (default: the current snapshot)
+    Returns: RateSnapshot, or None if there is none yet or it has been evicted
+    """
+    cache = _rate_cache()
+    if snapshot_id is None:
+        return cache.current()
+    return cache.get_snapshot(snapshot_id)
+
+
+# Change broadcaster shared by every stream in this process
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_rate_broadcaster():
+    """
+    Process-wide change broadcaster fed by every new rate snapshot
+    Returns: ChangeBroadcaster
+    """
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = ChangeBroadcaster(
+                threshold=config.CHANGE_THRESHOLD,
+                thresholds=config.CHANGE_THRESHOLDS,
+                max_queue=config.STREAM_QUEUE_SIZE,
+            )
+            cache = _rate_cache()
+            rates, fetched_at, version = cache.snapshot()
+            if rates is not None:
+                _broadcaster.on_snapshot(rates, fetched_at, version)
+            cache.add_listener(_broadcaster.on_snapshot)
+        return _broadcaster
+
+
+# Latest consistency report, refreshed with every new snapshot
+_consistency_report = None
+_consistency_lock = threading.Lock()
+
+
+def _reference_rates():
+    """
+    Fetch a snapshot from config.CONSISTENCY_REFERENCE for comparison
+    Returns: tuple (rates: dict or None, error_message: str)
+    """
+    for provider in _rate_fetcher().providers:
+        if provider.name == config.CONSISTENCY_REFERENCE:
+            success, rates, error = provider.fetch()
+            return (parse_rates({'rates': rates}), "") if success else (None, error)
+    return None, f"No rate provider named {config.CONSISTENCY_REFERENCE!r}"
+
+
+def check_rate_consistency(rates=None, reference=None):
+    """
+    Check a snapshot's cross rates for triangular inconsistencies and,
+    optionally, for currencies that disagree with a second provider
+    Args:
+        rates: dict - exchange rates from USD (default: the cached snapshot)
+        reference: dict - another provider's snapshot, in any base
+    Returns: dict - see rate_consistency.check_snapshot(), or None when there are no rates
+    """
+    from rate_consistency import check_snapshot  # numpy is loaded on first use
+
+    if rates is None:
+        rates = _rate_cache().peek()
+    if not rates:
+        return None
+    return check_snapshot(
+        rates,
+        reference,
+        tolerance=config.CONSISTENCY_TOLERANCE,
+        outlier_z=config.CONSISTENCY_OUTLIER_Z,
+    )
+
+
+def _check_new_snapshot(rates, fetched_at=None, version=None):
+    """RateCache listener: check each new snapshot and keep the report"""
+    def check():
+        global _consistency_report
+        reference, error = _reference_rates() if config.CONSISTENCY_REFERENCE else (None, "")
+        report = check_rate_consistency(rates, reference)
+        if report is None:
+            return
+        report["version"] = version
+        if error:
+            report["reference_error"] = error
+        with _consistency_lock:
+            if _consistency_report is None or (version or 0) >= (_consistency_report["version"] or 0):
+                _consistency_report = report
+
+    if config.CONSISTENCY_REFERENCE:
+        # Fetching the reference takes a network round trip: keep it off the refresh path
+        threading.Thread(target=check, name="rate-consistency", daemon=True).start()
+    else:
+        check()
+
+
+def get_rate_consistency():
+    """
+    Get the consistency report for the newest checked snapshot
+    Returns: dict - see check_rate_consistency() plus version, or None before the first check
+    """
+    with _consistency_lock:
+        return _consistency_report
+
+
+def get_refresher_health():
+    """
+    Get background refresher health
+    Returns: dict - running, last_attempt, last_success, consecutive_failures, last_error, next_run
+    """
+    return start_rate_refresher().health() if config.REFRESHER_ENABLED else {"running": False}
+
+
+def get_rate_cache_stats():
+    """
+    Get rate cache counters for monitoring
+    Returns: dict - hits, stale_hits, misses, fetches, fetch_errors, age_seconds
+    """
+    return _rate_cache().stats()
+
+
+CONSISTENCY_ERROR = metrics.gauge(
+    "fx_rate_consistency_max_error", "Largest relative cross-rate inconsistency in the current snapshot",
+    lambda: (get_rate_consistency() or {}).get("max_error", 0.0),
+)
+REFERENCE_OUTLIERS = metrics.gauge(
+    "fx_rate_reference_outliers", "Currencies disagreeing with the reference provider",
+    lambda: len(((get_rate_consistency() or {}).get("reference") or {}).get("outliers", {})),
+)
+
+# Cache counters are read from the cache itself at scrape time
+for _stat in ("hits", "stale_hits", "misses", "fetches", "fetch_errors", "age_seconds"):
+    metrics.gauge(
+        f"fx_rate_cache_{_stat}",
+        f"Rate cache {_stat.replace('_', ' ')}",
+        lambda stat=_stat: get_rate_cache_stats()[stat],
+    )
+
+
+def get_exchange_rate():
+    """
+    Fetch live exchange rate from the API (kept for backward compatibility)
+    Returns: tuple (success: bool, rate: float, error_message: str)
+    """
+    # Through the upstream gate, so it shares in-flight and recent fetches
+    success, rates, error = _fetch_upstream()
+    if not success:
+        return False, 0, error
+
+    # Extract INR rate (USD to INR)
+    if 'INR' not in rates:
+        FETCH_ERRORS.inc(type="format")
+        return False, 0, "Unexpected API response format: 'INR'"
+    return True, rates['INR'], ""
+
+
+@metrics.timed(CONVERT_SECONDS)
+def convert_currency_multi(amount, from_currency, to_currency, rates):
+    """
+    Convert currency between any two supported currencies
+    Args:
+        amount: float - amount to convert
+        from_currency: str - source currency code
+        to_currency: str - target currency code
+        rates: dict - exchange rates from USD
+    Returns: float - converted amount
+    """
+    if from_currency == to_currency:
+        return amount
+    
+    if from_currency == "USD":
+        # Converting from USD to another currency
+        return amount * rates[to_currency]
+    elif to_currency == "USD":
+        # Converting from another currency to USD
+        return amount / rates[from_currency]
+    else:
+        # Converting between two non-USD currencies
+        # First convert to USD, then to target currency
+        usd_amount = amount / rates[from_currency]
+        return usd_amount * rates[to_currency]
+
+
+def get_rate_matrix(rates):
+    """
+    Get the precomputed cross-rate matrix for a rates snapshot
+    Args:
+        rates: dict - exchange rates from USD
+    Returns: RateMatrix - built once per snapshot, ordered like get_currency_index()
+    """
+    from rate_matrix import matrix_for  # numpy is loaded on first use
+    return matrix_for(rates, get_currency_index(rates).codes)
+
+
+def get_currency_index(rates=None):
+    """
+    Get the precomputed currency index (codes, positions, labels, symbols,
+    minor units) for a rates snapshot, rebuilt only when the currency set changes
+    Args:
+        rates: dict - exchange rates from USD (default: the cached snapshot, or
+               the well-known currencies before the first snapshot is loaded)
+    Returns: CurrencyIndex
+    """
+    from currency_index import index_for
+    
+    if rates is None:
+        rates = _rate_cache().peek() or SUPPORTED_CURRENCIES
+    return index_for(rates, SUPPORTED_CURRENCIES)
+
+
+def get_snapshot_id(rates):
+    """
+    Identify a rates snapshot, e.g. as a memoization key
+    Args:
+        rates: dict - exchange rates from USD
+    Returns: str - the cache version while rates is the cached snapshot, else a content hash
+    """
+    cached_rates, _, version = _rate_cache().snapshot()
+    if rates is cached_rates:
+        return f"v{version}"
+    return f"h{hash(tuple(sorted(rates.items())))}"
+
+
+def get_rate_board(rates, amount=1.0, codes=None):
+    """
+    Get every pairwise conversion for a snapshot in one table
+    Args:
+        rates: dict - exchange rates from USD
+        amount: float - amount of each row currency to convert
+        codes: iterable of str - currencies to include, in order (default: all)
+    Returns: tuple (codes: tuple, table: numpy 2-D array) - table[i, j] is amount of
+             codes[i] expressed in codes[j]
+    Raises: KeyError for a currency missing from rates
+    """
+    matrix = get_rate_matrix(rates)
+    if codes is None:
+        return matrix.codes, matrix.matrix * amount
+    codes = tuple(codes)
+    if not codes:
+        return codes, matrix.matrix[:0, :0]
+    positions = matrix.indices(list(codes))
+    return codes, matrix.matrix[positions][:, positions] * amount
+
+
+@metrics.timed(CONVERT_BATCH_SECONDS)
+def convert_currency_batch(amounts, from_currencies, to_currencies, rates):
+    """
+    Convert many amounts at once (vectorized convert_currency_multi)
+    Args:
+        amounts: array-like of float - amounts to convert
+        from_currencies: array-like of str (or a single str) - source currency codes
+        to_currencies: array-like of str (or a single str) - target currency codes
+        rates: dict - exchange rates from USD
+    Returns: numpy array - converted amounts
+    """
+    return get_rate_matrix(rates).convert_batch(amounts, from_currencies, to_currencies)
+
+
+def convert_currency_as_of_batch(amounts, from_currencies, to_currencies, timestamps):
+    """
+    Convert many amounts at the historical rates in effect at each row's time
+    Args:
+        amounts: array-like of float - amounts to convert
+        from_currencies: array-like of str - source currency codes
+        to_currencies: array-like of str - target currency codes
+        timestamps: array-like - unix seconds, datetime64 or ISO date strings per row
+    Returns: numpy array - converted amounts (NaN where no rate was recorded yet)
+    """
+    history = get_rate_history()
+    if history is None:
+        raise RuntimeError("Rate history is disabled (config.RATE_HISTORY_DIR)")
+    return history.convert_as_of(amounts, from_currencies, to_currencies, timestamps)
+
+
+def convert_currency(amount, conversion_type, exchange_rate):
+    """
+    Convert currency based on type and exchange rate (kept for backward compatibility)
+    Args:
+        amount: float - amount to convert
+        conversion_type: str - "INR_to_USD" or "USD_to_INR"
+        exchange_rate: float - USD to INR rate
+    Returns: float - converted amount
+    """
+    if conversion_type == "INR_to_USD":
+        # Convert INR to USD (divide by rate)
+        return amount / exchange_rate
+    else:
+        # Convert USD to INR (multiply by rate)
+        return amount * exchange_rate
+
+
+def get_currency_symbol(currency_code):
+    """Get currency symbol for display"""
+    return SUPPORTED_CURRENCIES.get(currency_code, {}).get("symbol", currency_code)
+
+
+def get_currency_name(currency_code):
+    """Get full currency name for display"""
+    return SUPPORTED_CURRENCIES.get(currency_code, {}).get("name", currency_code)
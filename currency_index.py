@@ -0,0 +1,95 @@
+"""
+Currency index for the full upstream currency set
+
+The API quotes ~160 currencies. Everything the UI needs per currency -
+position, display label, symbol, minor unit - is computed once per set of
+codes, so rendering selectboxes and looking up currencies costs O(1) per
+rerun no matter how many currencies there are.
+"""
+
+import threading
+
+from money import minor_unit
+from rate_cache import FrozenRates
+
+
+class CurrencyIndex:
+    """Immutable lookup tables for one set of currency codes"""
+
+    def __init__(self, codes, info=None):
+        """
+        Args:
+            codes: iterable of str - currency codes in display order
+            info: dict - code -> {"name": ..., "symbol": ...} for codes with display metadata
+        """
+        info = info or {}
+        self.codes = tuple(codes)
+        self.position = {code: i for i, code in enumerate(self.codes)}
+        self.names = {code: info.get(code, {}).get("name", code) for code in self.codes}
+        self.symbols = {code: info.get(code, {}).get("symbol", code) for code in self.codes}
+        self.minor_units = {code: minor_unit(code) for code in self.codes}
+        self.labels = {
+            code: f"{self.symbols[code]} {code} - {self.names[code]}" if code in info else code
+            for code in self.codes
+        }
+
+    @classmethod
+    def from_rates(cls, rates, info=None):
+        """
+        Build an index for a rates snapshot
+        Known currencies (those in info) come first in their configured order,
+        then every other quoted currency alphabetically.
+        Args:
+            rates: dict - exchange rates from USD
+            info: dict - display metadata per currency code
+        Returns: CurrencyIndex
+        """
+        info = info or {}
+        known = [code for code in info if code in rates]
+        others = sorted(code for code in rates if code not in info)
+        return cls(known + others, info)
+
+    def label(self, code):
+        """Display label for a code (usable directly as a selectbox format_func)"""
+        return self.labels.get(code, code)
+
+    def __contains__(self, code):
+        return code in self.position
+
+    def __len__(self):
+        return len(self.codes)
+
+
+_memo_lock = threading.Lock()
+_memo_codes = None
+_memo_info = None
+_memo_index = None
+_memo_frozen = (None, None, None)  # (rates, info, index), read as one tuple
+
+
+def index_for(rates, info=None):
+    """
+    Get the CurrencyIndex for a rates snapshot, rebuilding it only when the
+    set of quoted currencies (or the display metadata) changes - rate
+    updates alone reuse the index
+    Args:
+        rates: dict - exchange rates from USD
+        info: dict - display metadata per currency code
+    Returns: CurrencyIndex
+    """
+    global _memo_codes, _memo_info, _memo_index, _memo_frozen
+
+    # A shared snapshot cannot change: passing the same one again is a constant-time hit
+    frozen = isinstance(rates, FrozenRates)
+    memo_rates, memo_info, memo_index = _memo_frozen
+    if frozen and memo_rates is rates and memo_info is info:
+        return memo_index
+
+    # Otherwise keyed on the codes, not the dict object, so in-place changes are seen
+    codes = tuple(rates)
+    with _memo_lock:
+        if codes != _memo_codes or info is not _memo_info:
+            _memo_index = CurrencyIndex.from_rates(rates, info)
+            _memo_codes, _memo_info = codes, info
+        _memo_frozen = (rates, info, _memo_index) if frozen else (None, None, None)
+        return _memo_index
@@ -4,7 +4,7 @@ Demo script for Currency Converter
 This script demonstrates the core functionality without starting Streamlit
 """
 
-from app import get_exchange_rate, convert_currency, get_exchange_rates, convert_currency_multi
+from currency_core import get_exchange_rate, convert_currency, get_exchange_rates, convert_currency_multi
 
 def demo_conversions():
     """Demonstrate various currency conversions"""
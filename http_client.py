@@ -0,0 +1,182 @@
+"""
+Shared HTTP fetch layer for exchange rate APIs
+
+All rate fetchers go through one pooled requests.Session, so connections are
+kept alive between fetches. Requests are retried with jittered exponential
+backoff inside a total deadline, and responses are revalidated with
+ETag/Last-Modified and the API's time_next_update_unix, so unchanged rates
+are neither downloaded nor parsed again.
+
+requests and asyncio are imported on first use, so importing this module
+(e.g. for a CLI that never touches the network) stays cheap.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import metrics
+
+# Status codes worth retrying (rate limited or temporary server trouble)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+HTTP_REQUESTS = metrics.counter("fx_http_requests_total", "HTTP requests to rate APIs by status", ["status"])
+PARSE_SECONDS = metrics.histogram("fx_http_parse_seconds", "Time spent parsing rate API JSON bodies")
+
+_session = None
+_executor = None
+_session_lock = threading.Lock()
+
+# Last good response per URL: {"data", "etag", "last_modified", "next_update"}
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=config.API_POOL_SIZE,
+                pool_maxsize=config.API_POOL_SIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            _session = session
+        return _session
+
+
+def get_executor():
+    """
+    Return the process-wide thread pool used by async callers
+    Sized like the connection pool, so async fetches share its connections.
+    """
+    global _executor
+    with _session_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.API_POOL_SIZE,
+                thread_name_prefix="rate-fetch",
+            )
+        return _executor
+
+
+async def run_blocking(func, *args):
+    """Run a blocking fetch function on the shared pool without blocking the event loop"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+async def afetch_json(url):
+    """Async counterpart of fetch_json (same pool, retries and revalidation)"""
+    return await run_blocking(fetch_json, url)
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff delay for a retry attempt"""
+    return random.uniform(0, config.API_RETRY_BACKOFF * (2 ** attempt))
+
+
+def _remember(url, response, data):
+    next_update = data.get("time_next_update_unix") if isinstance(data, dict) else None
+    with _validators_lock:
+        _validators[url] = {
+            "data": data,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "next_update": next_update,
+        }
+
+
+def next_update(url):
+    """Return the unix time the API said it publishes new data for url (or None)"""
+    with _validators_lock:
+        cached = _validators.get(url)
+    return cached["next_update"] if cached else None
+
+
+def forget(url=None):
+    """Drop remembered responses for url (or for every URL)"""
+    with _validators_lock:
+        if url is None:
+            _validators.clear()
+        else:
+            _validators.pop(url, None)
+
+
+def fetch_json(url, timeout=None, total_timeout=None, max_retries=None):
+    """
+    GET a JSON document through the shared session
+    Args:
+        url: str - URL to fetch
+        timeout: float - per-attempt timeout (default config.API_TIMEOUT)
+        total_timeout: float - deadline for all attempts (default config.API_TOTAL_TIMEOUT)
+        max_retries: int - retries after the first attempt (default config.API_MAX_RETRIES)
+    Returns: parsed JSON - the previously parsed object when the document is unchanged
+    Raises: requests.exceptions.RequestException on network/HTTP errors,
+            ValueError if the body is not valid JSON
+    """
+    timeout = config.API_TIMEOUT if timeout is None else timeout
+    total_timeout = config.API_TOTAL_TIMEOUT if total_timeout is None else total_timeout
+    max_retries = config.API_MAX_RETRIES if max_retries is None else max_retries
+
+    with _validators_lock:
+        cached = _validators.get(url)
+
+    # The API tells us when it will publish new rates - no need to ask before then
+    if cached and cached["next_update"] and time.time() < cached["next_update"]:
+        return cached["data"]
+
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    import requests
+
+    session = get_session()
+    deadline = time.monotonic() + total_timeout
+    attempt = 0
+
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"Gave up on {url} after {total_timeout}s")
+
+            response = session.get(url, headers=headers, timeout=min(timeout, remaining))
+            HTTP_REQUESTS.inc(status=str(response.status_code))
+
+            if response.status_code == 304 and cached:
+                return cached["data"]
+            if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+                raise requests.exceptions.HTTPError(f"{response.status_code} from {url}", response=response)
+            response.raise_for_status()
+
+            with PARSE_SECONDS.time():
+                data = response.json()
+            _remember(url, response, data)
+            return data
+
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.HTTPError) as e:
+            status = getattr(e.response, "status_code", None)
+            retryable = status is None or status in RETRY_STATUS_CODES
+            delay = _backoff(attempt)
+            if not retryable or attempt >= max_retries or time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Load test for the Streamlit app with simulated concurrent users
+
+Each simulated user is its own Streamlit session (streamlit.testing AppTest)
+running app.py in this process against a local stub of the rates API, so the
+shared rate cache, upstream gate and st.cache_data behave as in production.
+Users load the page, then repeatedly convert a random pair or change the rate
+board amount. Every interaction is one script rerun; its wall time is what a
+user waits for (minus the browser round trip, which AppTest skips).
+
+AppTest swaps process-global runtime state on every run, so reruns go through
+one lock. That models a Streamlit server whose script threads share one GIL:
+latency includes queueing behind other sessions, and throughput is what one
+server process sustains. A rerun that waits on the upstream API holds the lock,
+which makes --cache-ttl 0 with --api-latency the worst case of a synchronous
+fetch in the button handler.
+
+The run ramps through the --users levels and reports, per level, interaction
+latency percentiles and throughput, then the throughput ceiling and the
+memory each extra session holds. Sessions keep only a snapshot id; the rates
+themselves are one shared RateSnapshot, and --memory-only reports both at
+1k concurrent sessions (a few minutes of page loads).
+
+Usage:
+    python loadtest_app.py --users 1 2 4 8 16 --duration 10
+    python loadtest_app.py --users 8 --api-latency 0.5 --cache-ttl 0
+    python loadtest_app.py --memory-only --memory-sessions 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import config
+from loadtest_service import percentile
+from stub_rates_server import StubRatesServer
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SESSION_TIMEOUT = 60  # seconds a single rerun may take before it counts as an error
+
+# AppTest is not thread-safe: one rerun at a time across all simulated users
+_run_lock = threading.Lock()
+
+
+def prepare_streamlit():
+    """
+    Make AppTest sessions behave like sessions of one Streamlit server
+    - one shared script bytecode cache, as the server has (AppTest would
+      otherwise compile app.py again on every rerun)
+    - no bare-mode warnings (one per rerun without a server runtime)
+    """
+    from streamlit import config as streamlit_config
+    from streamlit.logger import set_log_level
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    shared = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+    # The option survives Streamlit re-reading its config; set_log_level applies it now
+    streamlit_config.set_option("logger.level", "error")
+    set_log_level("error")
+
+
+def new_session():
+    """Create one simulated user session (not yet loaded)"""
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(APP_PATH, default_timeout=SESSION_TIMEOUT)
+
+
+def _interact(session, rng):
+    """
+    Perform one random user interaction
+    Returns: str - interaction kind ("convert", "limited" when the session's
+             Convert limiter refused it, or "board")
+    """
+    if rng.random() < 0.75:
+        codes = session.selectbox[0].options
+        session.selectbox[0].select_index(rng.randrange(len(codes)))
+        session.selectbox[1].select_index(rng.randrange(len(codes)))
+        session.number_input[0].set_value(round(rng.uniform(1, 1000), 2))
+        session.button[0].click().run()
+        if any("Too many conversions" in warning.value for warning in session.warning):
+            return "limited"
+        return "convert"
+    session.number_input(key="board_amount").set_value(round(rng.uniform(1, 100), 2)).run()
+    return "board"
+
+
+def _user(duration, think_time, seed, latencies, errors):
+    rng = random.Random(seed)
+    session = new_session()
+    start = time.perf_counter()
+    try:
+        with _run_lock:
+            session.run()
+    except Exception as e:
+        errors.append(type(e).__name__)
+        return
+    if session.exception:
+        errors.append(session.exception[0].message)
+        return
+    latencies.setdefault("load", []).append(time.perf_counter() - start)
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with _run_lock:
+                kind = _interact(session, rng)
+        except Exception as e:
+            # A broken session leaves instead of failing in a tight loop
+            errors.append(type(e).__name__)
+            return
+        if session.exception:
+            errors.append(session.exception[0].message)
+            return
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+
+def run_load(users, duration, think_time=0.0, seed=0):
+    """
+    Run `users` concurrent sessions for `duration` seconds
+    Args:
+        users: int - concurrent simulated users
+        duration: float - seconds of interactions after each user's page load
+        think_time: float - mean pause between a user's interactions (0 = back to back)
+        seed: int - base seed for the users' random choices
+    Returns: dict - users, interactions, errors, interactions_per_sec, and per
+             interaction kind: count, p50_ms, p90_ms, p99_ms
+    """
+    latencies = [{} for _ in range(users)]
+    errors = []
+    threads = [
+        threading.Thread(target=_user, args=(duration, think_time, seed + i, latencies[i], errors), daemon=True)
+        for i in range(users)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    by_kind = {}
+    for user_latencies in latencies:
+        for kind, values in user_latencies.items():
+            by_kind.setdefault(kind, []).extend(values)
+    interactions = sum(len(values) for kind, values in by_kind.items() if kind != "load")
+    results = {
+        "users": users,
+        "interactions": interactions,
+        "errors": len(errors),
+        "interactions_per_sec": interactions / elapsed,
+    }
+    for kind, values in sorted(by_kind.items()):
+        values.sort()
+        results[kind] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p90_ms": percentile(values, 0.90) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    return results
+
+
+def _deep_size(obj, seen):
+    """Bytes held by obj and everything it references that seen does not already hold"""
+    if id(obj) in seen or callable(obj) or isinstance(obj, type(sys)):
+        return 0  # counted already, or shared code (functions, clocks, modules)
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    else:
+        for name in getattr(type(obj), "__slots__", ()):
+            size += _deep_size(getattr(obj, name, None), seen)
+        size += _deep_size(getattr(obj, "__dict__", None), seen)
+    return size
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_profile(sessions=1000):
+    """
+    Memory held per concurrent session, and by the rates all sessions share
+    Every session loads the page and converts once, so it holds all the state
+    a session can have. Growth is measured as peak RSS rather than with
+    tracemalloc, which would slow a thousand page loads several-fold.
+    Args:
+        sessions: int - sessions to keep alive while measuring
+    Returns: dict - sessions, bytes_per_session (RSS growth: Streamlit's widget
+             state and element tree plus the app's), state_bytes_per_session
+             (the app's own session_state entries), state_bytes_by_key, shared_snapshot_bytes
+             (the RateSnapshot every session references, held once), currencies
+    """
+    import gc
+
+    from currency_core import get_rate_snapshot
+
+    def converted_session():
+        session = new_session().run()
+        session.button[0].click().run()
+        return session
+
+    # Warm up process-wide state (imports, rate cache, st.cache_data) first
+    converted_session()
+    gc.collect()
+    before = _peak_rss()
+    alive = [converted_session() for _ in range(sessions)]
+    gc.collect()
+    after = _peak_rss()
+
+    # The app's own keys; keyed widget values are Streamlit's and in the RSS figure
+    widget_keys = {"board_amount", "board_codes"}
+    by_key = {}
+    for session in alive:
+        for key, value in session.session_state.items():
+            if key not in widget_keys:
+                by_key[key] = by_key.get(key, 0) + _deep_size(value, set())
+    snapshot = get_rate_snapshot()
+    return {
+        "sessions": sessions,
+        "bytes_per_session": (after - before) / sessions,
+        "state_bytes_per_session": sum(by_key.values()) / sessions,
+        "state_bytes_by_key": {key: total / sessions for key, total in sorted(by_key.items())},
+        "shared_snapshot_bytes": _deep_size(snapshot, set()),
+        "currencies": len(snapshot.rates),
+    }
+
+
+def throughput_ceiling(levels):
+    """
+    Find where adding users stops adding throughput
+    Args:
+        levels: list of dict - run_load() results in increasing user order
+    Returns: dict - the level with the highest interactions_per_sec, plus
+             saturated_at: first user count that gained less than 10% over the previous level (or None)
+    """
+    best = max(levels, key=lambda level: level["interactions_per_sec"])
+    saturated_at = None
+    for previous, level in zip(levels, levels[1:]):
+        if level["interactions_per_sec"] < previous["interactions_per_sec"] * 1.1:
+            saturated_at = level["users"]
+            break
+    return {
+        "users": best["users"],
+        "interactions_per_sec": best["interactions_per_sec"],
+        "saturated_at": saturated_at,
+    }
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the Streamlit app with concurrent sessions")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrent users per level")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a user's interactions")
+    parser.add_argument("--memory-sessions", type=int, default=None,
+                        help="sessions kept alive for the memory profile (default 10, or 1000 with --memory-only)")
+    parser.add_argument("--memory-only", action="store_true", help="skip the load levels, only profile memory")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds the stub API waits per request")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="override RATE_CACHE_TTL (0 = fetch on every lookup)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+    if args.memory_sessions is None:
+        args.memory_sessions = 1000 if args.memory_only else 10
+
+    prepare_streamlit()
+
+    with StubRatesServer(latency=args.api_latency) as stub:
+        # Point the app at the stub and keep stub rates out of the on-disk snapshots
+        config.API_BASE_URL = stub.base_url
+        config.SNAPSHOT_DB_PATH = None
+        config.BINARY_SNAPSHOT_PATH = None
+        config.RATE_HISTORY_DIR = None
+        if args.cache_ttl is not None:
+            config.RATE_CACHE_TTL = args.cache_ttl
+            config.RATE_CACHE_MAX_STALE = 0
+
+        levels = [] if args.memory_only else [run_load(users, args.duration, args.think_time) for users in sorted(args.users)]
+        memory = memory_profile(args.memory_sessions)
+
+        from currency_core import get_upstream_stats
+        results = {
+            "levels": levels,
+            "ceiling": throughput_ceiling(levels) if levels else None,
+            "memory": memory,
+            "upstream": dict(get_upstream_stats(), stub_requests=stub.requests),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for level in levels:
+            print(f"👥 {level['users']:>3} users  {level['interactions']:>6,} interactions  "
+                  f"{level['errors']} errors  {level['interactions_per_sec']:>8.1f}/sec")
+            for kind in ("load", "convert", "limited", "board"):
+                if kind in level:
+                    stats = level[kind]
+                    print(f"   {kind:<8} n={stats['count']:<6} p50 {stats['p50_ms']:8.1f}ms  "
+                          f"p90 {stats['p90_ms']:8.1f}ms  p99 {stats['p99_ms']:8.1f}ms")
+        ceiling = results["ceiling"]
+        if ceiling:
+            saturated = f", saturated at {ceiling['saturated_at']} users" if ceiling["saturated_at"] else ""
+            print(f"📈 Ceiling: {ceiling['interactions_per_sec']:.1f} interactions/sec at {ceiling['users']} users{saturated}")
+        print(f"🧠 Memory at {memory['sessions']:,} concurrent sessions:")
+        print(f"   per session (RSS growth)      {memory['bytes_per_session'] / 1024:>10,.1f} KB")
+        state = ", ".join(f"{key} {size:,.0f} B" for key, size in memory["state_bytes_by_key"].items())
+        print(f"   app session state             {memory['state_bytes_per_session']:>10,.0f} B   ({state})")
+        print(f"   shared rate snapshot (once)   {memory['shared_snapshot_bytes'] / 1024:>10,.1f} KB  "
+              f"({memory['currencies']} currencies)")
+        print(f"   a rates copy per session      {memory['shared_snapshot_bytes'] * memory['sessions'] / 1024 ** 2:>10,.1f} MB  (avoided)")
+        upstream = results["upstream"]
+        print(f"🌐 Upstream: {upstream['stub_requests']} stub API requests "
+              f"({upstream['issued']} issued, {upstream['coalesced']} coalesced, {upstream['limited']} limited)")
+    return 0 if all(level["errors"] == 0 for level in levels) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
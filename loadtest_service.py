@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load test for the headless conversion service
+
+Drives the service with concurrent keep-alive clients for a fixed duration
+and reports requests/sec and latency percentiles. With --self-host it starts
+a stub rates API and the service locally, so it runs fully offline.
+
+Usage:
+    python loadtest_service.py --self-host --workers 4 --clients 32 --duration 10
+    python loadtest_service.py --url http://127.0.0.1:8080 --batch-size 1000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from stub_rates_server import DEFAULT_RATES, StubRatesServer
+
+CODES = list(DEFAULT_RATES)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _client(host, port, deadline, batch_size, latencies, errors):
+    rng = random.Random()
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    if batch_size:
+        body = json.dumps({
+            "amounts": [rng.uniform(1, 1000) for _ in range(batch_size)],
+            "from": [rng.choice(CODES) for _ in range(batch_size)],
+            "to": [rng.choice(CODES) for _ in range(batch_size)],
+        })
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if batch_size:
+                conn.request("POST", "/convert/batch", body, {"Content-Type": "application/json"})
+            else:
+                path = f"/convert?amount={rng.uniform(1, 1000):.2f}&from={rng.choice(CODES)}&to={rng.choice(CODES)}"
+                conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run_load(url, clients, duration, batch_size=0):
+    """
+    Run the load test
+    Returns: dict - requests, errors, requests_per_sec, conversions_per_sec, p50_ms, p90_ms, p99_ms
+    """
+    parsed = urlparse(url)
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_client, args=(parsed.hostname, parsed.port, deadline, batch_size, latencies, errors))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": len(latencies) / elapsed,
+        "conversions_per_sec": len(latencies) * max(batch_size, 1) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _wait_until_up(url, timeout=30):
+    parsed = urlparse(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=1)
+            conn.request("GET", "/healthz")
+            if json.loads(conn.getresponse().read())["status"] == "ok":
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the conversion service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="service URL")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--batch-size", type=int, default=0, help="use POST /convert/batch with N conversions")
+    parser.add_argument("--self-host", action="store_true", help="start a stub API and the service locally")
+    parser.add_argument("--workers", type=int, default=1, help="service workers when self-hosting")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    stub = service = None
+    if args.self_host:
+        stub = StubRatesServer().start()
+        # Point the service at the stub and keep stub rates out of the snapshot store
+        env = dict(os.environ, FX_API_BASE_URL=stub.base_url, FX_SNAPSHOT_DB_PATH="", FX_BINARY_SNAPSHOT_PATH="")
+        port = urlparse(args.url).port
+        service = subprocess.Popen(
+            [sys.executable, "service.py", "--port", str(port), "--workers", str(args.workers)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env,
+        )
+        if not _wait_until_up(args.url):
+            service.terminate()
+            stub.stop()
+            print("❌ Service did not start", file=sys.stderr)
+            return 1
+
+    try:
+        results = run_load(args.url, args.clients, args.duration, args.batch_size)
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait()
+        if stub is not None:
+            stub.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"📊 {results['requests']:,} requests, {results['errors']} errors over {args.duration:.0f}s "
+              f"with {args.clients} clients")
+        print(f"   {results['requests_per_sec']:,.0f} requests/sec, {results['conversions_per_sec']:,.0f} conversions/sec")
+        print(f"   latency p50 {results['p50_ms']:.2f}ms  p90 {results['p90_ms']:.2f}ms  p99 {results['p99_ms']:.2f}ms")
+    return 0 if results["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
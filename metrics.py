@@ -0,0 +1,250 @@
+"""
+Lightweight hot-path instrumentation with a Prometheus text endpoint
+
+Counters, histograms and scrape-time gauges live in one process-wide
+registry (re-registering a name returns the existing metric, so Streamlit
+reruns are safe). When config.METRICS_ENABLED is off, timed() returns the
+wrapped function unchanged and every other call returns after one flag
+check, so instrumentation costs next to nothing.
+"""
+
+import bisect
+import threading
+import time
+from functools import wraps
+
+import config
+
+# Latency buckets in seconds (sub-microsecond conversions up to slow fetches)
+DEFAULT_BUCKETS = (
+    0.000001, 0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+enabled = config.METRICS_ENABLED
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _format_labels(labelnames, values, extra=""):
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def expose(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, typically of latencies in seconds"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        if not enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def time(self):
+        """Context manager that observes the duration of its block"""
+        return _Timer(self)
+
+    @property
+    def count(self):
+        return self._count
+
+    def expose(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, callback):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def expose(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [] if value is None else [f"{self.name} {value}"]
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+        self._start = None
+
+    def __enter__(self):
+        if enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            self._histogram.observe(time.perf_counter() - self._start)
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name, help_text, labelnames=()):
+    """Get or create a counter"""
+    return _register(Counter(name, help_text, labelnames))
+
+
+def histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    """Get or create a histogram"""
+    return _register(Histogram(name, help_text, buckets))
+
+
+def gauge(name, help_text, callback):
+    """Get or create a gauge read from callback() at scrape time (latest callback wins)"""
+    metric = _register(Gauge(name, help_text, callback))
+    metric.callback = callback
+    return metric
+
+
+def timed(histogram_metric):
+    """
+    Decorator observing a function's duration
+    Returns the function itself when metrics are disabled (zero overhead).
+    """
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram_metric.observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def render():
+    """Render every registered metric in Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_handler():
+    """Build the /metrics request handler (http.server is only imported when serving)"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(host=None, port=None):
+    """
+    Serve /metrics from a daemon thread, once per process
+    Returns: ThreadingHTTPServer, or None if the port is unavailable
+    """
+    from http.server import ThreadingHTTPServer
+
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(
+                    (host or config.METRICS_HOST, config.METRICS_PORT if port is None else port),
+                    _metrics_handler(),
+                )
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Exact money conversion using integer minor units
+
+Amounts are held as integers in each currency's minor unit (cents for USD,
+whole yen for JPY) and exchange rates are treated as the exact decimals the
+API published, so every conversion is a rational multiply followed by one
+explicit rounding step - no binary float error, no post-processing.
+
+The batch path groups rows by currency pair and does the integer math with
+numpy, falling back to Python integers only when a group could overflow
+int64.
+
+Run this file to benchmark it against the float functions in currency_core.py:
+    python money.py --rows 1000000
+"""
+
+import decimal
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+
+import config
+
+# ISO 4217 minor unit exponents that differ from the usual 2
+MINOR_UNITS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0,
+    "KRW": 0, "PYG": 0, "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0,
+    "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+DEFAULT_MINOR_UNIT = 2
+
+# Supported rounding modes (the decimal module's constants)
+ROUNDING_MODES = (
+    decimal.ROUND_HALF_EVEN,
+    decimal.ROUND_HALF_UP,
+    decimal.ROUND_HALF_DOWN,
+    decimal.ROUND_UP,
+    decimal.ROUND_DOWN,
+    decimal.ROUND_CEILING,
+    decimal.ROUND_FLOOR,
+)
+
+# Largest magnitude the vectorized path lets an intermediate product reach
+_INT64_SAFE = 2 ** 62
+
+
+def minor_unit(currency_code):
+    """Get the number of decimal places used by a currency (e.g. USD 2, JPY 0)"""
+    return MINOR_UNITS.get(currency_code, DEFAULT_MINOR_UNIT)
+
+
+def _check_rounding(rounding):
+    rounding = rounding or config.ROUNDING_MODE
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    return rounding
+
+
+def to_minor(amount, currency_code, rounding=None):
+    """
+    Convert a decimal amount to integer minor units
+    Args:
+        amount: Decimal, str, int or float - amount in major units (floats use their shortest repr)
+        currency_code: str - currency of the amount
+        rounding: str - decimal rounding mode (default config.ROUNDING_MODE)
+    Returns: int - amount in minor units
+    """
+    if isinstance(amount, float):
+        amount = repr(amount)
+    value = Decimal(amount).scaleb(minor_unit(currency_code))
+    return int(value.quantize(Decimal(1), rounding=_check_rounding(rounding)))
+
+
+def from_minor(amount_minor, currency_code):
+    """Convert integer minor units back to a Decimal in major units"""
+    return Decimal(int(amount_minor)).scaleb(-minor_unit(currency_code))
+
+
+def exact_rate(from_currency, to_currency, rates):
+    """
+    Get the exact cross rate implied by a rates snapshot
+    Args:
+        from_currency: str - source currency code
+        to_currency: str - target currency code
+        rates: dict - exchange rates from USD (as published by the API)
+    Returns: Fraction - units of to_currency per 1 from_currency
+    """
+    # repr() recovers the shortest decimal, i.e. the value the API sent
+    to_rate = Fraction(Decimal(repr(rates[to_currency])))
+    from_rate = Fraction(Decimal(repr(rates[from_currency])))
+    return to_rate / from_rate
+
+
+def _minor_factor(from_currency, to_currency, rates):
+    """Exact factor turning source minor units into target minor units"""
+    shift = minor_unit(to_currency) - minor_unit(from_currency)
+    return exact_rate(from_currency, to_currency, rates) * Fraction(10) ** shift
+
+
+def _round_div(numerator, denominator, rounding):
+    """Divide integers (denominator > 0) and round the result with a decimal rounding mode"""
+    q, r = divmod(numerator, denominator)
+    if r == 0 or rounding == decimal.ROUND_FLOOR:
+        return q
+    if rounding == decimal.ROUND_CEILING:
+        return q + 1
+    if rounding == decimal.ROUND_DOWN:
+        return q if numerator >= 0 else q + 1
+    if rounding == decimal.ROUND_UP:
+        return q + 1 if numerator >= 0 else q
+
+    twice = 2 * r
+    if twice > denominator:
+        return q + 1
+    if twice < denominator:
+        return q
+    # Exactly half way
+    if rounding == decimal.ROUND_HALF_UP:
+        return q + 1 if numerator >= 0 else q
+    if rounding == decimal.ROUND_HALF_DOWN:
+        return q if numerator >= 0 else q + 1
+    return q + (q & 1)  # ROUND_HALF_EVEN
+
+
+def _round_div_array(numerators, denominator, rounding):
+    """Vectorized _round_div for an int64 array (caller guarantees no overflow)"""
+    q, r = np.divmod(numerators, denominator)
+    inexact = r != 0
+    if rounding == decimal.ROUND_FLOOR:
+        return q
+    if rounding == decimal.ROUND_CEILING:
+        return q + inexact
+    non_negative = numerators >= 0
+    if rounding == decimal.ROUND_DOWN:
+        return q + (inexact & ~non_negative)
+    if rounding == decimal.ROUND_UP:
+        return q + (inexact & non_negative)
+
+    twice = 2 * r
+    above = twice > denominator
+    tie = twice == denominator
+    if rounding == decimal.ROUND_HALF_UP:
+        return q + above + (tie & non_negative)
+    if rounding == decimal.ROUND_HALF_DOWN:
+        return q + above + (tie & ~non_negative)
+    return q + above + (tie & (q & 1).astype(bool))  # ROUND_HALF_EVEN
+
+
+def convert_minor(amount_minor, from_currency, to_currency, rates, rounding=None):
+    """
+    Convert an amount in minor units exactly
+    Args:
+        amount_minor: int - amount in source minor units
+        from_currency: str - source currency code
+        to_currency: str - target currency code
+        rates: dict - exchange rates from USD
+        rounding: str - decimal rounding mode (default config.ROUNDING_MODE)
+    Returns: int - amount in target minor units
+    """
+    rounding = _check_rounding(rounding)
+    factor = _minor_factor(from_currency, to_currency, rates)
+    return _round_div(int(amount_minor) * factor.numerator, factor.denominator, rounding)
+
+
+def convert_exact(amount, from_currency, to_currency, rates, rounding=None):
+    """
+    Convert a major-unit amount exactly (convert_currency_multi without float error)
+    Returns: Decimal - converted amount with the target currency's decimal places
+    """
+    amount_minor = to_minor(amount, from_currency, rounding)
+    converted = convert_minor(amount_minor, from_currency, to_currency, rates, rounding)
+    return from_minor(converted, to_currency)
+
+
+def convert_minor_batch(amounts_minor, from_currencies, to_currencies, rates, rounding=None):
+    """
+    Convert many minor-unit amounts exactly
+    Rows are grouped by currency pair so each exact factor is computed once and
+    applied to the whole group with int64 arithmetic.
+    Args:
+        amounts_minor: array-like of int - amounts in source minor units
+        from_currencies: array-like of str - source currency codes
+        to_currencies: array-like of str - target currency codes
+        rates: dict - exchange rates from USD
+        rounding: str - decimal rounding mode (default config.ROUNDING_MODE)
+    Returns: numpy int64 array - amounts in target minor units
+    Raises: KeyError for unknown currency codes, OverflowError if a result exceeds int64
+    """
+    rounding = _check_rounding(rounding)
+    amounts = np.asarray(amounts_minor, dtype=np.int64)
+    from_codes, from_idx = np.unique(np.asarray(from_currencies), return_inverse=True)
+    to_codes, to_idx = np.unique(np.asarray(to_currencies), return_inverse=True)
+
+    # Sort rows by currency pair once so each group is a contiguous slice
+    pair_keys = from_idx.ravel() * len(to_codes) + to_idx.ravel()
+    order = np.argsort(pair_keys, kind="stable")
+    sorted_keys = pair_keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(order) else []
+    ends = np.r_[starts[1:], len(order)] if len(order) else []
+
+    result = np.empty(len(amounts), dtype=np.int64)
+    largest = int(np.abs(amounts).max()) if len(amounts) else 0
+
+    for start, end in zip(starts, ends):
+        key = sorted_keys[start]
+        from_currency = str(from_codes[key // len(to_codes)])
+        to_currency = str(to_codes[key % len(to_codes)])
+        factor = _minor_factor(from_currency, to_currency, rates)
+        rows = order[start:end]
+
+        if largest * factor.numerator < _INT64_SAFE and factor.denominator < _INT64_SAFE:
+            result[rows] = _round_div_array(amounts[rows] * factor.numerator, factor.denominator, rounding)
+        else:
+            # Intermediate products could overflow int64 - use Python integers
+            result[rows] = [
+                _round_div(int(a) * factor.numerator, factor.denominator, rounding)
+                for a in amounts[rows]
+            ]
+
+    return result
+
+
+def benchmark(rows=1000000, seed=42):
+    """
+    Time exact batch conversion against the float functions
+    Returns: dict - seconds per implementation
+    """
+    import time
+    from currency_core import SUPPORTED_CURRENCIES, convert_currency_batch, convert_currency_multi
+    from stub_rates_server import DEFAULT_RATES
+
+    rng = np.random.default_rng(seed)
+    codes = np.array(list(SUPPORTED_CURRENCIES.keys()))
+    from_codes = codes[rng.integers(0, len(codes), rows)]
+    to_codes = codes[rng.integers(0, len(codes), rows)]
+    amounts_minor = rng.integers(1, 10 ** 9, rows)
+    amounts = amounts_minor / 100.0
+    rates = dict(DEFAULT_RATES)
+
+    timings = {}
+
+    start = time.perf_counter()
+    for amount, f, t in zip(amounts.tolist(), from_codes.tolist(), to_codes.tolist()):
+        convert_currency_multi(amount, f, t, rates)
+    timings["float convert_currency_multi (per row)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    convert_currency_batch(amounts, from_codes, to_codes, rates)
+    timings["float convert_currency_batch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    convert_minor_batch(amounts_minor, from_codes, to_codes, rates)
+    timings["exact convert_minor_batch"] = time.perf_counter() - start
+
+    return timings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark exact vs float conversion")
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"⏱️  Converting {args.rows:,} rows")
+    for name, seconds in benchmark(args.rows).items():
+        print(f"{name:<40} {seconds:>8.3f}s  {args.rows / seconds:>14,.0f} rows/sec")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Multi-core batch conversion
+
+Shards a large batch across a process pool. Inputs and outputs live in
+shared memory, the rate snapshot is sent to each worker once when it
+starts, and each task is only a (start, end) row range - so nothing large
+is pickled per task and results land in order without a merge step.
+
+Run this file for a scaling benchmark across 1..N cores:
+    python parallel.py --rows 20000000 --max-workers 8
+"""
+
+import os
+import time
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from rate_matrix import RateMatrix
+
+# Below this many rows per worker the pool costs more than it saves
+MIN_ROWS_PER_WORKER = 250000
+
+# Per-worker state set up once by _init_worker
+_worker = {}
+
+
+class _SharedArray:
+    """A numpy array backed by a named shared memory block"""
+
+    def __init__(self, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, shape, dtype.str)
+
+    @classmethod
+    def copy_of(cls, values):
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self, unlink=False):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _init_worker(codes, usd_rates, specs):
+    """Runs once per worker: rebuild the matrix and attach the shared arrays"""
+    _worker["matrix"] = RateMatrix(codes, usd_rates)
+    _worker["arrays"] = {key: _SharedArray.attach(spec) for key, spec in specs.items()}
+
+
+def _convert_range(bounds):
+    start, end = bounds
+    arrays = _worker["arrays"]
+    arrays["out"].array[start:end] = _worker["matrix"].convert_batch(
+        arrays["amounts"].array[start:end],
+        arrays["from"].array[start:end],
+        arrays["to"].array[start:end],
+    )
+    return end - start
+
+
+def _as_codes(values, rows):
+    values = np.asarray(values)
+    if values.ndim == 0:
+        values = np.full(rows, values)
+    return values
+
+
+def default_workers():
+    """Number of worker processes to use by default (all cores)"""
+    return os.cpu_count() or 1
+
+
+def convert_parallel(amounts, from_currencies, to_currencies, rates, workers=None, chunks_per_worker=4):
+    """
+    Convert a large batch on several cores (same results as convert_currency_batch)
+    Args:
+        amounts: array-like of float - amounts to convert
+        from_currencies: array-like of str codes or int positions (or a single code)
+        to_currencies: array-like of str codes or int positions (or a single code)
+        rates: dict or RateMatrix - rates snapshot
+        workers: int - processes to use (default: all cores)
+        chunks_per_worker: int - tasks per worker, for load balancing
+    Returns: numpy float64 array - converted amounts in input order
+    """
+    matrix = rates if isinstance(rates, RateMatrix) else RateMatrix.from_rates(rates)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rows = len(amounts)
+    from_codes = _as_codes(from_currencies, rows)
+    to_codes = _as_codes(to_currencies, rows)
+
+    workers = workers or default_workers()
+    workers = max(1, min(workers, rows // MIN_ROWS_PER_WORKER))
+    if workers == 1:
+        return matrix.convert_batch(amounts, from_codes, to_codes)
+
+    shared = {
+        "amounts": _SharedArray.copy_of(amounts),
+        "from": _SharedArray.copy_of(from_codes),
+        "to": _SharedArray.copy_of(to_codes),
+        "out": _SharedArray((rows,), np.float64),
+    }
+    try:
+        specs = {key: array.spec for key, array in shared.items()}
+        tasks = workers * chunks_per_worker
+        bounds = np.linspace(0, rows, tasks + 1, dtype=np.int64)
+        ranges = [(int(bounds[i]), int(bounds[i + 1])) for i in range(tasks) if bounds[i] < bounds[i + 1]]
+
+        context = get_context("fork") if hasattr(os, "fork") else get_context("spawn")
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(matrix.codes, matrix.usd_rates, specs)) as pool:
+            pool.map(_convert_range, ranges)
+
+        return shared["out"].array.copy()
+    finally:
+        for array in shared.values():
+            array.close(unlink=True)
+
+
+def scaling_benchmark(rows, max_workers, seed=42):
+    """
+    Time convert_parallel with 1..max_workers processes
+    Returns: list of (workers, seconds)
+    """
+    from stub_rates_server import DEFAULT_RATES
+
+    rng = np.random.default_rng(seed)
+    codes = np.array(list(DEFAULT_RATES))
+    amounts = rng.uniform(1, 10000, rows)
+    from_codes = codes[rng.integers(0, len(codes), rows)]
+    to_codes = codes[rng.integers(0, len(codes), rows)]
+    matrix = RateMatrix.from_rates(DEFAULT_RATES)
+
+    expected = matrix.convert_batch(amounts, from_codes, to_codes)
+    timings = []
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        result = convert_parallel(amounts, from_codes, to_codes, matrix, workers=workers)
+        timings.append((workers, time.perf_counter() - start))
+        if not np.array_equal(result, expected):
+            raise AssertionError(f"Parallel result differs with {workers} workers")
+    return timings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel conversion scaling benchmark")
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--max-workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    print(f"⏱️  Converting {args.rows:,} rows on 1..{args.max_workers} processes")
+    timings = scaling_benchmark(args.rows, args.max_workers)
+    single = timings[0][1]
+    for workers, seconds in timings:
+        print(f"{workers:>3} worker(s)  {seconds:>8.3f}s  {args.rows / seconds:>14,.0f} rows/sec  "
+              f"speedup {single / seconds:>5.2f}x")
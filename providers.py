@@ -0,0 +1,269 @@
+"""
+Pluggable exchange rate providers with hedged requests and failover
+
+Every provider follows the get_exchange_rates() contract: fetch() returns
+(success: bool, rates: dict, error_message: str) with rates quoted from USD.
+HedgedFetcher asks the provider it currently rates best; if that has not
+answered within the latency budget (or fails) the next one is fired as a
+backup, and the first good response wins. Per-provider latency and error
+rates are tracked so the fastest healthy network provider is tried first;
+fallback providers (a local rates file) are only asked once all others fail.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import http_client
+
+# Providers with a recent error rate at or above this are tried after untried ones
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+class RateProvider:
+    """Base class for rate providers"""
+
+    name = "provider"
+    fallback = False  # True: only asked after every other provider failed
+
+    def fetch(self):
+        """
+        Fetch rates from this provider
+        Returns: tuple (success: bool, rates: dict, error_message: str)
+        """
+        raise NotImplementedError
+
+
+class CallableProvider(RateProvider):
+    """Adapts an existing fetch function (e.g. fetch_exchange_rates) to a provider"""
+
+    def __init__(self, name, func):
+        self.name = name
+        self._func = func
+
+    def fetch(self):
+        return self._func()
+
+
+class HTTPProvider(RateProvider):
+    """Any JSON API answering {"rates": {...}} quoted from base_currency"""
+
+    def __init__(self, name, url, base_currency="USD"):
+        self.name = name
+        self.url = url
+        self.base_currency = base_currency
+
+    def fetch(self):
+        import requests
+
+        try:
+            data = http_client.fetch_json(self.url)
+            rates = dict(data["rates"])
+            # Some APIs leave the base currency out of its own rate table
+            rates.setdefault(self.base_currency, 1.0)
+            return True, rates, ""
+        except requests.exceptions.JSONDecodeError as e:
+            # Before RequestException: requests' JSONDecodeError subclasses it too
+            return False, {}, f"Invalid response from API: {str(e)}"
+        except requests.exceptions.RequestException as e:
+            return False, {}, f"Network error: {str(e)}"
+        except (ValueError, KeyError, TypeError) as e:
+            return False, {}, f"Unexpected API response format: {str(e)}"
+
+
+class FileProvider(RateProvider):
+    """Rates from a local JSON file ({"rates": {...}} or a flat dict) - for tests and offline use"""
+
+    # Answers in microseconds with static rates: ranking it by speed would pin it first
+    fallback = True
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def fetch(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            rates = data.get("rates", data)
+            if not rates:
+                return False, {}, f"No rates in {self.path}"
+            return True, rates, ""
+        except (OSError, ValueError, AttributeError) as e:
+            return False, {}, f"Cannot read rates file: {str(e)}"
+
+
+class ProviderStats:
+    """Exponentially weighted latency and error rate for one provider"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.last_error = ""
+
+    def record(self, success, elapsed, error=""):
+        self.requests += 1
+        self.latency = elapsed if self.latency is None else (
+            self.alpha * elapsed + (1 - self.alpha) * self.latency
+        )
+        self.error_rate = self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self.error_rate
+        if not success:
+            self.errors += 1
+            self.last_error = error
+
+    def score(self):
+        """Lower is better: expected latency, heavily penalised by recent errors"""
+        latency = self.latency if self.latency is not None else 0.0
+        return latency * (1 + 10 * self.error_rate) + self.error_rate
+
+    def as_dict(self):
+        return {
+            "latency_seconds": self.latency,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "errors": self.errors,
+            "wins": self.wins,
+            "last_error": self.last_error,
+        }
+
+
+class HedgedFetcher:
+    """
+    Fetch from several providers, hedging slow ones with backups
+
+    Usable anywhere a loader is expected (e.g. RateCache): fetch() follows
+    the (success, rates, error_message) contract.
+    """
+
+    def __init__(self, providers, hedge_delay=0.5, timeout=30):
+        """
+        Args:
+            providers: list of RateProvider - in initial order of preference
+            hedge_delay: float - seconds to wait for a provider before firing the next
+            timeout: float - give up after this many seconds overall
+        """
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self._stats = {provider.name: ProviderStats() for provider in self.providers}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(2 * len(self.providers), 1),
+            thread_name_prefix="rate-provider",
+        )
+
+    def ranked(self):
+        """
+        Non-fallback providers in the order to try: measured healthy ones by
+        score, then untried ones, then failing ones (configured order breaks ties)
+        """
+        def key(item):
+            position, provider = item
+            stats = self._stats[provider.name]
+            if stats.latency is None:
+                return 1, 0.0, position
+            if stats.error_rate >= UNHEALTHY_ERROR_RATE:
+                return 2, stats.score(), position
+            return 0, stats.score(), position
+
+        with self._lock:
+            candidates = [(position, provider) for position, provider in enumerate(self.providers)
+                          if not provider.fallback]
+            return [provider for _, provider in sorted(candidates, key=key)]
+
+    def stats(self):
+        """Per-provider latency/error statistics"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def _timed_fetch(self, provider):
+        start = time.perf_counter()
+        try:
+            result = provider.fetch()
+        except Exception as e:
+            result = (False, {}, f"Unexpected error: {str(e)}")
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats[provider.name].record(result[0], elapsed, result[2])
+        return result
+
+    def fetch(self):
+        """
+        Get rates from the first provider to answer successfully
+        Returns: tuple (success: bool, rates: dict, error_message: str)
+        """
+        errors = []
+        result = self._fetch_hedged(self.ranked(), errors)
+        if result is not None:
+            return result
+
+        # Last resort, in configured order
+        for provider in self.providers:
+            if provider.fallback:
+                success, rates, error = self._timed_fetch(provider)
+                if success:
+                    with self._lock:
+                        self._stats[provider.name].wins += 1
+                    return True, rates, ""
+                errors.append(f"{provider.name}: {error}")
+        return False, {}, "All rate providers failed - " + "; ".join(errors)
+
+    def _fetch_hedged(self, pending_providers, errors):
+        """
+        Race providers, firing the next one each hedge_delay until one succeeds
+        Returns: the first successful (True, rates, "") result, or None (failures appended to errors)
+        """
+        running = {}
+        deadline = time.monotonic() + self.timeout
+
+        while pending_providers or running:
+            if pending_providers:
+                provider = pending_providers.pop(0)
+                running[self._executor.submit(self._timed_fetch, provider)] = provider
+                # Wait only the hedge budget before firing a backup
+                budget = self.hedge_delay if pending_providers else deadline - time.monotonic()
+            else:
+                budget = deadline - time.monotonic()
+
+            if budget <= 0 and not pending_providers:
+                break
+            done, _ = wait(running, timeout=max(budget, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = running.pop(future)
+                success, rates, error = future.result()
+                if success:
+                    with self._lock:
+                        self._stats[provider.name].wins += 1
+                    return True, rates, ""
+                errors.append(f"{provider.name}: {error}")
+
+        if running:
+            errors.extend(f"{provider.name}: timed out" for provider in running.values())
+        return None
+
+
+# Fetchers shared by every Streamlit session in this process
+_fetchers = {}
+_fetchers_lock = threading.Lock()
+
+
+def shared_fetcher(name, factory):
+    """
+    Return the process-wide HedgedFetcher registered under name
+    Args:
+        name: str - registry key
+        factory: callable - builds the fetcher the first time
+    Returns: HedgedFetcher
+    """
+    with _fetchers_lock:
+        fetcher = _fetchers.get(name)
+        if fetcher is None:
+            fetcher = factory()
+            _fetchers[name] = fetcher
+        return fetcher
@@ -0,0 +1,321 @@
+"""
+Process-wide exchange rate cache for the Currency Converter
+
+Streamlit re-executes app.py on every interaction, so anything stored in the
+script's own globals is rebuilt on each rerun. This module is imported once
+per server process, which makes it the natural home for state that must be
+shared by all sessions.
+"""
+
+import collections
+import threading
+import time
+
+
+class FrozenRates(dict):
+    """
+    A rates dict that rejects changes, so one snapshot can be shared safely
+
+    Still a dict for json.dumps and every reader; copy it with dict(rates)
+    to get one that can be changed.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Rate snapshots are read-only; copy with dict(rates) to change one")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenRates, (dict(self),)
+
+
+class RateSnapshot:
+    """
+    One immutable rates snapshot, shared by every session that uses it
+
+    Sessions keep only the snapshot's id and look the snapshot up again, so
+    a process holds one copy of each set of rates however many users it has.
+    """
+
+    __slots__ = ("id", "rates", "fetched_at")
+
+    def __init__(self, snapshot_id, rates, fetched_at):
+        if not isinstance(rates, FrozenRates):
+            rates = FrozenRates(rates)
+        object.__setattr__(self, "id", snapshot_id)
+        object.__setattr__(self, "rates", rates)
+        object.__setattr__(self, "fetched_at", fetched_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RateSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RateSnapshot is immutable")
+
+    def __repr__(self):
+        return f"RateSnapshot(id={self.id}, currencies={len(self.rates)}, fetched_at={self.fetched_at})"
+
+
+class RateCache:
+    """
+    TTL cache around a rate loader with stale-while-revalidate semantics
+
+    - fresh snapshot (age < ttl): returned immediately
+    - stale snapshot (age < ttl + max_stale): returned immediately while a
+      single background refresh runs
+    - no usable snapshot: the caller waits for the (single) upstream fetch
+    - upstream failure: the last snapshot keeps being served while it is
+      younger than fallback_max_age
+
+    The loader must follow the get_exchange_rates() contract and return
+    a tuple (success: bool, rates: dict, error_message: str).
+    """
+
+    def __init__(self, loader, ttl, max_stale=0, fallback_max_age=None, keep_snapshots=8):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        if fallback_max_age is None:
+            fallback_max_age = ttl + max_stale
+        self.fallback_max_age = fallback_max_age
+
+        self._lock = threading.Lock()
+        self._inflight = None  # threading.Event while a fetch is running
+        self._last_result = (False, {}, "")
+
+        # Current snapshot, plus the last few by id for sessions still showing them
+        self._snapshot = None
+        self._fetched_at = None  # freshness clock for the current snapshot
+        self._recent = collections.OrderedDict()
+        self._keep_snapshots = keep_snapshots
+        self.version = 0
+        self._listeners = []
+
+        # Monitoring counters
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._fetches = 0
+        self._fetch_errors = 0
+
+    def get(self):
+        """
+        Return rates, fetching from upstream only when necessary
+        Returns: tuple (success: bool, rates: dict, error_message: str)
+        """
+        result = self.get_nowait()
+        if result is not None:
+            return result
+        return self.refresh()
+
+    def get_nowait(self):
+        """
+        Return rates only if they can be served without waiting for upstream
+        (a miss is counted and None returned - follow up with refresh())
+        Returns: tuple (success: bool, rates: dict, error_message: str) or None
+        """
+        with self._lock:
+            age = self._age()
+            if age is not None and age < self.ttl:
+                self._hits += 1
+                return True, self._snapshot.rates, ""
+
+            serve_stale = age is not None and (
+                age < self.ttl + self.max_stale
+                # Upstream is failing: keep serving the fallback without blocking
+                or (self._fetch_errors and not self._last_result[0] and age < self.fallback_max_age)
+            )
+            if serve_stale:
+                # Serve the stale snapshot and revalidate in the background
+                self._stale_hits += 1
+                if self._inflight is None:
+                    self._start_fetch()
+                    threading.Thread(
+                        target=self._run_fetch,
+                        name="rate-cache-refresh",
+                        daemon=True,
+                    ).start()
+                return True, self._snapshot.rates, ""
+
+            self._misses += 1
+            return None
+
+    def refresh(self, fallback=True):
+        """
+        Fetch from upstream now, joining a fetch already in progress
+        Args:
+            fallback: bool - on failure, return the last usable snapshot instead of the error
+        Returns: tuple (success: bool, rates: dict, error_message: str)
+        """
+        with self._lock:
+            if self._inflight is not None:
+                owner = False
+                event = self._inflight
+            else:
+                owner = True
+                event = self._start_fetch()
+
+        if owner:
+            self._run_fetch()
+        else:
+            event.wait()
+
+        with self._lock:
+            success, rates, error = self._last_result
+            if not success and fallback and self._fetched_at is not None and self._age() < self.fallback_max_age:
+                # A failed refresh does not invalidate a usable snapshot
+                return True, self._snapshot.rates, ""
+            return success, rates, error
+
+    def peek(self):
+        """Return the current rates without any network I/O (or None)"""
+        snapshot = self._snapshot
+        return snapshot.rates if snapshot is not None else None
+
+    def current(self):
+        """Return the current RateSnapshot without any network I/O (or None)"""
+        return self._snapshot
+
+    def get_snapshot(self, snapshot_id):
+        """
+        Look up a recent snapshot by id (its version)
+        Returns: RateSnapshot, or None once it is older than the last keep_snapshots
+        """
+        with self._lock:
+            return self._recent.get(snapshot_id)
+
+    def snapshot(self):
+        """
+        Return the current snapshot and its identity in one consistent read
+        Returns: tuple (rates: dict or None, fetched_at: float or None, version: int)
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return None, None, self.version
+            return self._snapshot.rates, self._snapshot.fetched_at, self.version
+
+    def prime(self, rates, fetched_at=None):
+        """Install a snapshot obtained elsewhere (e.g. loaded from disk)"""
+        with self._lock:
+            self._install(rates, fetched_at if fetched_at is not None else time.time())
+            snapshot = (self._snapshot.rates, self._snapshot.fetched_at, self.version)
+        self._notify(snapshot)
+
+    def add_listener(self, callback):
+        """
+        Call callback(rates, fetched_at, version) after every new snapshot
+        (runs on the thread that installed it - keep it quick)
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, snapshot):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(*snapshot)
+            except Exception:
+                # A broken listener must not break rate fetching
+                pass
+
+    def stats(self):
+        """Return hit/miss/age counters for monitoring"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "fetches": self._fetches,
+                "fetch_errors": self._fetch_errors,
+                "age_seconds": self._age(),
+                "version": self.version,
+                "refreshing": self._inflight is not None,
+            }
+
+    @property
+    def fetched_at(self):
+        return self._fetched_at
+
+    def _age(self):
+        if self._fetched_at is None:
+            return None
+        return time.time() - self._fetched_at
+
+    def _install(self, rates, fetched_at):
+        # Caller must hold self._lock
+        self.version += 1
+        self._snapshot = RateSnapshot(self.version, rates, fetched_at)
+        self._fetched_at = fetched_at
+        self._recent[self.version] = self._snapshot
+        while len(self._recent) > self._keep_snapshots:
+            self._recent.popitem(last=False)
+
+    def _start_fetch(self):
+        # Caller must hold self._lock
+        self._inflight = threading.Event()
+        self._fetches += 1
+        return self._inflight
+
+    def _run_fetch(self):
+        try:
+            result = self._loader()
+        except Exception as e:
+            result = (False, {}, f"Unexpected error: {str(e)}")
+
+        changed = False
+        with self._lock:
+            success, rates, error = result
+            if success and self._snapshot is not None and self._snapshot.rates == rates:
+                # Unchanged (e.g. a 304): keep the snapshot, its version and everything
+                # memoized on it, and only restart the TTL
+                self._fetched_at = time.time()
+                result = (True, self._snapshot.rates, error)
+            elif success:
+                self._install(rates, time.time())
+                # Callers get the shared read-only rates, never the loader's dict
+                result = (True, self._snapshot.rates, error)
+                snapshot = (self._snapshot.rates, self._snapshot.fetched_at, self.version)
+                changed = True
+            else:
+                self._fetch_errors += 1
+            self._last_result = result
+            event, self._inflight = self._inflight, None
+        event.set()
+        if changed:
+            self._notify(snapshot)
+
+
+# Caches shared by every Streamlit session in this process
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(name, loader, ttl, max_stale=0, fallback_max_age=None, on_create=None):
+    """
+    Return the process-wide cache registered under name, creating it once
+    Args:
+        name: str - registry key
+        loader: callable - used only when the cache is first created
+        ttl: float - seconds a snapshot is considered fresh
+        max_stale: float - extra seconds a stale snapshot may be served
+        fallback_max_age: float - max snapshot age served when upstream fails
+        on_create: callable(cache) - one-time setup, e.g. priming from disk
+    Returns: RateCache
+    """
+    with _shared_lock:
+        cache = _shared_caches.get(name)
+        if cache is None:
+            cache = RateCache(loader, ttl, max_stale, fallback_max_age)
+            if on_create is not None:
+                on_create(cache)
+            _shared_caches[name] = cache
+        return cache
@@ -0,0 +1,307 @@
+"""
+Rate change detection and fan-out to subscribers
+
+Every new snapshot is diffed against the rates subscribers last saw; only
+currencies that moved by at least a relative threshold are published (so
+slow drift still goes out once it adds up to a meaningful move). Events are
+built and serialized once per currency filter, not once per subscriber, and
+a subscriber that falls too far behind is disconnected rather than slowing
+everyone else down.
+"""
+
+import collections
+import itertools
+import json
+import threading
+import time
+
+
+def diff_rates(reference, current, threshold=0.0, thresholds=None):
+    """
+    Find currencies whose rate moved enough to report
+    Args:
+        reference: dict - rates subscribers last saw
+        current: dict - new rates
+        threshold: float - minimum relative move (0.001 = 0.1%)
+        thresholds: dict - per-currency overrides of threshold
+    Returns: dict - code -> {"old": float or None, "new": float or None, "change": float or None}
+             (old is None for a new currency, new is None for a dropped one)
+    """
+    thresholds = thresholds or {}
+    changes = {}
+    for code, new in current.items():
+        old = reference.get(code)
+        if old is None:
+            changes[code] = {"old": None, "new": new, "change": None}
+            continue
+        change = new / old - 1 if old else float("inf")
+        if new != old and abs(change) >= thresholds.get(code, threshold):
+            changes[code] = {"old": old, "new": new, "change": change}
+    for code in reference.keys() - current.keys():
+        changes[code] = {"old": reference[code], "new": None, "change": None}
+    return changes
+
+
+class ChangeEvent:
+    """One published change set, shared by every subscriber"""
+
+    __slots__ = ("id", "kind", "changes", "published_at", "_sse", "_filtered")
+
+    def __init__(self, event_id, kind, changes):
+        self.id = event_id
+        self.kind = kind
+        self.changes = changes
+        self.published_at = time.time()
+        self._sse = None
+        self._filtered = {}
+
+    def for_currencies(self, currencies):
+        """
+        The part of this event a filtered subscriber sees (built once per filter)
+        Returns: ChangeEvent, or None if none of the currencies changed
+        """
+        if currencies is None:
+            return self
+        try:
+            return self._filtered[currencies]
+        except KeyError:
+            selected = {code: change for code, change in self.changes.items() if code in currencies}
+            event = ChangeEvent(self.id, self.kind, selected) if selected else None
+            self._filtered[currencies] = event
+            return event
+
+    def as_dict(self):
+        return {"id": self.id, "type": self.kind, "published_at": self.published_at, "changes": self.changes}
+
+    def sse(self):
+        """Server-sent event encoding (computed once, then reused for every subscriber)"""
+        if self._sse is None:
+            data = json.dumps(self.as_dict(), separators=(",", ":"))
+            self._sse = f"id: {self.id}\nevent: {self.kind}\ndata: {data}\n\n".encode("utf-8")
+        return self._sse
+
+
+class Subscription:
+    """A subscriber's position in the broadcaster's event log"""
+
+    def __init__(self, broadcaster, currencies, cursor):
+        self._broadcaster = broadcaster
+        self.currencies = frozenset(currencies) if currencies else None
+        self.cursor = cursor  # id of the next event to deliver
+        self.closed = False
+
+    def drain(self, timeout=None):
+        """
+        Wait for events, then return every one that is pending
+        Returns: list of ChangeEvent - empty on timeout or once the subscription is closed
+        """
+        return self._broadcaster._read(self, timeout)
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event
+        Returns: ChangeEvent, or None on timeout or once the subscription is closed
+        """
+        events = self._broadcaster._read(self, timeout, limit=1)
+        return events[0] if events else None
+
+    def close(self):
+        """Stop receiving events"""
+        self._broadcaster._remove(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ChangeBroadcaster:
+    """
+    Detects rate changes and pushes them to subscribers
+
+    Events go into one bounded log that every subscriber reads at its own
+    cursor. Publishing is O(1) whatever the number of subscribers, and a
+    subscriber that wakes up late collects everything pending in one go.
+    """
+
+    def __init__(self, threshold=0.0, thresholds=None, max_queue=100):
+        """
+        Args:
+            threshold: float - minimum relative move to publish (0.001 = 0.1%)
+            thresholds: dict - per-currency overrides of threshold
+            max_queue: int - events a subscriber may fall behind before it is disconnected
+        """
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self._cond = threading.Condition()
+        self._log = collections.deque(maxlen=max_queue)
+        self._next_id = 1
+        self._subscribers = set()
+        self._reference = {}
+        self.published = 0
+        self.delivered = 0
+        self.disconnected = 0
+
+    def subscribe(self, currencies=None):
+        """
+        Start receiving change events published from now on
+        Args:
+            currencies: iterable of str - only these currencies (default: all)
+        Returns: Subscription
+        """
+        with self._cond:
+            subscription = Subscription(self, currencies, self._next_id)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def current(self, currencies=None):
+        """Rates as last published, for a subscriber's initial snapshot"""
+        with self._cond:
+            reference = dict(self._reference)
+        if currencies:
+            reference = {code: rate for code, rate in reference.items() if code in currencies}
+        return reference
+
+    @property
+    def subscribers(self):
+        with self._cond:
+            return len(self._subscribers)
+
+    def on_snapshot(self, rates, fetched_at=None, version=None):
+        """
+        RateCache listener: diff a new snapshot and publish what moved
+        Returns: dict - the published changes (empty when nothing crossed its threshold)
+        """
+        with self._cond:
+            if not self._reference:
+                # First snapshot: nothing to compare with, it becomes the reference
+                self._reference = dict(rates)
+                return {}
+            changes = diff_rates(self._reference, rates, self.threshold, self.thresholds)
+            for code, change in changes.items():
+                if change["new"] is None:
+                    self._reference.pop(code, None)
+                else:
+                    self._reference[code] = change["new"]
+            if changes:
+                self._append(changes, "changes")
+        return changes
+
+    def publish(self, changes, kind="changes"):
+        """
+        Push a change set to every subscriber interested in it
+        Returns: ChangeEvent
+        """
+        with self._cond:
+            return self._append(changes, kind)
+
+    def stats(self):
+        """Return subscriber and delivery counters"""
+        with self._cond:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "disconnected": self.disconnected,
+            }
+
+    def _append(self, changes, kind):
+        # Caller must hold self._cond
+        event = ChangeEvent(self._next_id, kind, changes)
+        self._next_id += 1
+        self._log.append(event)
+        self.published += 1
+        self._cond.notify_all()
+        return event
+
+    def _read(self, subscription, timeout, limit=None):
+        with self._cond:
+            if subscription.closed:
+                return []
+            if subscription.cursor >= self._next_id:
+                self._cond.wait(timeout)
+                if subscription.closed:
+                    return []
+
+            first_id = self._next_id - len(self._log)
+            if subscription.cursor < first_id:
+                # Too far behind: disconnect so it resyncs instead of holding the log back
+                self._subscribers.discard(subscription)
+                subscription.closed = True
+                self.disconnected += 1
+                return []
+
+            events = []
+            for event in itertools.islice(self._log, subscription.cursor - first_id, None):
+                subscription.cursor = event.id + 1
+                event = event.for_currencies(subscription.currencies)
+                if event is not None:
+                    events.append(event)
+                    if limit is not None and len(events) >= limit:
+                        break
+            self.delivered += len(events)
+            return events
+
+    def _remove(self, subscription):
+        with self._cond:
+            self._subscribers.discard(subscription)
+            subscription.closed = True
+            self._cond.notify_all()
+
+
+def fanout_benchmark(subscribers, events, currencies=10, seed=42):
+    """
+    Measure delivery throughput to many concurrent subscriber threads
+    Returns: dict - subscribers, events, deliveries, seconds, deliveries_per_sec
+    """
+    import random
+
+    rng = random.Random(seed)
+    codes = [f"C{i:02d}" for i in range(currencies)]
+    broadcaster = ChangeBroadcaster(max_queue=events + 1)
+    subscriptions = [broadcaster.subscribe() for _ in range(subscribers)]
+    received = [0] * subscribers
+
+    def consume(slot, subscription):
+        while received[slot] < events:
+            pending = subscription.drain(timeout=5)
+            if not pending:
+                return
+            b"".join(event.sse() for event in pending)
+            received[slot] += len(pending)
+
+    threads = [threading.Thread(target=consume, args=(slot, sub), daemon=True) for slot, sub in enumerate(subscriptions)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    for _ in range(events):
+        code = rng.choice(codes)
+        broadcaster.publish({code: {"old": 1.0, "new": 1.0 + rng.random() / 100, "change": None}})
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    deliveries = sum(received)
+    return {
+        "subscribers": subscribers,
+        "events": events,
+        "deliveries": deliveries,
+        "seconds": elapsed,
+        "deliveries_per_sec": deliveries / elapsed if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rate change fan-out throughput")
+    parser.add_argument("--subscribers", type=int, nargs="*", default=[10, 100, 1000])
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    for count in args.subscribers:
+        result = fanout_benchmark(count, args.events)
+        print(f"{count:>6} subscribers  {result['deliveries']:>9,} deliveries in {result['seconds']:.3f}s  "
+              f"{result['deliveries_per_sec']:>12,.0f} deliveries/sec")
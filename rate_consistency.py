@@ -0,0 +1,204 @@
+"""
+Cross-rate consistency checks for rate snapshots
+
+A set of cross rates is arbitrage-free when every triangle closes:
+rate(a->b) * rate(b->c) * rate(c->a) == 1. In log space that means the
+matrix L[i, j] = log(units of j per 1 i) is x[j] - x[i] for some per-currency
+level x. The levels are fitted in O(n^2) from row and column means (with a
+median step for robustness), and
+whatever the fit cannot explain is a triangular inconsistency, found for
+hundreds of currencies in milliseconds of numpy.
+
+A snapshot quoted from a single base closes every triangle by construction,
+so against a second provider the check looks for currencies whose rate
+disagrees with the consensus: each currency's log-ratio between the two
+snapshots, minus the median (which absorbs a different base or a uniform
+shift), scored against the median absolute deviation.
+
+Run this file to time the check:
+    python rate_consistency.py --currencies 160 500 1000
+"""
+
+import math
+import time
+
+import numpy as np
+
+# Scales a median absolute deviation to a standard deviation for normal data
+_MAD_SCALE = 1.4826
+
+
+def fit_levels(log_matrix):
+    """
+    Robust fit of L[i, j] ~ x[j] - x[i]
+    Least squares from row and column means, then one median step so that a
+    few bad quotes do not drag the levels (and the residuals of every other
+    quote of the same currencies) with them.
+    Args:
+        log_matrix: numpy (n, n) array - log cross rates
+    Returns: tuple (levels: numpy (n,) array with mean 0, residuals: numpy (n, n) array)
+    """
+    levels = (log_matrix.mean(axis=0) - log_matrix.mean(axis=1)) / 2
+    # estimates[j, i] = x[j] as seen from row i; the median ignores outlying rows
+    estimates = log_matrix.T - log_matrix
+    estimates *= 0.5
+    estimates += levels[np.newaxis, :]
+    middle = len(levels) // 2
+    estimates.partition(middle, axis=1)  # in place: the array is ours, so no copy as in np.median
+    levels = estimates[:, middle] - estimates[:, middle].mean()
+    residuals = log_matrix - levels[np.newaxis, :]
+    residuals += levels[:, np.newaxis]
+    return levels, residuals
+
+
+def check_cross_rates(codes, matrix, tolerance=0.0001):
+    """
+    Find triangular inconsistencies in a full cross-rate matrix
+    Args:
+        codes: sequence of str - currency for each row/column
+        matrix: numpy (n, n) array - matrix[i, j] = units of codes[j] per 1 codes[i]
+        tolerance: float - relative error above which a quote counts as inconsistent
+    Returns: dict - max_error (relative), worst_pair, worst_triangle, triangle_error,
+             inconsistent_pairs (quotes off by more than tolerance)
+    Raises: ValueError if the matrix is not square or has non-finite or non-positive rates
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n = len(codes)
+    if matrix.shape != (n, n):
+        raise ValueError(f"Expected a {n}x{n} cross-rate matrix, got {matrix.shape}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_matrix = np.log(matrix)
+    if not np.isfinite(log_matrix).all():
+        raise ValueError("Cross rates must be finite and positive")
+
+    report = {
+        "max_error": 0.0,
+        "worst_pair": None,
+        "worst_triangle": None,
+        "triangle_error": 0.0,
+        "inconsistent_pairs": 0,
+    }
+    if n < 3:
+        return report
+
+    _, residuals = fit_levels(log_matrix)
+    magnitude = np.abs(residuals, out=residuals)
+    worst = int(magnitude.argmax())
+    i, j = divmod(worst, n)
+
+    # Every triangle through the worst quote, in one pass: log of a->b->c->a
+    cycles = log_matrix[i, j] + log_matrix[j, :] + log_matrix[:, i]
+    cycles[[i, j]] = 0.0
+    k = int(np.abs(cycles).argmax())
+
+    report.update(
+        max_error=math.expm1(float(magnitude[i, j])),
+        worst_pair=(codes[i], codes[j]),
+        worst_triangle=(codes[i], codes[j], codes[k]),
+        triangle_error=math.expm1(abs(float(cycles[k]))),
+        inconsistent_pairs=int(np.count_nonzero(magnitude > math.log1p(tolerance))),
+    )
+    return report
+
+
+def compare_snapshots(rates, reference, tolerance=0.0001, outlier_z=5.0):
+    """
+    Find currencies whose rate disagrees between two providers' snapshots
+    Args:
+        rates: dict - exchange rates (any base)
+        reference: dict - a second provider's rates (may use another base)
+        tolerance: float - relative deviation that is never reported, however uniform the rest
+        outlier_z: float - robust z-score above which a deviation is reported
+    Returns: dict - compared (common currencies), offset (median relative difference,
+             e.g. from a different base), spread (robust std of the rest),
+             outliers: code -> relative deviation after removing the offset, largest first
+    """
+    codes = [
+        code for code in rates
+        if code in reference and rates[code] > 0 and reference[code] > 0
+    ]
+    if not codes:
+        return {"compared": 0, "offset": None, "spread": None, "outliers": {}}
+
+    diffs = np.log(np.fromiter((reference[code] for code in codes), np.float64, len(codes)))
+    diffs -= np.log(np.fromiter((rates[code] for code in codes), np.float64, len(codes)))
+    offset = float(np.median(diffs))
+    deviations = diffs - offset
+    spread = _MAD_SCALE * float(np.median(np.abs(deviations)))
+
+    limit = max(math.log1p(tolerance), outlier_z * spread)
+    flagged = np.flatnonzero(np.abs(deviations) > limit)
+    flagged = flagged[np.argsort(-np.abs(deviations[flagged]))]
+    return {
+        "compared": len(codes),
+        "offset": math.expm1(offset),
+        "spread": spread,
+        "outliers": {codes[i]: math.expm1(float(deviations[i])) for i in flagged},
+    }
+
+
+def check_snapshot(rates, reference=None, codes=None, tolerance=0.0001, outlier_z=5.0):
+    """
+    Check a snapshot's cross-rate matrix (and, optionally, agreement with another provider)
+    Args:
+        rates: dict - exchange rates from USD
+        reference: dict - a second provider's snapshot to compare with (optional)
+        codes: sequence of str - matrix order (default: every valid code in rates)
+        tolerance: float - relative error treated as inconsistent
+        outlier_z: float - robust z-score for reference outliers
+    Returns: dict - currencies, invalid (codes with unusable rates), the check_cross_rates()
+             fields, reference (compare_snapshots() result or None), ok, checked_at, seconds
+    """
+    start = time.perf_counter()
+    if codes is None:
+        codes = list(rates)
+    invalid = [code for code in codes if not (isinstance(rates.get(code), (int, float)) and 0 < rates[code] < math.inf)]
+    codes = [code for code in codes if code not in invalid] if invalid else list(codes)
+
+    # The cross rates the converter serves: every pair pivots through USD
+    usd_rates = np.fromiter((rates[code] for code in codes), np.float64, len(codes))
+    matrix = usd_rates[np.newaxis, :] / usd_rates[:, np.newaxis]
+    report = {"currencies": len(codes), "invalid": invalid}
+    report.update(check_cross_rates(codes, matrix, tolerance))
+    report["reference"] = (
+        compare_snapshots(rates, reference, tolerance, outlier_z) if reference is not None else None
+    )
+    report["ok"] = not (invalid or report["inconsistent_pairs"] or (report["reference"] or {}).get("outliers"))
+    report["checked_at"] = time.time()
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def timing_benchmark(currencies, repeat=20, seed=42):
+    """
+    Time check_snapshot() with a reference on a synthetic snapshot
+    Returns: dict - currencies, seconds (median per check)
+    """
+    rng = np.random.default_rng(seed)
+    values = np.exp(rng.uniform(-5, 8, currencies))
+    rates = {f"C{i:04d}": float(value) for i, value in enumerate(values)}
+    # Second provider: another base, small noise, one currency off by 2%
+    noise = np.exp(rng.normal(0, 1e-5, currencies))
+    reference = {code: rate * 0.92 * noise[i] for i, (code, rate) in enumerate(rates.items())}
+    reference["C0007"] *= 1.02
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        check_snapshot(rates, reference)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {"currencies": currencies, "seconds": timings[len(timings) // 2]}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rate consistency check timing")
+    parser.add_argument("--currencies", type=int, nargs="*", default=[160, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.currencies:
+        result = timing_benchmark(count, args.repeat)
+        print(f"{count:>6} currencies  {result['seconds'] * 1000:>8.2f}ms per check")
@@ -0,0 +1,228 @@
+"""
+Historical exchange rate store with as-of-date conversion
+
+Snapshots are appended to a directory of flat float64 columns: one file of
+timestamps and one file per currency code (NaN where a currency was not
+quoted). Readers memory-map the columns, so loading is instant regardless
+of history length, and look up the snapshot in effect at any time with a
+binary search. Bulk restatement is a vectorized join: one searchsorted for
+all rows, then one gather per currency.
+
+Appends from several processes (e.g. service.py --workers, each with its
+own refresher) are serialized by an advisory lock file; any number may read.
+"""
+
+import contextlib
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, run a single writer
+    fcntl = None
+
+_TIMES_FILE = "timestamps.f64"
+_LOCK_FILE = ".append.lock"
+_SUFFIX = ".f64"
+
+
+def to_unix(timestamps):
+    """
+    Normalize timestamps to unix seconds
+    Args:
+        timestamps: float(s), numpy datetime64 value(s), or ISO date/datetime string(s)
+    Returns: numpy float64 array (or 0-d array for a single value)
+    """
+    values = np.asarray(timestamps)
+    if values.dtype.kind in "USO":
+        values = values.astype("datetime64[s]")
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[ns]").astype(np.int64) / 1e9
+    return values.astype(np.float64)
+
+
+class RateHistory:
+    """Append-only columnar time series of rate snapshots"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: str - directory holding the column files (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._times = np.empty(0)
+        self._columns = {}
+        self._loaded_bytes = -1
+        os.makedirs(path, exist_ok=True)
+
+    def _column_path(self, code):
+        return os.path.join(self.path, code + _SUFFIX)
+
+    @staticmethod
+    def _map(path, length):
+        if length == 0:
+            return np.empty(0)
+        return np.memmap(path, dtype=np.float64, mode="r", shape=(length,))
+
+    def _ensure_loaded(self):
+        """(Re)map the columns if the store grew since the last load"""
+        times_path = os.path.join(self.path, _TIMES_FILE)
+        size = os.path.getsize(times_path) if os.path.exists(times_path) else 0
+        if size == self._loaded_bytes:
+            return
+        length = size // 8
+        self._times = self._map(times_path, length)
+        self._columns = {
+            name[:-len(_SUFFIX)]: self._map(os.path.join(self.path, name), length)
+            for name in os.listdir(self.path)
+            if name.endswith(_SUFFIX) and name != _TIMES_FILE
+        }
+        self._loaded_bytes = size
+
+    @property
+    def times(self):
+        """Snapshot timestamps (unix seconds, ascending)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._times
+
+    @property
+    def codes(self):
+        """Currency codes that appear anywhere in the history"""
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(self._columns)
+
+    def __len__(self):
+        return len(self.times)
+
+    @contextlib.contextmanager
+    def _append_lock(self):
+        """Hold the directory's lock file so appends from other processes wait"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, _LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, rates, timestamp):
+        """
+        Append a snapshot
+        Args:
+            rates: dict - exchange rates from USD
+            timestamp: float - unix time the snapshot was fetched
+        Returns: bool - False if skipped (not newer than, or identical to, the last snapshot)
+        """
+        with self._lock, self._append_lock():
+            # Another process may have appended since the last load
+            self._ensure_loaded()
+            length = len(self._times)
+            if length:
+                if timestamp <= self._times[-1]:
+                    return False
+                unchanged = set(rates) == {
+                    code for code, column in self._columns.items() if not np.isnan(column[-1])
+                } and all(self._columns[code][-1] == rate for code, rate in rates.items())
+                if unchanged:
+                    return False
+
+            for code in set(self._columns) | set(rates):
+                path = self._column_path(code)
+                with open(path, "ab") as f:
+                    # Repair columns left longer than the timestamps by an interrupted append
+                    if f.tell() != length * 8:
+                        if f.tell() > length * 8:
+                            f.truncate(length * 8)
+                        else:
+                            # New currency: earlier snapshots did not quote it
+                            f.write(np.full(length - f.tell() // 8, np.nan).tobytes())
+                    f.write(np.float64(rates.get(code, np.nan)).tobytes())
+
+            # Timestamps are written last: they define which rows exist
+            with open(os.path.join(self.path, _TIMES_FILE), "ab") as f:
+                f.write(np.float64(timestamp).tobytes())
+            self._loaded_bytes = -1
+            return True
+
+    def as_of(self, timestamp):
+        """
+        Get the snapshot in effect at a point in time
+        Args:
+            timestamp: float, datetime64 or ISO string
+        Returns: tuple (rates: dict, snapshot_time: float), or None if before the first snapshot
+        """
+        with self._lock:
+            self._ensure_loaded()
+            index = int(np.searchsorted(self._times, to_unix(timestamp), side="right")) - 1
+            if index < 0:
+                return None
+            rates = {
+                code: float(column[index])
+                for code, column in self._columns.items()
+                if not np.isnan(column[index])
+            }
+            return rates, float(self._times[index])
+
+    def rates_as_of(self, currencies, timestamps):
+        """
+        Vectorized lookup of each row's rate from USD at each row's time
+        Args:
+            currencies: array-like of str - currency code per row
+            timestamps: array-like - time per row (see to_unix)
+        Returns: numpy float64 array (NaN before the first snapshot or if not quoted then)
+        Raises: KeyError for a code never seen in the history
+        """
+        currencies = np.asarray(currencies).ravel()
+        with self._lock:
+            self._ensure_loaded()
+            index = self._snapshot_index(timestamps, currencies.shape)
+            return self._gather(currencies, index)
+
+    def convert_as_of(self, amounts, from_currencies, to_currencies, timestamps):
+        """
+        Convert each row at the rates in effect at that row's time
+        Args:
+            amounts: array-like of float
+            from_currencies: array-like of str
+            to_currencies: array-like of str
+            timestamps: array-like - time per row (see to_unix)
+        Returns: numpy float64 array (NaN where no rate existed at that time)
+        Raises: KeyError for a code never seen in the history
+        """
+        amounts = np.asarray(amounts, dtype=np.float64).ravel()
+        from_codes = np.broadcast_to(np.asarray(from_currencies), amounts.shape)
+        to_codes = np.broadcast_to(np.asarray(to_currencies), amounts.shape)
+        with self._lock:
+            self._ensure_loaded()
+            index = self._snapshot_index(timestamps, amounts.shape)
+            return amounts * self._gather(to_codes, index) / self._gather(from_codes, index)
+
+    def _snapshot_index(self, timestamps, shape):
+        """Row -> position of the snapshot in effect (-1 before the first one)"""
+        index = np.searchsorted(self._times, to_unix(timestamps), side="right") - 1
+        return np.broadcast_to(index, shape)
+
+    def _gather(self, currencies, index):
+        """Pick column[currency][index] for every row, one slice per currency"""
+        result = np.full(currencies.shape, np.nan)
+
+        # Sort rows by currency once so each currency's rows are one slice
+        codes, inverse = np.unique(currencies, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.searchsorted(inverse[order], np.arange(len(codes) + 1))
+
+        for k, code in enumerate(codes):
+            column = self._columns.get(str(code))
+            if column is None:
+                raise KeyError(str(code))
+            rows = order[starts[k]:starts[k + 1]]
+            rows = rows[index[rows] >= 0]
+            result[rows] = column[index[rows]]
+        return result
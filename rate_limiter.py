@@ -0,0 +1,192 @@
+"""
+Rate limiting and request coalescing for upstream rate fetches
+
+The free rates API has a small quota, so every upstream fetch goes through
+an UpstreamGate: callers arriving while a fetch is running, or within a
+short window after it finished, share its result instead of issuing their
+own, and the fetches that do go out are paced by a token bucket. A separate
+TokenBucket per Streamlit session keeps one user from monopolising it.
+"""
+
+import threading
+import time
+
+
+class RateLimited(Exception):
+    """Raised when the token bucket has no token for an upstream fetch"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Upstream rate limit reached, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked"""
+
+    # One bucket per session: no per-instance __dict__
+    __slots__ = ("rate", "capacity", "_clock", "_tokens", "_updated", "_lock")
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        Args:
+            rate: float - tokens added per second
+            capacity: float - maximum burst size (the bucket starts full)
+            clock: callable - monotonic time source in seconds
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available, without waiting
+        Returns: bool - True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def retry_after(self, tokens=1):
+        """Seconds until try_acquire(tokens) can succeed (0 if it can now)"""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self):
+        # Caller must hold self._lock
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class UpstreamGate:
+    """
+    Single-flight, windowed coalescing in front of a token bucket
+
+    - a fetch is running: wait for it and share its result (coalesced)
+    - a fetch finished less than `window` seconds ago: reuse its result (coalesced)
+    - otherwise take a token and fetch (issued), or raise RateLimited (limited)
+    """
+
+    def __init__(self, bucket, window=0.0, on_outcome=None, clock=time.monotonic):
+        """
+        Args:
+            bucket: TokenBucket - paces the fetches that actually go upstream
+            window: float - seconds a finished fetch's result is shared with new callers
+            on_outcome: callable(str) - called with "issued", "coalesced" or "limited" per call
+            clock: callable - monotonic time source in seconds
+        """
+        self.bucket = bucket
+        self.window = window
+        self._on_outcome = on_outcome
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight = None  # threading.Event while a fetch is running
+        self._result = None
+        self._error = None
+        self._finished_at = None
+
+        # Monitoring counters
+        self.issued = 0
+        self.coalesced = 0
+        self.limited = 0
+
+    def call(self, fetch):
+        """
+        Run fetch() upstream, or share the result of a concurrent or recent call
+        Args:
+            fetch: callable - the upstream fetch (its return value is shared as-is)
+        Returns: whatever fetch() returned
+        Raises: RateLimited when a new fetch is needed but the bucket is empty
+        """
+        with self._lock:
+            if self._inflight is not None:
+                self.coalesced += 1
+                outcome, event = "coalesced", self._inflight
+            elif self._finished_at is not None and self._clock() - self._finished_at < self.window:
+                self.coalesced += 1
+                outcome, event, recent = "coalesced", None, self._result
+            elif not self.bucket.try_acquire():
+                self.limited += 1
+                outcome, event = "limited", None
+            else:
+                self.issued += 1
+                outcome, event = "issued", None
+                self._inflight = threading.Event()
+        if self._on_outcome is not None:
+            self._on_outcome(outcome)
+
+        if outcome == "limited":
+            raise RateLimited(self.bucket.retry_after())
+        if outcome == "coalesced" and event is None:
+            # A recent result still inside the window
+            return recent
+
+        if event is not None:
+            # Joined a running fetch
+            event.wait()
+            with self._lock:
+                if self._error is not None:
+                    raise self._error
+                return self._result
+
+        result, error = None, None
+        try:
+            result = fetch()
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self._result, self._error = result, error
+                # A fetch that raised is shared with waiters but not reused afterwards
+                self._finished_at = self._clock() if error is None else None
+                event, self._inflight = self._inflight, None
+            event.set()
+
+    def stats(self):
+        """Return issued/coalesced/limited counters for monitoring"""
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "coalesced": self.coalesced,
+                "limited": self.limited,
+                "tokens": self.bucket.tokens,
+            }
+
+
+# Gates shared by every Streamlit session in this process
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def shared_gate(name, factory):
+    """
+    Return the process-wide UpstreamGate registered under name
+    Args:
+        name: str - registry key
+        factory: callable - builds the gate the first time
+    Returns: UpstreamGate
+    """
+    with _gates_lock:
+        gate = _gates.get(name)
+        if gate is None:
+            gate = factory()
+            _gates[name] = gate
+        return gate
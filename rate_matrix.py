@@ -0,0 +1,129 @@
+"""
+Precomputed cross-rate matrix for the Currency Converter
+
+A RateMatrix is built once per rates snapshot and holds every pairwise
+cross rate, so single conversions become one array lookup and batch
+conversions become a single vectorized multiply.
+"""
+
+import threading
+
+import numpy as np
+
+from rate_cache import FrozenRates
+
+
+class RateMatrix:
+    """
+    All pairwise cross rates for one rates snapshot
+
+    matrix[i, j] is the number of units of codes[j] per one unit of codes[i].
+    """
+
+    def __init__(self, codes, usd_rates):
+        """
+        Args:
+            codes: sequence of str - currency codes, defines the array order
+            usd_rates: sequence of float - rate from USD for each code
+        """
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.usd_rates = np.asarray(usd_rates, dtype=np.float64)
+        self.matrix = self.usd_rates[np.newaxis, :] / self.usd_rates[:, np.newaxis]
+
+        # Sorted code table for vectorized code -> index lookups
+        self._sorted_order = np.argsort(np.array(self.codes))
+        self._sorted_codes = np.array(self.codes)[self._sorted_order]
+
+    @classmethod
+    def from_rates(cls, rates, codes=None):
+        """
+        Build a matrix from a rates dict as returned by get_exchange_rates()
+        Args:
+            rates: dict - exchange rates from USD
+            codes: iterable of str - preferred order (codes missing from rates are skipped)
+        Returns: RateMatrix
+        """
+        if codes is None:
+            codes = rates.keys()
+        codes = [code for code in codes if code in rates]
+        return cls(codes, [rates[code] for code in codes])
+
+    def rate(self, from_currency, to_currency):
+        """Get the cross rate: units of to_currency per 1 from_currency"""
+        return float(self.matrix[self.index[from_currency], self.index[to_currency]])
+
+    def convert(self, amount, from_currency, to_currency):
+        """Convert a single amount (same contract as convert_currency_multi)"""
+        return amount * self.rate(from_currency, to_currency)
+
+    def indices(self, currencies):
+        """
+        Map currency codes to matrix positions in one vectorized pass
+        Args:
+            currencies: array-like of str codes, or of int positions (passed through)
+        Returns: numpy int array
+        Raises: KeyError if a code is not in the matrix, IndexError for a position outside it
+        """
+        currencies = np.asarray(currencies)
+        if currencies.dtype.kind in "iu":
+            # No negative (from-the-end) positions: they would silently pick another currency
+            if currencies.size and (currencies.min() < 0 or currencies.max() >= len(self.codes)):
+                raise IndexError(f"Currency positions must be in [0, {len(self.codes)})")
+            return currencies.astype(np.intp, copy=False)
+
+        positions = np.searchsorted(self._sorted_codes, currencies)
+        positions = np.minimum(positions, len(self._sorted_codes) - 1)
+        found = self._sorted_codes[positions] == currencies
+        if not np.all(found):
+            missing = np.unique(currencies[~found])
+            raise KeyError(", ".join(str(code) for code in missing))
+        return self._sorted_order[positions]
+
+    def convert_batch(self, amounts, from_currencies, to_currencies):
+        """
+        Convert whole arrays of amounts in one vectorized call
+        Args:
+            amounts: array-like of float
+            from_currencies: array-like of codes or positions (or a single code)
+            to_currencies: array-like of codes or positions (or a single code)
+        Returns: numpy float64 array - converted amounts
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        from_idx = self.indices(from_currencies)
+        to_idx = self.indices(to_currencies)
+        return amounts * self.matrix[from_idx, to_idx]
+
+
+# Single-entry memo: the same snapshot is converted many times in a row
+_memo_lock = threading.Lock()
+_memo_key = None
+_memo_matrix = None
+_memo_frozen = (None, None, None)  # (rates, codes, matrix), read as one tuple
+
+
+def matrix_for(rates, codes=None):
+    """
+    Get the RateMatrix for a rates snapshot, building it only when the
+    snapshot's contents (or the requested code order) change - keyed on the
+    contents, so a dict changed in place is never served a stale matrix
+    Args:
+        rates: dict - exchange rates from USD
+        codes: iterable of str - preferred order
+    Returns: RateMatrix
+    """
+    global _memo_key, _memo_matrix, _memo_frozen
+
+    # A shared snapshot cannot change: passing the same one again is a constant-time hit
+    frozen = isinstance(rates, FrozenRates) and (codes is None or isinstance(codes, tuple))
+    memo_rates, memo_codes, memo_matrix = _memo_frozen
+    if frozen and memo_rates is rates and memo_codes is codes:
+        return memo_matrix
+
+    key = (tuple(rates.items()), None if codes is None else tuple(codes))
+    with _memo_lock:
+        if key != _memo_key:
+            _memo_matrix = RateMatrix.from_rates(rates, codes)
+            _memo_key = key
+        _memo_frozen = (rates, codes, _memo_matrix) if frozen else (None, None, None)
+        return _memo_matrix
@@ -0,0 +1,135 @@
+"""
+Background exchange rate refresher
+
+One daemon thread per server process keeps the shared RateCache up to date,
+so user requests only ever read the in-memory snapshot. Refreshes follow the
+API's own update cadence (time_next_update_unix) and back off on failures.
+"""
+
+import threading
+import time
+
+
+class RateRefresher:
+    """
+    Daemon thread that periodically refreshes a RateCache
+
+    Health is tracked as plain attributes and returned by health().
+    """
+
+    def __init__(self, cache, next_update=None, min_interval=5, max_interval=240, retry_interval=5):
+        """
+        Args:
+            cache: RateCache - cache to keep fresh
+            next_update: callable - returns the unix time the upstream publishes next (or None)
+            min_interval: float - never poll more often than this (seconds)
+            max_interval: float - never wait longer than this between polls (seconds)
+            retry_interval: float - first retry delay after a failure, doubled per failure
+        """
+        self.cache = cache
+        self._next_update = next_update
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.retry_interval = retry_interval
+
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # Health state
+        self.last_attempt = None
+        self.last_success = None
+        self.last_error = ""
+        self.consecutive_failures = 0
+        self.next_run = None
+
+    def start(self):
+        """Start the refresh thread (no-op if already running)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="rate-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the refresh thread"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def trigger(self):
+        """Refresh as soon as possible instead of waiting for the schedule"""
+        self._wake.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def health(self):
+        """
+        Get refresher health for the UI and monitoring
+        Returns: dict - running, last_attempt, last_success, consecutive_failures, last_error, next_run
+        """
+        return {
+            "running": self.running,
+            "last_attempt": self.last_attempt,
+            "last_success": self.last_success,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+        }
+
+    def refresh_once(self):
+        """Run one refresh and update health; returns the delay until the next one"""
+        self.last_attempt = time.time()
+        success, _, error = self.cache.refresh(fallback=False)
+
+        if success:
+            self.last_success = self.last_attempt
+            self.last_error = ""
+            self.consecutive_failures = 0
+            return self._scheduled_delay()
+
+        self.last_error = error
+        self.consecutive_failures += 1
+        delay = self.retry_interval * (2 ** (self.consecutive_failures - 1))
+        return min(delay, self.max_interval)
+
+    def _scheduled_delay(self):
+        """Wait until the upstream publishes new rates, within [min_interval, max_interval]"""
+        delay = self.max_interval
+        next_update = self._next_update() if self._next_update else None
+        if next_update:
+            delay = next_update - time.time() + 1  # small slack past the publish time
+        return max(self.min_interval, min(delay, self.max_interval))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            delay = self.refresh_once()
+            self.next_run = time.time() + delay
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+# Refreshers started in this process (one per cache name)
+_refreshers = {}
+_refreshers_lock = threading.Lock()
+
+
+def shared_refresher(name, cache, **kwargs):
+    """
+    Return the refresher registered under name, creating and starting it once
+    per process (Streamlit reruns get the already running thread)
+    Args:
+        name: str - registry key
+        cache: RateCache - cache to keep fresh
+        **kwargs: passed to RateRefresher
+    Returns: RateRefresher
+    """
+    with _refreshers_lock:
+        refresher = _refreshers.get(name)
+        if refresher is None:
+            refresher = RateRefresher(cache, **kwargs)
+            _refreshers[name] = refresher
+        return refresher.start()
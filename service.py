@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Headless conversion service
+
+A small JSON-over-HTTP API on top of the same core the Streamlit app uses.
+Conversions are served from the in-memory rate snapshot kept fresh by the
+background refresher, so requests never wait on the upstream API.
+
+Endpoints:
+    GET  /healthz
+    GET  /rates
+    GET  /convert?amount=100&from=USD&to=INR
+    GET  /rates/stream?currencies=EUR,INR
+                          server-sent events: a snapshot, then only currencies that moved
+    POST /convert/batch   {"amounts": [...], "from": [...] or "USD", "to": [...] or "INR"}
+                          or {"items": [{"amount": 1, "from": "USD", "to": "INR"}, ...]}
+    GET  /metrics         (when config.METRICS_ENABLED)
+
+Usage:
+    python service.py --port 8080 --workers 4
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config
+import metrics
+from rate_changes import ChangeEvent
+from currency_core import (
+    get_current_rates,
+    get_provider_stats,
+    get_rate_broadcaster,
+    get_rate_cache_stats,
+    get_rate_consistency,
+    get_rate_matrix,
+    get_refresher_health,
+    get_upstream_stats,
+    start_rate_refresher,
+)
+
+REQUEST_SECONDS = metrics.histogram("fx_service_request_seconds", "Service request latency")
+REQUESTS = metrics.counter("fx_service_requests_total", "Service requests by endpoint and status", ["endpoint", "status"])
+STREAMS = metrics.gauge("fx_service_stream_subscribers", "Connected /rates/stream subscribers",
+                        lambda: get_rate_broadcaster().subscribers)
+
+
+class ServiceError(Exception):
+    """Client error reported as a JSON error body"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _current_matrix():
+    success, rates, error = get_current_rates()
+    if not success:
+        raise ServiceError(f"Exchange rates unavailable: {error}", status=503)
+    return rates, get_rate_matrix(rates)
+
+
+def handle_convert(query):
+    """GET /convert - one conversion"""
+    try:
+        amount = float(query["amount"][0])
+        from_currency = query["from"][0].upper()
+        to_currency = query["to"][0].upper()
+    except (KeyError, IndexError, ValueError):
+        raise ServiceError("Expected query parameters amount, from and to")
+
+    _, matrix = _current_matrix()
+    try:
+        rate = matrix.rate(from_currency, to_currency)
+    except KeyError as e:
+        raise ServiceError(f"Unsupported currency: {e}")
+    return {"amount": amount, "from": from_currency, "to": to_currency, "rate": rate, "converted": amount * rate}
+
+
+def _batch_codes(codes, field):
+    """
+    Validate one batch column of currency codes, upper-cased like /convert
+    Matrix positions are an internal shortcut and are not accepted from clients.
+    Returns: str or list of str
+    """
+    if isinstance(codes, str):
+        return codes.upper()
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        raise ServiceError(f"Expected '{field}' to be a currency code or a list of currency codes")
+    return [code.upper() for code in codes]
+
+
+def handle_convert_batch(body):
+    """POST /convert/batch - many conversions in one vectorized call"""
+    if "items" in body:
+        items = body["items"]
+        amounts = [item["amount"] for item in items]
+        from_codes = [item["from"] for item in items]
+        to_codes = [item["to"] for item in items]
+    else:
+        amounts = body["amounts"]
+        from_codes = body["from"]
+        to_codes = body["to"]
+
+    from_codes = _batch_codes(from_codes, "from")
+    to_codes = _batch_codes(to_codes, "to")
+
+    if len(amounts) > config.SERVICE_MAX_BATCH:
+        raise ServiceError(f"Batch too large (max {config.SERVICE_MAX_BATCH} conversions)", status=413)
+
+    _, matrix = _current_matrix()
+    try:
+        converted = matrix.convert_batch(amounts, from_codes, to_codes)
+    except KeyError as e:
+        raise ServiceError(f"Unsupported currency: {e}")
+    except ValueError as e:
+        raise ServiceError(f"Invalid batch: {e}")
+    return {"count": len(converted), "converted": converted.tolist()}
+
+
+def handle_rates():
+    """GET /rates - the snapshot conversions are served from"""
+    rates, _ = _current_matrix()
+    return {"base": config.BASE_CURRENCY, "rates": rates, "cache": get_rate_cache_stats()}
+
+
+def handle_health():
+    """GET /healthz - rate snapshot, refresher, provider, upstream limiter and consistency state"""
+    stats = get_rate_cache_stats()
+    healthy = stats["version"] > 0
+    return {
+        "status": "ok" if healthy else "no-rates",
+        "cache": stats,
+        "refresher": get_refresher_health(),
+        "providers": get_provider_stats(),
+        "upstream": get_upstream_stats(),
+        "consistency": get_rate_consistency(),
+        "stream": get_rate_broadcaster().stats(),
+    }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        routes = {
+            "/convert": lambda: handle_convert(parse_qs(url.query)),
+            "/rates": handle_rates,
+            "/healthz": handle_health,
+        }
+        if url.path == "/metrics" and config.METRICS_ENABLED:
+            self._send(200, metrics.render().encode("utf-8"), "text/plain; version=0.0.4")
+            return
+        if url.path == "/rates/stream":
+            self._stream(parse_qs(url.query))
+            return
+        self._dispatch(url.path, routes.get(url.path))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        def batch():
+            # Checked before reading; a rejected body is left unread, so drop the connection
+            try:
+                length = int(self.headers.get("Content-Length", ""))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                raise ServiceError("A valid Content-Length header is required")
+            if length > config.SERVICE_MAX_BODY:
+                self.close_connection = True
+                raise ServiceError("Request body too large", status=413)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as e:
+                raise ServiceError(f"Invalid JSON: {e}")
+            try:
+                return handle_convert_batch(body)
+            except (KeyError, TypeError):
+                raise ServiceError("Expected amounts/from/to arrays or an items list")
+
+        self._dispatch(url.path, batch if url.path == "/convert/batch" else None)
+
+    def _stream(self, query):
+        """GET /rates/stream - push rate changes as server-sent events until the client leaves"""
+        currencies = {
+            code.strip().upper()
+            for value in query.get("currencies", [])
+            for code in value.split(",")
+            if code.strip()
+        } or None
+
+        success, _, error = get_current_rates()
+        if not success:
+            def unavailable():
+                raise ServiceError(f"Exchange rates unavailable: {error}", status=503)
+            self._dispatch("/rates/stream", unavailable)
+            return
+
+        broadcaster = get_rate_broadcaster()
+        with broadcaster.subscribe(currencies) as subscription:
+            snapshot = {
+                code: {"old": None, "new": rate, "change": None}
+                for code, rate in broadcaster.current(currencies).items()
+            }
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            REQUESTS.inc(endpoint="/rates/stream", status="200")
+            try:
+                self.wfile.write(ChangeEvent(0, "snapshot", snapshot).sse())
+                while True:
+                    events = subscription.drain(timeout=config.STREAM_HEARTBEAT)
+                    if events:
+                        self.wfile.write(b"".join(event.sse() for event in events))
+                    elif subscription.closed:
+                        break  # fell too far behind: the client reconnects for a fresh snapshot
+                    else:
+                        self.wfile.write(b": keepalive\n\n")
+            except OSError:
+                pass  # client went away
+
+    def _dispatch(self, endpoint, handler):
+        start = time.perf_counter()
+        if handler is None:
+            status, payload = 404, {"error": f"Unknown endpoint {endpoint}"}
+        else:
+            try:
+                status, payload = 200, handler()
+            except ServiceError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": f"Unexpected error: {str(e)}"}
+
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+        REQUEST_SECONDS.observe(time.perf_counter() - start)
+        REQUESTS.inc(endpoint=endpoint if handler else "unknown", status=str(status))
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host, port):
+    """Create (but do not start) a service bound to host:port"""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(server):
+    """Run one worker: start its refresher, then serve until interrupted"""
+    start_rate_refresher()
+    get_current_rates()  # load the first snapshot before taking traffic
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve(host, port, workers=1):
+    """
+    Run the service with one or more pre-forked worker processes sharing the
+    listening socket (each worker has its own threads and rate snapshot)
+    """
+    server = create_server(host, port)
+    server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    print(f"💱 Conversion service on http://{host}:{server.server_address[1]} ({workers} worker(s))", file=sys.stderr)
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        _serve(server)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+            _serve(server)
+            os._exit(0)
+        children.append(pid)
+
+    def stop_children(*_):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_children)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        stop_children()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Headless currency conversion service")
+    parser.add_argument("--host", default=config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVICE_WORKERS, help="worker processes")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Persistent on-disk store for exchange rate snapshots
+
+Each successful fetch is saved to a small SQLite file keyed by its fetch
+timestamp, with the rates packed as a float64 array next to a code list.
+On startup the newest snapshot is loaded so the first conversion does not
+wait for the network, and it keeps the app usable while the API is down.
+"""
+
+import sqlite3
+import threading
+from array import array
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    fetched_at REAL PRIMARY KEY,
+    codes TEXT NOT NULL,
+    rates BLOB NOT NULL
+)
+"""
+
+
+class SnapshotStore:
+    """
+    SQLite-backed rate snapshot store
+
+    Disk problems never propagate: failed writes are dropped and failed reads
+    behave like an empty store, so the converter keeps working without it.
+    """
+
+    def __init__(self, path, keep=100):
+        """
+        Args:
+            path: str - SQLite file path
+            keep: int - number of most recent snapshots to retain
+        """
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute(_SCHEMA)
+            self._ready = True
+        return conn
+
+    def save(self, rates, fetched_at):
+        """
+        Persist a snapshot
+        Args:
+            rates: dict - exchange rates from USD
+            fetched_at: float - unix timestamp of the fetch
+        Returns: bool - True if the snapshot was written
+        """
+        codes = list(rates.keys())
+        packed = array("d", (rates[code] for code in codes)).tobytes()
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                            (fetched_at, ",".join(codes), packed),
+                        )
+                        conn.execute(
+                            "DELETE FROM snapshots WHERE fetched_at NOT IN "
+                            "(SELECT fetched_at FROM snapshots ORDER BY fetched_at DESC LIMIT ?)",
+                            (self.keep,),
+                        )
+                finally:
+                    conn.close()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def latest(self):
+        """
+        Load the newest snapshot
+        Returns: tuple (rates: dict, fetched_at: float), or None if nothing is stored
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        "SELECT fetched_at, codes, rates FROM snapshots ORDER BY fetched_at DESC LIMIT 1"
+                    ).fetchone()
+                finally:
+                    conn.close()
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        fetched_at, codes, packed = row
+        values = array("d")
+        values.frombytes(packed)
+        return dict(zip(codes.split(","), values)), fetched_at
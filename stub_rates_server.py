@@ -0,0 +1,127 @@
+"""
+Local stub of the exchange rate API for offline tests and benchmarks
+
+Serves open.er-api.com style documents at /v6/latest/<BASE> from a thread,
+with optional injected latency and failures, and honours If-None-Match so
+conditional requests can be exercised.
+
+Usage:
+    with StubRatesServer({"USD": 1.0, "INR": 83.5}) as stub:
+        fetch_json(f"{stub.base_url}/USD")
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RATES = {
+    "USD": 1.0, "INR": 83.12, "EUR": 0.9215, "GBP": 0.7893, "JPY": 149.52,
+    "AUD": 1.5321, "CAD": 1.3587, "CHF": 0.8812, "CNY": 7.2345, "SGD": 1.3456
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.requests += 1
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.fail_next > 0:
+            stub.fail_next -= 1
+            self._send(stub.fail_status, stub.fail_body)
+            return
+
+        base = self.path.rstrip("/").rsplit("/", 1)[-1].upper()
+        if base not in stub.rates:
+            self._send(404, b'{"result": "error", "error-type": "unsupported-code"}')
+            return
+
+        etag = f'"{stub.version}-{base}"'
+        if self.headers.get("If-None-Match") == etag:
+            stub.not_modified += 1
+            self._send(304, b"", etag)
+            return
+
+        pivot = stub.rates[base]
+        document = {
+            "result": "success",
+            "base_code": base,
+            "time_last_update_unix": int(stub.updated_at),
+            "time_next_update_unix": stub.next_update,
+            "rates": {code: rate / pivot for code, rate in stub.rates.items()},
+        }
+        self._send(200, json.dumps(document).encode("utf-8"), etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubRatesServer:
+    """
+    Threaded stub API server
+    Attributes you may change while it runs:
+        rates: dict - rates from USD (call set_rates() to bump the ETag)
+        latency: float - seconds to sleep before every response
+        fail_next: int - number of upcoming requests answered with fail_status
+        fail_body: bytes - body of those responses (e.g. b"<html>" for a broken 200)
+        next_update: int or None - value sent as time_next_update_unix
+    """
+
+    def __init__(self, rates=None, latency=0.0, host="127.0.0.1", port=0):
+        self.rates = dict(rates or DEFAULT_RATES)
+        self.latency = latency
+        self.fail_next = 0
+        self.fail_status = 503
+        self.fail_body = b'{"result": "error"}'
+        self.next_update = None
+        self.version = 1
+        self.updated_at = time.time()
+        self.requests = 0
+        self.not_modified = 0
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """URL to use as config.API_BASE_URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v6/latest"
+
+    def set_rates(self, rates):
+        """Publish new rates (changes the ETag)"""
+        self.rates = dict(rates)
+        self.version += 1
+        self.updated_at = time.time()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-rates-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -6,7 +6,7 @@ Run this to test the core functions without starting Streamlit
 
 import requests
 import json
-from app import get_exchange_rate, convert_currency, get_exchange_rates, convert_currency_multi
+from currency_core import get_exchange_rate, convert_currency, get_exchange_rates, convert_currency_multi
 
 def test_api_connection():
     """Test if the API is accessible"""
@@ -113,6 +113,1012 @@ def test_multi_currency_conversion():
         print("❌ Some multi-currency conversions failed!")
         return False
 
+def test_rate_cache():
+    """Test the shared rate cache (offline, uses a fake loader)"""
+    print("\n🔍 Testing rate cache...")
+    import threading
+    import time
+    from rate_cache import RateCache
+
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return True, {"USD": 1.0, "INR": 83.5}, ""
+
+    cache = RateCache(slow_loader, ttl=60, max_stale=60)
+
+    # Many concurrent misses must trigger exactly one upstream fetch
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and all(r[0] for r in results), f"❌ Expected 1 upstream fetch, got {len(calls)}"
+
+    # Fresh snapshot is a hit
+    cache.get()
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 20, f"❌ Unexpected cache counters: {stats}"
+
+    # Stale snapshot is served immediately while one refresh runs
+    cache._fetched_at -= 61
+    start = time.time()
+    success, rates, _ = cache.get()
+    elapsed = time.time() - start
+    time.sleep(0.1)
+
+    assert success and elapsed <= 0.02 and len(calls) == 2, \
+        f"❌ Stale-while-revalidate failed (elapsed {elapsed:.3f}s, fetches {len(calls)})"
+
+    print(f"✅ Rate cache working! Stats: {cache.stats()}")
+
+def test_rate_matrix():
+    """Test the precomputed cross-rate matrix and batch conversion (offline)"""
+    print("\n🔍 Testing rate matrix and batch conversion...")
+    from currency_core import convert_currency_batch, get_rate_matrix
+
+    rates = {"USD": 1.0, "INR": 83.5, "EUR": 0.92, "GBP": 0.79, "JPY": 149.8}
+    matrix = get_rate_matrix(rates)
+
+    test_cases = [
+        (100, "USD", "INR"),
+        (100, "INR", "USD"),
+        (100, "EUR", "GBP"),
+        (100, "JPY", "JPY")
+    ]
+    amounts = [case[0] for case in test_cases]
+    from_codes = [case[1] for case in test_cases]
+    to_codes = [case[2] for case in test_cases]
+    batch = convert_currency_batch(amounts, from_codes, to_codes, rates)
+
+    for (amount, from_curr, to_curr), result in zip(test_cases, batch):
+        expected = convert_currency_multi(amount, from_curr, to_curr, rates)
+        single = matrix.convert(amount, from_curr, to_curr)
+        assert abs(result - expected) <= 1e-9 * abs(expected) and abs(single - expected) <= 1e-9 * abs(expected), \
+            f"❌ {amount} {from_curr} → {to_curr}: batch {result}, single {single}, expected {expected}"
+
+    # Unknown codes raise KeyError like convert_currency_multi
+    try:
+        convert_currency_batch([1.0], ["USD"], ["XXX"], rates)
+        raise AssertionError("❌ Unknown currency code was not rejected")
+    except KeyError:
+        pass
+
+    # A dict changed in place is not served the matrix memoized for its old contents
+    rates["INR"] = 90.0
+    rates["CHF"] = 0.88
+    changed = convert_currency_batch([1.0, 1.0], ["USD", "USD"], ["INR", "CHF"], rates)
+    assert list(changed) == [90.0, 0.88], f"❌ Stale matrix after an in-place change: {changed}"
+
+    print("✅ Rate matrix working correctly!")
+
+def test_bulk_convert():
+    """Test streaming bulk conversion of a CSV ledger (offline)"""
+    print("\n🔍 Testing bulk conversion...")
+    import csv
+    import io
+    import json
+    import os
+    import tempfile
+    from bulk_convert import RowWriter, convert_stream, load_rates, read_rows
+    from rate_matrix import RateMatrix
+
+    rates = {"USD": 1.0, "INR": 83.5, "EUR": 0.92}
+    ledger = io.StringIO("amount,from,to\n100,USD,INR\n835,INR,USD\nbad,USD,EUR\n50,EUR,XXX\n10,EUR,EUR\n")
+    output = io.StringIO()
+
+    processed, failed = convert_stream(
+        read_rows(ledger, "csv"),
+        RowWriter(output, "csv", "converted"),
+        RateMatrix.from_rates(rates),
+        chunk_size=2
+    )
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+
+    expected = ["8350.0", "10.0", "", "", "10.0"]
+    actual = [row["converted"] for row in rows]
+    assert processed == 5 and failed == 2 and actual == expected, \
+        f"❌ Bulk conversion mismatch: {actual} (processed {processed}, failed {failed})"
+
+    # Malformed or non-object JSONL lines fail like bad CSV rows instead of ending the run
+    ledger = io.StringIO('{"amount": 100, "from": "USD", "to": "INR"}\n{not json\n[1, 2]\n')
+    output = io.StringIO()
+    processed, failed = convert_stream(
+        read_rows(ledger, "jsonl"), RowWriter(output, "jsonl", "converted"), RateMatrix.from_rates(rates)
+    )
+    converted = [json.loads(line)["converted"] for line in output.getvalue().splitlines()]
+    assert processed == 3 and failed == 2 and converted == [8350.0, "", ""], \
+        f"❌ Bad JSONL lines not counted as failed rows: {converted} (failed {failed})"
+
+    # Integer codes are not matrix positions, extra or missing CSV fields fail the row,
+    # and lowercase codes are accepted like the service's batch endpoint
+    ledger = io.StringIO('{"amount": 10, "from": 0, "to": 1}\n{"amount": 10, "from": "USD", "to": 7}\n'
+                         '{"amount": 10, "from": "usd", "to": "inr"}\n')
+    output = io.StringIO()
+    processed, failed = convert_stream(
+        read_rows(ledger, "jsonl"), RowWriter(output, "jsonl", "converted"), RateMatrix.from_rates(rates)
+    )
+    converted = [json.loads(line)["converted"] for line in output.getvalue().splitlines()]
+    assert failed == 2 and converted == ["", "", 835.0], \
+        f"❌ Non-string or lowercase codes mishandled: {converted} (failed {failed})"
+    ledger = io.StringIO("amount,from,to\n5,USD,EUR,extra\n7,USD\n100,usd,inr\n")
+    output = io.StringIO()
+    processed, failed = convert_stream(
+        read_rows(ledger, "csv"), RowWriter(output, "csv", "converted"), RateMatrix.from_rates(rates)
+    )
+    actual = [row["converted"] for row in csv.DictReader(io.StringIO(output.getvalue()))]
+    assert processed == 3 and failed == 2 and actual == ["", "", "8350.0"], \
+        f"❌ Malformed CSV rows mishandled: {actual} (failed {failed})"
+
+    # A rates file with unusable values is rejected with a message, not a traceback
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.json")
+        with open(path, "w") as f:
+            json.dump({"rates": {"USD": 1.0, "INR": "x", "EUR": -1}}, f)
+        success, _, error = load_rates(path)
+    assert not success and "INR" in error and "EUR" in error, f"❌ Invalid rates file accepted: {error}"
+
+    print(f"✅ Bulk conversion working! {processed} rows, {failed} rejected")
+
+def test_snapshot_store():
+    """Test on-disk snapshots and offline fallback (offline)"""
+    print("\n🔍 Testing snapshot store and offline fallback...")
+    import os
+    import tempfile
+    import time
+    from rate_cache import RateCache
+    from snapshot_store import SnapshotStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, "rates.sqlite3"), keep=2)
+        assert store.latest() is None, "❌ Empty store returned a snapshot"
+
+        now = time.time()
+        for i in range(3):
+            store.save({"USD": 1.0, "INR": 83.0 + i}, now - 3600 + i)
+        rates, fetched_at = store.latest()
+        assert rates == {"USD": 1.0, "INR": 85.0} and fetched_at == now - 3598, \
+            f"❌ Unexpected latest snapshot: {rates} @ {fetched_at}"
+
+    # Upstream down: an old primed snapshot is served within fallback_max_age
+    def failing_loader():
+        return False, {}, "Network error: offline"
+
+    cache = RateCache(failing_loader, ttl=60, max_stale=60, fallback_max_age=7200)
+    cache.prime(rates, fetched_at)
+    success, served, error = cache.get()
+    assert success and served == rates, f"❌ Fallback snapshot not served: {error}"
+
+    cache.fallback_max_age = 60
+    success, served, error = cache.get()
+    assert not success, "❌ Snapshot older than fallback_max_age was served"
+
+    print("✅ Snapshot store and offline fallback working!")
+
+def test_http_client():
+    """Test retries and conditional requests against a local stub API (offline)"""
+    print("\n🔍 Testing HTTP client against stub API...")
+    import time
+    import config
+    import http_client
+    from currency_core import fetch_exchange_rates
+    from providers import HTTPProvider
+    from stub_rates_server import StubRatesServer
+
+    original_backoff = config.API_RETRY_BACKOFF
+    original_url = config.API_BASE_URL
+    config.API_RETRY_BACKOFF = 0.01
+    try:
+        with StubRatesServer() as stub:
+            url = f"{stub.base_url}/USD"
+            http_client.forget(url)
+
+            # Temporary failures are retried
+            stub.fail_next = 2
+            data = http_client.fetch_json(url)
+            assert data["rates"]["INR"] == stub.rates["INR"] and stub.requests == 3, \
+                f"❌ Retry failed ({stub.requests} requests)"
+
+            # Unchanged document is revalidated with a 304 and not re-parsed
+            again = http_client.fetch_json(url)
+            assert again is data and stub.not_modified == 1, "❌ Conditional request did not reuse the cached document"
+
+            # Before time_next_update_unix no request is made at all
+            stub.next_update = int(time.time()) + 3600
+            http_client.forget(url)
+            http_client.fetch_json(url)
+            before = stub.requests
+            http_client.fetch_json(url)
+            assert stub.requests == before, "❌ Fetched again before the API's next update time"
+            http_client.forget(url)
+
+            # A 200 with a body that is not JSON is an invalid response, not a network error
+            stub.fail_status, stub.fail_body = 200, b"<html>maintenance</html>"
+            stub.fail_next = 2
+            config.API_BASE_URL = stub.base_url
+            success, _, error = fetch_exchange_rates()
+            assert not success and error.startswith("Invalid response from API"), \
+                f"❌ Invalid JSON reported as: {error}"
+            success, _, error = HTTPProvider("stub", url).fetch()
+            assert not success and error.startswith("Invalid response from API"), \
+                f"❌ Provider reported invalid JSON as: {error}"
+    finally:
+        config.API_RETRY_BACKOFF = original_backoff
+        config.API_BASE_URL = original_url
+
+    print("✅ HTTP client working!")
+
+def test_async_rates():
+    """Test the async rate API against a local stub API (offline)"""
+    print("\n🔍 Testing async exchange rates...")
+    import asyncio
+    import time
+    import config
+    from currency_core import _rate_cache, _upstream_gate, aget_exchange_rates, aget_exchange_rates_many
+    from stub_rates_server import StubRatesServer
+
+    original_url = config.API_BASE_URL
+    try:
+        with StubRatesServer(latency=0.2) as stub:
+            config.API_BASE_URL = stub.base_url
+
+            # Several bases are fetched concurrently, not one after another
+            start = time.time()
+            results = asyncio.run(aget_exchange_rates_many(["EUR", "GBP", "JPY", "INR"]))
+            elapsed = time.time() - start
+
+            assert all(success for success, _, _ in results.values()) and elapsed <= 0.6, \
+                f"❌ Concurrent fetch failed or was serial ({elapsed:.2f}s)"
+            assert abs(results["EUR"][1]["USD"] - 1 / stub.rates["EUR"]) <= 1e-9, "❌ EUR-based rates are wrong"
+
+            # Other bases go through an upstream gate of their own: a repeat is coalesced
+            before = stub.requests
+            success, _, _ = asyncio.run(aget_exchange_rates("EUR"))
+            stats = _upstream_gate("EUR").stats()
+            assert success and stub.requests == before and stats["issued"] == 1 and stats["coalesced"] >= 1, \
+                f"❌ Non-default base bypassed the upstream gate: {stub.requests - before} requests, {stats}"
+
+        # Default base is served from the same snapshot sync callers see
+        rates = {"USD": 1.0, "INR": 83.5}
+        _rate_cache().prime(rates)
+        success, async_rates, _ = asyncio.run(aget_exchange_rates())
+        assert success and async_rates is _rate_cache().peek() and async_rates == rates, \
+            "❌ Async caller did not share the sync cache snapshot"
+    finally:
+        config.API_BASE_URL = original_url
+
+    print(f"✅ Async exchange rates working! 4 bases in {elapsed:.2f}s")
+
+def test_rate_refresher():
+    """Test the background rate refresher and its health state (offline)"""
+    print("\n🔍 Testing background rate refresher...")
+    import time
+    from rate_cache import RateCache
+    from rate_refresher import RateRefresher
+
+    responses = [
+        (True, {"USD": 1.0, "INR": 83.0}, ""),
+        (False, {}, "Network error: down"),
+        (False, {}, "Network error: down"),
+        (True, {"USD": 1.0, "INR": 84.0}, "")
+    ]
+
+    def loader():
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    cache = RateCache(loader, ttl=60)
+    refresher = RateRefresher(cache, next_update=lambda: time.time() + 3600,
+                              min_interval=0.01, max_interval=0.05, retry_interval=0.01)
+
+    refresher.refresh_once()
+    refresher.refresh_once()
+    delay = refresher.refresh_once()
+    health = refresher.health()
+    assert health["consecutive_failures"] == 2 and "down" in health["last_error"] and delay == 0.02, \
+        f"❌ Failure tracking wrong: {health}, delay {delay}"
+    assert cache.peek() == {"USD": 1.0, "INR": 83.0}, "❌ Failed refresh replaced the snapshot"
+
+    # Running thread recovers and swaps the new snapshot in
+    refresher.start()
+    time.sleep(0.1)
+    refresher.stop(timeout=1)
+    health = refresher.health()
+    assert health["consecutive_failures"] == 0 and cache.peek() == {"USD": 1.0, "INR": 84.0}, \
+        f"❌ Refresher did not recover: {health}"
+
+    # Polls that return the same rates keep the snapshot (and what is memoized on its id)
+    snapshot = cache.current()
+    notified = []
+    cache.add_listener(lambda *args: notified.append(args))
+    refresher.refresh_once()
+    refresher.refresh_once()
+    assert cache.current() is snapshot and cache.version == snapshot.id and not notified, \
+        f"❌ Unchanged rates replaced the snapshot: version {cache.version}, {len(notified)} notifications"
+
+    print("✅ Background rate refresher working!")
+
+def test_exact_conversion():
+    """Test exact minor-unit conversion and rounding modes (offline)"""
+    print("\n🔍 Testing exact (minor unit) conversion...")
+    from decimal import Decimal
+    from money import convert_exact, convert_minor, convert_minor_batch, to_minor
+
+    rates = {"USD": 1.0, "INR": 83.12, "GBP": 0.5, "JPY": 149.52}
+
+    test_cases = [
+        # (amount_minor, from, to, rounding, expected_minor)
+        (5, "USD", "GBP", "ROUND_HALF_EVEN", 2),     # 2.5 pence -> 2
+        (15, "USD", "GBP", "ROUND_HALF_EVEN", 8),    # 7.5 pence -> 8
+        (5, "USD", "GBP", "ROUND_HALF_UP", 3),
+        (-5, "USD", "GBP", "ROUND_HALF_UP", -3),
+        (5, "USD", "GBP", "ROUND_DOWN", 2),
+        (10000, "USD", "JPY", "ROUND_HALF_EVEN", 14952),  # JPY has no minor unit
+        (100, "JPY", "USD", "ROUND_FLOOR", 66)
+    ]
+
+    for amount_minor, from_curr, to_curr, rounding, expected in test_cases:
+        single = convert_minor(amount_minor, from_curr, to_curr, rates, rounding)
+        batch = convert_minor_batch([amount_minor], [from_curr], [to_curr], rates, rounding)[0]
+        assert single == expected and batch == expected, \
+            f"❌ {amount_minor} {from_curr} → {to_curr} ({rounding}): {single}/{batch}, expected {expected}"
+
+    assert convert_exact(0.1, "USD", "INR", rates) == Decimal("8.31"), "❌ convert_exact returned the wrong amount"
+    assert to_minor("1.005", "USD", "ROUND_HALF_UP") == 101, "❌ to_minor rounding is wrong"
+
+    print("✅ Exact conversion working correctly!")
+
+def test_benchmark_suite():
+    """Test the benchmark harness end to end on a tiny workload (offline)"""
+    print("\n🔍 Testing benchmark suite...")
+    import json
+    import os
+    import tempfile
+    import benchmark
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results_path = os.path.join(tmp, "results.json")
+        baseline_path = os.path.join(tmp, "baseline.json")
+        args = ["--rows", "1000", "--fetches", "2", "--repeat", "1"]
+
+        assert benchmark.main(args + ["--json", results_path]) == 0, "❌ Benchmark run failed"
+        with open(results_path) as f:
+            report = json.load(f)
+        assert set(report["results"]) == set(benchmark.CASES), f"❌ Missing cases in report: {sorted(report['results'])}"
+
+        # A baseline that is impossibly fast must be reported as a regression
+        for result in report["results"].values():
+            result["median_s"] = result["min_s"] = 1e-12
+        with open(baseline_path, "w") as f:
+            json.dump(report, f)
+        assert benchmark.main(args + ["--check", baseline_path]) == 1, "❌ Regression against baseline was not detected"
+
+    print("✅ Benchmark suite working!")
+
+def test_metrics():
+    """Test instrumentation and the Prometheus metrics endpoint (offline)"""
+    print("\n🔍 Testing metrics...")
+    import urllib.request
+    import metrics
+
+    def work():
+        return 42
+
+    original = metrics.enabled
+    try:
+        # Disabled: decorator must hand back the original function
+        metrics.enabled = False
+        latency = metrics.histogram("fx_test_seconds", "Test latency")
+        assert metrics.timed(latency)(work) is work, "❌ timed() wrapped a function while metrics were disabled"
+
+        metrics.enabled = True
+        errors = metrics.counter("fx_test_errors_total", "Test errors", ["type"])
+        errors.inc(type="network")
+        errors.inc(type="network")
+        metrics.timed(latency)(work)()
+        with latency.time():
+            pass
+
+        server = metrics.start_server(port=0)
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    finally:
+        metrics.enabled = original
+
+    expected_lines = [
+        "# TYPE fx_test_errors_total counter",
+        'fx_test_errors_total{type="network"} 2',
+        "# TYPE fx_test_seconds histogram",
+        'fx_test_seconds_bucket{le="+Inf"} 2',
+        "fx_test_seconds_count 2",
+        "# TYPE fx_rate_cache_hits gauge"
+    ]
+    missing = [line for line in expected_lines if line not in body]
+    assert not missing, f"❌ Missing from /metrics: {missing}"
+
+    print("✅ Metrics working!")
+
+def test_service():
+    """Test the headless conversion service endpoints (offline)"""
+    print("\n🔍 Testing conversion service...")
+    import http.client
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+    from currency_core import _rate_cache
+    from service import create_server
+
+    _rate_cache().prime({"USD": 1.0, "INR": 83.5, "EUR": 0.92})
+    server = create_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        try:
+            with urllib.request.urlopen(base + path, data=data, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def post_with_length(length):
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        try:
+            connection.putrequest("POST", "/convert/batch")
+            if length is not None:
+                connection.putheader("Content-Length", length)
+            connection.endheaders()
+            return connection.getresponse().status
+        finally:
+            connection.close()
+
+    try:
+        status, single = call("/convert?amount=100&from=USD&to=INR")
+        _, batch = call("/convert/batch", {"amounts": [100, 835], "from": ["USD", "INR"], "to": "INR"})
+        _, items = call("/convert/batch", {"items": [{"amount": 92, "from": "EUR", "to": "USD"}]})
+        bad_status, bad = call("/convert?amount=1&from=USD&to=XXX")
+        lower_status, lower = call("/convert/batch", {"amounts": [100], "from": ["usd"], "to": "inr"})
+        position_statuses = [
+            call("/convert/batch", {"amounts": [1], "from": [codes], "to": [0]})[0] for codes in (-1, 7)
+        ]
+        length_statuses = [post_with_length(length) for length in (None, "abc", "-5", str(10 ** 12))]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert status == 200 and abs(single["converted"] - 8350.0) <= 1e-9, f"❌ Single conversion failed: {single}"
+    assert batch.get("converted") == [8350.0, 835.0] and abs(items["converted"][0] - 100.0) <= 1e-9, \
+        f"❌ Batch conversion failed: {batch} {items}"
+    assert bad_status == 400 and "error" in bad, f"❌ Unknown currency not rejected: {bad_status} {bad}"
+    assert lower_status == 200 and lower.get("converted") == [8350.0], \
+        f"❌ Lowercase batch codes not accepted like /convert: {lower_status} {lower}"
+    assert position_statuses == [400, 400], f"❌ Integer currency positions not rejected: {position_statuses}"
+    assert length_statuses == [400, 400, 400, 413], \
+        f"❌ Missing, invalid or oversized Content-Length not rejected: {length_statuses}"
+
+    print("✅ Conversion service working!")
+
+def test_parallel_conversion():
+    """Test process-pool batch conversion against the single-process path (offline)"""
+    print("\n🔍 Testing parallel batch conversion...")
+    import numpy as np
+    import parallel
+    from rate_matrix import RateMatrix
+
+    rates = {"USD": 1.0, "INR": 83.5, "EUR": 0.92, "JPY": 149.8}
+    rng = np.random.default_rng(7)
+    codes = np.array(list(rates))
+    amounts = rng.uniform(1, 1000, 10000)
+    from_codes = codes[rng.integers(0, len(codes), 10000)]
+    to_codes = codes[rng.integers(0, len(codes), 10000)]
+
+    original_min_rows = parallel.MIN_ROWS_PER_WORKER
+    parallel.MIN_ROWS_PER_WORKER = 100  # force the pool on a small batch
+    try:
+        result = parallel.convert_parallel(amounts, from_codes, to_codes, rates, workers=3)
+    finally:
+        parallel.MIN_ROWS_PER_WORKER = original_min_rows
+
+    expected = RateMatrix.from_rates(rates).convert_batch(amounts, from_codes, to_codes)
+    assert np.array_equal(result, expected), "❌ Parallel results differ from single-process results"
+
+    print("✅ Parallel batch conversion working!")
+
+def test_rate_history():
+    """Test the historical rate store and as-of-date conversion (offline)"""
+    print("\n🔍 Testing rate history...")
+    import math
+    import os
+    import tempfile
+    import threading
+    from rate_history import RateHistory
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = RateHistory(tmp)
+        history.append({"USD": 1.0, "INR": 80.0}, 1000)
+        skipped = history.append({"USD": 1.0, "INR": 80.0}, 1500)  # unchanged rates
+        history.append({"USD": 1.0, "INR": 82.0, "EUR": 0.9}, 2000)
+
+        # A second reader memory-maps the same files
+        reader = RateHistory(tmp)
+        rates, snapshot_time = reader.as_of("1970-01-01T00:25:00")  # unix 1500
+        converted = reader.convert_as_of(
+            [100, 100, 100, 100],
+            ["USD", "USD", "USD", "USD"],
+            ["INR", "INR", "EUR", "INR"],
+            [1500, 2000, 1500, 500]
+        )
+        snapshots = len(reader)
+
+    # Two writers on one directory (as with service.py --workers) take turns
+    with tempfile.TemporaryDirectory() as tmp:
+        writers = [RateHistory(tmp), RateHistory(tmp)]
+        threads = [
+            threading.Thread(target=lambda w=w, k=k: [
+                w.append({"USD": 1.0, "INR": 80.0 + i + k / 2}, 10 + 2 * i + k) for i in range(20)
+            ])
+            for k, w in enumerate(writers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        column_sizes = {os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp) if name.endswith(".f64")}
+    assert len(column_sizes) == 1, f"❌ Concurrent appends left columns of different lengths: {column_sizes}"
+
+    assert not skipped and snapshots == 2 and rates == {"USD": 1.0, "INR": 80.0} and snapshot_time == 1000, \
+        f"❌ Unexpected history state: {rates} @ {snapshot_time}, {snapshots} snapshots"
+    assert list(converted[:2]) == [8000.0, 8200.0] and math.isnan(converted[2]) and math.isnan(converted[3]), \
+        f"❌ As-of conversion wrong: {converted}"
+
+    print("✅ Rate history working!")
+
+def test_rate_providers():
+    """Test hedged fetching across providers (offline)"""
+    print("\n🔍 Testing rate providers...")
+    import json
+    import os
+    import tempfile
+    import time
+    from providers import CallableProvider, FileProvider, HTTPProvider, HedgedFetcher
+    from stub_rates_server import StubRatesServer
+
+    def broken():
+        raise RuntimeError("down")
+
+    with StubRatesServer(latency=0.5) as slow_stub, StubRatesServer(rates={"USD": 1.0, "INR": 80.0}) as fast_stub:
+        slow = HTTPProvider("slow-api", f"{slow_stub.base_url}/USD")
+        fast = HTTPProvider("fast-api", f"{fast_stub.base_url}/USD")
+        fetcher = HedgedFetcher([slow, fast], hedge_delay=0.05)
+        start = time.perf_counter()
+        success, rates, error = fetcher.fetch()
+        elapsed = time.perf_counter() - start
+        assert success and rates == {"USD": 1.0, "INR": 80.0} and elapsed <= 0.4, \
+            f"❌ Backup did not win the hedge: {success}, {rates}, {error}, {elapsed:.2f}s"
+
+        # Once the slow provider has reported, the fast one is tried first
+        time.sleep(0.6)
+        assert [provider.name for provider in fetcher.ranked()] == ["fast-api", "slow-api"], \
+            f"❌ Providers not ranked by latency: {fetcher.stats()}"
+
+    # A healthy primary keeps serving; the instant local file is only a fallback
+    with StubRatesServer(latency=0.05) as primary_stub, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.json")
+        with open(path, "w") as f:
+            json.dump({"rates": {"USD": 1.0, "INR": 1.0}}, f)
+
+        primary = HTTPProvider("primary", f"{primary_stub.base_url}/USD")
+        backup = HTTPProvider("backup", f"{primary_stub.base_url}/USD")
+        fetcher = HedgedFetcher([primary, backup, FileProvider("file", path)], hedge_delay=1.0)
+        for _ in range(3):
+            success, rates, error = fetcher.fetch()
+            assert success and rates.get("INR") != 1.0, \
+                f"❌ Rates file served while the primary was healthy: {rates}, {error}"
+        assert [provider.name for provider in fetcher.ranked()] == ["primary", "backup"], \
+            f"❌ Untried or fallback provider ranked above the primary: {fetcher.stats()}"
+
+        primary.url = backup.url = "http://127.0.0.1:9/USD"
+        success, rates, error = fetcher.fetch()
+        assert success and rates.get("INR") == 1.0, \
+            f"❌ Rates file not used once the network providers failed: {success}, {error}"
+
+    failing = HedgedFetcher([CallableProvider("broken", broken), FileProvider("missing", "/nonexistent.json")])
+    success, _, error = failing.fetch()
+    assert not success and "broken" in error and "missing" in error, f"❌ Expected every provider to fail: {error}"
+    assert failing.stats()["broken"]["errors"] == 1, f"❌ Provider errors not tracked: {failing.stats()}"
+
+    print("✅ Rate providers working!")
+
+def test_currency_index():
+    """Test the dynamic currency universe and its precomputed index (offline)"""
+    print("\n🔍 Testing currency index...")
+    from currency_core import SUPPORTED_CURRENCIES, get_rate_matrix, parse_rates
+    from currency_index import index_for
+
+    # Every quoted currency is kept, not just the well-known ones
+    rates = parse_rates({"rates": {"USD": 1, "INR": 83.0, "ZAR": 18.5, "KRW": 1350.0, "BAD": "n/a"}})
+    assert set(rates) == {"USD", "INR", "ZAR", "KRW"}, f"❌ parse_rates dropped or kept the wrong currencies: {rates}"
+
+    index = index_for(rates, SUPPORTED_CURRENCIES)
+    assert index.codes == ("USD", "INR", "KRW", "ZAR") and index.position["ZAR"] == 3, \
+        f"❌ Unexpected currency order: {index.codes}"
+    assert index.label("INR") == "₹ INR - Indian Rupee" and index.label("ZAR") == "ZAR" and index.minor_units["KRW"] == 0, \
+        f"❌ Unexpected index metadata: {index.labels}, {index.minor_units}"
+
+    # New rates for the same currencies reuse the index; a new currency rebuilds it
+    assert index_for(dict(rates, INR=84.0), SUPPORTED_CURRENCIES) is index, "❌ Index rebuilt for a rate-only change"
+    assert "EUR" in index_for(dict(rates, EUR=0.9), SUPPORTED_CURRENCIES), "❌ Index not rebuilt for a new currency"
+    grown = dict(rates)
+    index_for(grown, SUPPORTED_CURRENCIES)
+    grown["CHF"] = 0.88
+    assert "CHF" in index_for(grown, SUPPORTED_CURRENCIES) and index_for(grown, {}).label("INR") == "INR", \
+        "❌ Index memo ignored an in-place change or different display metadata"
+
+    assert abs(get_rate_matrix(rates).rate("INR", "ZAR") - 18.5 / 83.0) <= 1e-12, \
+        "❌ Matrix does not cover currencies outside SUPPORTED_CURRENCIES"
+
+    print(f"✅ Currency index working! {len(index)} currencies")
+
+def test_core_import():
+    """Test that the conversion core imports without Streamlit or other heavy dependencies"""
+    print("\n🔍 Testing lightweight core import...")
+    import os
+    import subprocess
+    import sys
+
+    script = (
+        "import sys, currency_core; "
+        "print(','.join(m for m in ('streamlit', 'requests', 'numpy') if m in sys.modules)); "
+        "print(currency_core.convert_currency_multi(100, 'USD', 'INR', {'USD': 1.0, 'INR': 80.0}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True,
+    )
+    lines = result.stdout.splitlines()
+    assert result.returncode == 0 and len(lines) == 2, f"❌ Importing currency_core failed: {result.stderr.strip()}"
+    assert not lines[0], f"❌ currency_core pulled in heavy modules at import: {lines[0]}"
+    assert float(lines[1]) == 8000.0, f"❌ Unexpected conversion result: {lines[1]}"
+
+    print("✅ Core imports without Streamlit, requests or numpy!")
+
+def test_rate_board():
+    """Test the pairwise rate board and snapshot ids (offline)"""
+    print("\n🔍 Testing rate board...")
+    from currency_core import _rate_cache, get_rate_board, get_snapshot_id
+
+    rates = {"USD": 1.0, "INR": 80.0, "EUR": 0.8}
+    codes, table = get_rate_board(rates, 10.0, ["EUR", "INR"])
+    assert codes == ("EUR", "INR") and table.shape == (2, 2), f"❌ Unexpected board layout: {codes}, {table.shape}"
+    assert abs(table[0, 1] - 1000.0) <= 1e-9 and abs(table[1, 0] - 0.1) <= 1e-12 and table[0, 0] == 10.0, \
+        f"❌ Unexpected board values: {table}"
+    codes, table = get_rate_board(rates)
+    assert len(codes) == 3 and table.shape == (3, 3), f"❌ Full board should cover every currency: {codes}"
+
+    # The cached snapshot is identified by its version; other dicts by their contents
+    cache = _rate_cache()
+    cache.prime(dict(rates))
+    cached_rates, _, version = cache.snapshot()
+    assert get_snapshot_id(cached_rates) == f"v{version}", \
+        f"❌ Cached snapshot id should follow the cache version: {get_snapshot_id(cached_rates)}"
+    assert get_snapshot_id(dict(rates)) == get_snapshot_id(dict(rates)) and get_snapshot_id(dict(rates, INR=81.0)) != get_snapshot_id(dict(rates)), \
+        "❌ Snapshot ids of uncached rates should depend only on their contents"
+
+    print("✅ Rate board working!")
+
+def test_rate_changes():
+    """Test change detection and the server-sent event stream (offline)"""
+    print("\n🔍 Testing rate change streaming...")
+    import http.client
+    import json
+    import threading
+    from currency_core import _rate_cache
+    from rate_changes import ChangeBroadcaster, diff_rates
+    from service import create_server
+
+    changes = diff_rates({"USD": 1.0, "INR": 80.0, "EUR": 0.9}, {"USD": 1.0, "INR": 80.04, "JPY": 150.0},
+                         threshold=0.001, thresholds={"INR": 0.0001})
+    assert set(changes) == {"INR", "JPY", "EUR"} and changes["EUR"]["new"] is None and changes["JPY"]["old"] is None, \
+        f"❌ Unexpected diff: {changes}"
+
+    # Small moves are held back until they add up to the threshold
+    broadcaster = ChangeBroadcaster(threshold=0.01)
+    everything = broadcaster.subscribe()
+    inr_only = broadcaster.subscribe(["INR"])
+    broadcaster.on_snapshot({"USD": 1.0, "INR": 80.0, "EUR": 0.9})
+    broadcaster.on_snapshot({"USD": 1.0, "INR": 80.5, "EUR": 0.9})
+    broadcaster.on_snapshot({"USD": 1.0, "INR": 81.0, "EUR": 0.95})
+    event = everything.get(timeout=1)
+    filtered = inr_only.get(timeout=1)
+    assert event is not None and set(event.changes) == {"INR", "EUR"} and everything.get(timeout=0.01) is None, \
+        f"❌ Unexpected published changes: {event and event.changes}"
+    assert filtered is not None and set(filtered.changes) == {"INR"} and filtered.changes["INR"]["old"] == 80.0, \
+        f"❌ Filtered subscriber got: {filtered and filtered.changes}"
+
+    # End to end: a stream subscriber sees only the currency it asked for, once it moves
+    _rate_cache().prime({"USD": 1.0, "INR": 83.5, "EUR": 0.92})
+    server = create_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("GET", "/rates/stream?currencies=INR")
+        response = conn.getresponse()
+
+        def next_event():
+            fields = {}
+            while True:
+                line = response.fp.readline().decode().rstrip("\n")
+                if not line:
+                    return fields
+                if not line.startswith(":"):
+                    key, _, value = line.partition(": ")
+                    fields[key] = value
+
+        snapshot = next_event()
+        _rate_cache().prime({"USD": 1.0, "INR": 84.0, "EUR": 0.93})
+        update = next_event()
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.getheader("Content-Type") == "text/event-stream" and snapshot.get("event") == "snapshot", \
+        f"❌ Stream did not start with a snapshot: {snapshot}"
+    assert json.loads(update["data"])["changes"] == {"INR": {"old": 83.5, "new": 84.0, "change": 84.0 / 83.5 - 1}}, \
+        f"❌ Unexpected stream update: {update}"
+
+    print("✅ Rate change streaming working!")
+
+def test_binary_snapshot():
+    """Test the binary snapshot format and zero-copy loading (offline)"""
+    print("\n🔍 Testing binary snapshot...")
+    import os
+    import tempfile
+    from binary_snapshot import BinarySnapshot, load_snapshot, write_snapshot
+
+    rates = {"USD": 1.0, "INR": 83.5, "EUR": 0.92, "JPY": 149.8}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.fxsn")
+        size = write_snapshot(path, rates, 1700000000.5)
+
+        with BinarySnapshot(path) as snapshot:
+            # Lookups work straight off the mapped file
+            inr = snapshot.rate("INR")
+            values = snapshot.to_numpy()
+            zero_copy = not values.flags.owndata and not values.flags.writeable
+            missing = False
+            try:
+                snapshot.rate("GBP")
+            except KeyError:
+                missing = True
+            loaded = snapshot.as_dict(), snapshot.fetched_at, snapshot.base
+            del values
+
+        garbage = os.path.join(tmp, "garbage.fxsn")
+        with open(garbage, "wb") as f:
+            f.write(b"not a snapshot at all, definitely not")
+        rejected = load_snapshot(garbage) is None and load_snapshot(os.path.join(tmp, "missing")) is None
+
+    assert size == 32 + 4 * 16 and inr == 83.5 and missing, \
+        f"❌ Unexpected snapshot contents: size {size}, INR {inr}, missing code found: {not missing}"
+    assert loaded == (rates, 1700000000.5, "USD") and zero_copy, \
+        f"❌ Snapshot did not round-trip without copies: {loaded}, zero copy {zero_copy}"
+    assert rejected, "❌ Invalid snapshot files should be ignored"
+
+    print("✅ Binary snapshot working!")
+
+def test_rate_limiter():
+    """Test the upstream token bucket and request coalescing (offline)"""
+    print("\n🔍 Testing upstream rate limiter...")
+    import threading
+    from rate_limiter import RateLimited, TokenBucket, UpstreamGate
+
+    now = [0.0]
+    clock = lambda: now[0]
+
+    # Bucket: a burst of 2, then one token every 2 seconds
+    bucket = TokenBucket(0.5, 2, clock=clock)
+    burst = [bucket.try_acquire() for _ in range(3)]
+    wait = bucket.retry_after()
+    now[0] += 2.0
+    refilled = bucket.try_acquire()
+    assert burst == [True, True, False] and wait == 2.0 and refilled, \
+        f"❌ Token bucket misbehaved: burst {burst}, wait {wait}, refilled {refilled}"
+
+    # Gate: concurrent callers share one fetch
+    outcomes = []
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return True, {"USD": 1.0}, ""
+
+    gate = UpstreamGate(TokenBucket(0.1, 1, clock=clock), window=2.0, on_outcome=outcomes.append, clock=clock)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gate.call(fetch))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    while len(outcomes) < 10:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # Within the window the result is reused; after it the empty bucket refuses
+    reused = gate.call(fetch)
+    now[0] += 3.0
+    limited = False
+    try:
+        gate.call(fetch)
+    except RateLimited as e:
+        limited = e.retry_after > 0
+
+    stats = gate.stats()
+    assert len(calls) == 1 and len(results) == 10 and reused == (True, {"USD": 1.0}, ""), \
+        f"❌ Concurrent calls were not coalesced: {len(calls)} upstream calls, {len(results)} results"
+    assert limited and (stats["issued"], stats["coalesced"], stats["limited"]) == (1, 10, 1), \
+        f"❌ Unexpected limiter counters: {stats}, limited {limited}"
+
+    print("✅ Upstream rate limiter working!")
+
+def test_app_load_harness():
+    """Test the Streamlit load-test harness against the stub API (offline)"""
+    print("\n🔍 Testing app load harness...")
+    import config
+    from currency_core import _rate_cache
+    from loadtest_app import prepare_streamlit, run_load, throughput_ceiling
+    from stub_rates_server import StubRatesServer
+
+    saved = (config.API_BASE_URL, config.SNAPSHOT_DB_PATH, config.BINARY_SNAPSHOT_PATH,
+             config.RATE_HISTORY_DIR, config.REFRESHER_ENABLED)
+    cache = _rate_cache()
+    saved_snapshot = cache.current()
+    prepare_streamlit()
+    try:
+        with StubRatesServer() as stub:
+            # Keep stub rates out of the on-disk snapshots and history
+            config.API_BASE_URL = stub.base_url
+            config.SNAPSHOT_DB_PATH = config.BINARY_SNAPSHOT_PATH = config.RATE_HISTORY_DIR = None
+            config.REFRESHER_ENABLED = False
+            results = run_load(users=2, duration=1.0)
+    finally:
+        (config.API_BASE_URL, config.SNAPSHOT_DB_PATH, config.BINARY_SNAPSHOT_PATH,
+         config.RATE_HISTORY_DIR, config.REFRESHER_ENABLED) = saved
+        # The simulated sessions filled the process-wide cache with stub rates
+        if saved_snapshot is not None:
+            cache.prime(saved_snapshot.rates, saved_snapshot.fetched_at)
+        else:
+            with cache._lock:
+                cache._snapshot = cache._fetched_at = None
+
+    assert not results["errors"] and results["load"]["count"] == 2 and results["interactions"], \
+        f"❌ Simulated sessions did not run cleanly: {results}"
+    assert all(results[kind]["p50_ms"] <= results[kind]["p99_ms"] for kind in results if isinstance(results[kind], dict)), \
+        f"❌ Latency percentiles out of order: {results}"
+
+    levels = [{"users": 1, "interactions_per_sec": 20.0}, {"users": 2, "interactions_per_sec": 30.0},
+              {"users": 4, "interactions_per_sec": 31.0}, {"users": 8, "interactions_per_sec": 25.0}]
+    ceiling = throughput_ceiling(levels)
+    assert ceiling == {"users": 4, "interactions_per_sec": 31.0, "saturated_at": 4}, \
+        f"❌ Unexpected throughput ceiling: {ceiling}"
+
+    print(f"✅ App load harness working! ({results['interactions_per_sec']:.0f} interactions/sec)")
+
+def test_shared_rate_snapshot():
+    """Test the shared immutable rate snapshot and per-session memory profile (offline)"""
+    print("\n🔍 Testing shared rate snapshot...")
+    import json
+    import config
+    from currency_core import _rate_cache
+    from loadtest_app import memory_profile, prepare_streamlit
+    from rate_cache import RateCache, RateSnapshot
+    from rate_limiter import TokenBucket
+    from stub_rates_server import StubRatesServer
+
+    cache = RateCache(lambda: (True, {"USD": 1.0, "INR": 83.5}, ""), ttl=60, keep_snapshots=2)
+    for rate in (83.0, 83.1, 83.2):
+        cache.prime({"USD": 1.0, "INR": rate})
+    snapshot = cache.current()
+    assert isinstance(snapshot, RateSnapshot) and snapshot.rates["INR"] == 83.2 and snapshot.id == cache.version, \
+        f"❌ Unexpected current snapshot: {snapshot}"
+    assert cache.get_snapshot(snapshot.id - 1).rates["INR"] == 83.1 and cache.get_snapshot(snapshot.id - 2) is None, \
+        "❌ Recent snapshots not kept (or not evicted) by id"
+    assert cache.snapshot() == (snapshot.rates, snapshot.fetched_at, snapshot.id), \
+        f"❌ snapshot() disagrees with current(): {cache.snapshot()}"
+    try:
+        snapshot.rates = {}
+        raise AssertionError("❌ RateSnapshot accepted an attribute change")
+    except AttributeError:
+        pass
+    try:
+        snapshot.rates["INR"] = 1.0
+        raise AssertionError("❌ Shared snapshot rates accepted an in-place change")
+    except TypeError:
+        pass
+    assert cache.get()[1] is snapshot.rates and json.loads(json.dumps(snapshot.rates)) == snapshot.rates, \
+        "❌ Cache does not serve the shared read-only rates"
+    assert not hasattr(snapshot, "__dict__") and not hasattr(TokenBucket(1, 1), "__dict__"), \
+        "❌ Per-session objects should use __slots__"
+
+    # Every session keeps just the snapshot id; the rates are held once
+    saved = (config.API_BASE_URL, config.SNAPSHOT_DB_PATH, config.BINARY_SNAPSHOT_PATH,
+             config.RATE_HISTORY_DIR, config.REFRESHER_ENABLED)
+    shared = _rate_cache()
+    saved_snapshot = shared.current()
+    prepare_streamlit()
+    try:
+        with StubRatesServer() as stub:
+            # Keep stub rates out of the on-disk snapshots and history
+            config.API_BASE_URL = stub.base_url
+            config.SNAPSHOT_DB_PATH = config.BINARY_SNAPSHOT_PATH = config.RATE_HISTORY_DIR = None
+            config.REFRESHER_ENABLED = False
+            profile = memory_profile(sessions=3)
+    finally:
+        (config.API_BASE_URL, config.SNAPSHOT_DB_PATH, config.BINARY_SNAPSHOT_PATH,
+         config.RATE_HISTORY_DIR, config.REFRESHER_ENABLED) = saved
+        # The profiled sessions filled the process-wide cache with stub rates
+        if saved_snapshot is not None:
+            shared.prime(saved_snapshot.rates, saved_snapshot.fetched_at)
+        else:
+            with shared._lock:
+                shared._snapshot = shared._fetched_at = None
+
+    assert set(profile["state_bytes_by_key"]) == {"snapshot_id", "convert_bucket"}, \
+        f"❌ Unexpected per-session state: {profile['state_bytes_by_key']}"
+    assert profile["state_bytes_per_session"] < 1024 and profile["shared_snapshot_bytes"], \
+        f"❌ Session state larger than expected: {profile}"
+
+    print(f"✅ Shared rate snapshot working! ({profile['state_bytes_per_session']:.0f} B of app state per session)")
+
+def test_rate_consistency():
+    """Test cross-rate consistency and reference provider checks (offline)"""
+    print("\n🔍 Testing rate consistency check...")
+    import numpy as np
+    from currency_core import _rate_cache, get_rate_consistency
+    from rate_consistency import check_cross_rates, check_snapshot, compare_snapshots
+
+    rates = {"USD": 1.0, "EUR": 0.92, "INR": 83.1, "GBP": 0.79, "JPY": 149.8, "CAD": 1.36, "CHF": 0.88}
+    codes = list(rates)
+    usd = np.array(list(rates.values()))
+
+    # One bad quote breaks every triangle through it, and only that quote is flagged
+    matrix = usd[np.newaxis, :] / usd[:, np.newaxis]
+    matrix[2, 4] *= 1.01
+    report = check_cross_rates(codes, matrix)
+    assert report["worst_pair"] == ("INR", "JPY") and report["inconsistent_pairs"] == 1, \
+        f"❌ Bad quote not isolated: {report}"
+    assert abs(report["triangle_error"] - 0.01) <= 1e-9 and abs(report["max_error"] - 0.01) <= 1e-9, \
+        f"❌ Unexpected inconsistency size: {report}"
+
+    # A second provider quoting from EUR, with JPY 3% off
+    reference = {code: rate / 0.92 for code, rate in rates.items()}
+    reference["JPY"] *= 1.03
+    comparison = compare_snapshots(rates, reference)
+    assert list(comparison["outliers"]) == ["JPY"] and abs(comparison["outliers"]["JPY"] - 0.03) <= 1e-9, \
+        f"❌ Reference outlier not found: {comparison}"
+
+    clean = check_snapshot(rates, {code: rate / 0.92 for code, rate in rates.items()})
+    assert clean["ok"] and clean["max_error"] <= 1e-12 and not clean["reference"]["outliers"], \
+        f"❌ Consistent snapshot reported as inconsistent: {clean}"
+    broken = check_snapshot(dict(rates, XYZ=0.0))
+    assert not broken["ok"] and broken["invalid"] == ["XYZ"], f"❌ Invalid rate not reported: {broken}"
+
+    # Every new cached snapshot is checked
+    cache = _rate_cache()
+    cache.prime(dict(rates))
+    latest = get_rate_consistency()
+    assert latest is not None and latest["version"] == cache.version and latest["currencies"] == len(rates), \
+        f"❌ New snapshot was not checked: {latest}"
+
+    print(f"✅ Rate consistency check working! ({clean['seconds'] * 1000:.2f}ms per check)")
+
 def main():
     """Run all tests"""
     print("🚀 Starting Currency Converter Tests...\n")
@@ -122,7 +1128,30 @@ def main():
         test_exchange_rate_function,
         test_exchange_rates_function,
         test_currency_conversion,
-        test_multi_currency_conversion
+        test_multi_currency_conversion,
+        test_rate_cache,
+        test_rate_matrix,
+        test_bulk_convert,
+        test_snapshot_store,
+        test_http_client,
+        test_async_rates,
+        test_rate_refresher,
+        test_exact_conversion,
+        test_benchmark_suite,
+        test_metrics,
+        test_service,
+        test_parallel_conversion,
+        test_rate_history,
+        test_rate_providers,
+        test_currency_index,
+        test_core_import,
+        test_rate_board,
+        test_rate_changes,
+        test_binary_snapshot,
+        test_rate_limiter,
+        test_app_load_harness,
+        test_rate_consistency,
+        test_shared_rate_snapshot
     ]
     
     passed = 0
@@ -130,8 +1159,11 @@ def main():
     
     for test in tests:
         try:
-            if test():
+            # The first checks report failure by returning False, the rest by assert
+            if test() is not False:
                 passed += 1
+        except AssertionError as e:
+            print(e)
         except Exception as e:
             print(f"❌ Test failed with exception: {e}")
     